@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# analyze.py — compare result sets and gate on dataplane regressions
+#
+# Each positional argument is one result set: a CSV, a quoted glob or a
+# comma-separated list of CSVs, every CSV being one trial. The first set is
+# the baseline; each later set is compared with it. Rows are aligned by
+# (pair, size, pps) and the loss and goodput deltas come with a Student-t
+# confidence interval over the trials (Welch). Best safe pps per (pair,
+# size) and latency are compared the same way.
+#
+# Exit status is 1 when a candidate's best safe pps drops, or its latency
+# rises, by more than the thresholds and the drop is significant (or can't
+# be tested: single trials), 0 otherwise.
+#
+#   ./analyze.py '../results/runs/base_*.csv' '../results/runs/cand_*.csv'
+#   ./analyze.py base.csv cand.csv --max-pps-drop 2 --max-latency-rise 20 --json
+import argparse, csv, glob, json, math, os, sys
+from statistics import NormalDist, mean, stdev
+
+SAFE_LOSS_PCT = 0.1
+MAX_PPS_DROP_PCT = 5.0
+MAX_LATENCY_RISE_PCT = 10.0
+CONFIDENCE = 0.95
+
+def _float(v):
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) else f
+
+def t_quantile(p, df):
+    """Student-t quantile; exact for df 1 and 2, Cornish-Fisher expansion above."""
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    g = ((z ** 3 + z) / 4,
+         (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96,
+         (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384,
+         (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / 92160)
+    return z + sum(gi / df ** (i + 1) for i, gi in enumerate(g))
+
+def diff_ci(a, b, confidence=CONFIDENCE):
+    """
+    (mean(b) - mean(a), lo, hi): Welch interval for the difference of means.
+    lo/hi are None unless both samples have at least two values.
+    """
+    if not a or not b:
+        return None, None, None
+    d = mean(b) - mean(a)
+    if len(a) < 2 or len(b) < 2:
+        return d, None, None
+    va, vb = stdev(a) ** 2 / len(a), stdev(b) ** 2 / len(b)
+    se = math.sqrt(va + vb)
+    if se == 0:
+        return d, d, d
+    df = (va + vb) ** 2 / (va ** 2 / (len(a) - 1) + vb ** 2 / (len(b) - 1))
+    h = t_quantile(0.5 + confidence / 2, max(1, int(df))) * se
+    return d, d - h, d + h
+
+def expand_set(spec):
+    paths = []
+    for part in spec.split(','):
+        hits = sorted(glob.glob(part))
+        if not hits and not os.path.exists(part):
+            raise SystemExit(f"[analyze] no CSV matches {part!r}")
+        paths += hits or [part]
+    return paths
+
+def read_trial(path):
+    """{(pair, size, pps): [row, ...]} of one CSV, rows reduced to loss/goodput/latency."""
+    out = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            pps, size = _float(row.get('pps')), _float(row.get('pktsize') or row.get('size'))
+            if pps is None or size is None:
+                continue
+            loss = _float(row.get('loss_pct'))
+            # bench.sh rows have no pair column; their names start with it (p12_f_...).
+            pair = row.get('pair') or (row.get('name') or '').split('_', 1)[0]
+            good = _float(row.get('pps_p50'))
+            if good is None and loss is not None:
+                good = pps * (1 - loss / 100.0)
+            lat = _float(row.get('lat_p99_us'))
+            out.setdefault((pair, int(size), int(pps)), []).append(
+                {'loss': loss, 'goodput': good, 'lat': _float(row.get('lat_avg_us')) if lat is None else lat})
+    return out
+
+def best_safe(trial, threshold):
+    """{(pair, size): highest pps whose every row is within the loss threshold} for one trial."""
+    best = {}
+    for (pair, size, pps), rows in trial.items():
+        losses = [r['loss'] for r in rows]
+        if losses and all(l is not None and l <= threshold for l in losses):
+            best[(pair, size)] = max(best.get((pair, size), 0), pps)
+    return best
+
+def _samples(trials, key, field):
+    return [r[field] for t in trials for r in t.get(key, []) if r[field] is not None]
+
+def compare(base, cand, args):
+    """Rows, best-safe and latency comparisons of two lists of trials, plus the regressions found."""
+    rows, safe, lat, regressions = [], [], [], []
+    for key in sorted(set().union(*base) & set().union(*cand)):
+        loss = diff_ci(_samples(base, key, 'loss'), _samples(cand, key, 'loss'), args.confidence)
+        good = diff_ci(_samples(base, key, 'goodput'), _samples(cand, key, 'goodput'), args.confidence)
+        rows.append({'key': key, 'loss': loss, 'goodput': good})
+        la, lb = _samples(base, key, 'lat'), _samples(cand, key, 'lat')
+        if la and lb:
+            d = diff_ci(la, lb, args.confidence)
+            rise = d[0] * 100.0 / mean(la) if mean(la) else 0.0
+            significant = d[1] is None or d[1] > 0
+            bad = rise > args.max_latency_rise and significant
+            lat.append({'key': key, 'base': mean(la), 'cand': mean(lb), 'delta': d, 'rise_pct': rise, 'regressed': bad})
+            if bad:
+                regressions.append(f"latency {key[0]} {key[1]}B {key[2]}pps: +{rise:.1f}% "
+                                   f"({mean(la):.2f} -> {mean(lb):.2f} us)")
+    bs_base = [best_safe(t, args.threshold) for t in base]
+    bs_cand = [best_safe(t, args.threshold) for t in cand]
+    pair_sizes = lambda trials: {k[:2] for t in trials for k in t}
+    for ps in sorted(pair_sizes(base) & pair_sizes(cand)):
+        a, b = [t.get(ps, 0) for t in bs_base], [t.get(ps, 0) for t in bs_cand]
+        d = diff_ci(a, b, args.confidence)
+        drop = -d[0] * 100.0 / mean(a) if mean(a) else 0.0
+        significant = d[2] is None or d[2] < 0
+        bad = drop > args.max_pps_drop and significant
+        safe.append({'key': ps, 'base': mean(a), 'cand': mean(b), 'delta': d, 'drop_pct': drop, 'regressed': bad})
+        if bad:
+            regressions.append(f"best safe pps {ps[0]} {ps[1]}B: -{drop:.1f}% ({mean(a):.0f} -> {mean(b):.0f} pps)")
+    return {'rows': rows, 'best_safe': safe, 'latency': lat, 'regressions': regressions}
+
+def _ci(d, fmt='{:+.3f}'):
+    v, lo, hi = d
+    if v is None:
+        return 'NA'
+    s = fmt.format(v)
+    return s if lo is None else f"{s} [{fmt.format(lo)}, {fmt.format(hi)}]"
+
+def markdown(name, res, args, n_base, n_cand):
+    conf = f"{args.confidence * 100:.0f}% CI"
+    out = [f"### {name} vs baseline ({n_base} vs {n_cand} trials)", ""]
+    out += [f"- **REGRESSION** {r}" for r in res['regressions']] or ["- No regression beyond thresholds "
+                                                                     f"(best safe pps -{args.max_pps_drop}%, "
+                                                                     f"latency +{args.max_latency_rise}%)."]
+    out += ["", f"| pair | size | best safe pps (base) | (cand) | Δ pps ({conf}) | Δ % |", "|---|---:|---:|---:|---:|---:|"]
+    for s in res['best_safe']:
+        flag = ' ⚠' if s['regressed'] else ''
+        out.append(f"| {s['key'][0]} | {s['key'][1]} | {s['base']:.0f} | {s['cand']:.0f} | "
+                   f"{_ci(s['delta'], '{:+.0f}')} | {0.0 - s['drop_pct']:+.1f}{flag} |")
+    if res['latency']:
+        out += ["", f"| pair | size | pps | latency µs (base) | (cand) | Δ µs ({conf}) | Δ % |",
+                "|---|---:|---:|---:|---:|---:|---:|"]
+        for l in res['latency']:
+            flag = ' ⚠' if l['regressed'] else ''
+            out.append(f"| {l['key'][0]} | {l['key'][1]} | {l['key'][2]} | {l['base']:.2f} | {l['cand']:.2f} | "
+                       f"{_ci(l['delta'])} | {l['rise_pct']:+.1f}{flag} |")
+    out += ["", f"| pair | size | pps | Δ loss % ({conf}) | Δ goodput pps ({conf}) |", "|---|---:|---:|---:|---:|"]
+    for r in res['rows']:
+        out.append(f"| {r['key'][0]} | {r['key'][1]} | {r['key'][2]} | {_ci(r['loss'])} | {_ci(r['goodput'], '{:+.0f}')} |")
+    return '\n'.join(out) + '\n'
+
+def main():
+    ap = argparse.ArgumentParser(description='Compare result sets (first = baseline) and gate on regressions')
+    ap.add_argument('sets', nargs='+', help='result sets: CSV, quoted glob or comma-separated CSVs')
+    ap.add_argument('--threshold', type=float, default=SAFE_LOSS_PCT, help='loss %% for "safe" (default 0.1)')
+    ap.add_argument('--max-pps-drop', type=float, default=float(os.environ.get('MAX_PPS_DROP', MAX_PPS_DROP_PCT)),
+                    help='best safe pps drop in %% that fails the gate (default 5, env MAX_PPS_DROP)')
+    ap.add_argument('--max-latency-rise', type=float,
+                    default=float(os.environ.get('MAX_LATENCY_RISE', MAX_LATENCY_RISE_PCT)),
+                    help='latency rise in %% that fails the gate (default 10, env MAX_LATENCY_RISE)')
+    ap.add_argument('--confidence', type=float, default=CONFIDENCE)
+    ap.add_argument('--json', action='store_true', help='print the comparison as JSON instead of markdown')
+    args = ap.parse_args()
+    if len(args.sets) < 2:
+        ap.error('need a baseline and at least one candidate set')
+    if not 0 < args.confidence < 1:
+        ap.error('--confidence must be between 0 and 1')
+
+    sets = [(s, [read_trial(p) for p in expand_set(s)]) for s in args.sets]
+    base_name, base = sets[0]
+    results = {}
+    for name, cand in sets[1:]:
+        results[name] = compare(base, cand, args)
+    failed = any(r['regressions'] for r in results.values())
+    if args.json:
+        print(json.dumps({'baseline': base_name, 'failed': failed,
+                          'results': {n: dict(r, rows=[dict(x, key=list(x['key'])) for x in r['rows']],
+                                              best_safe=[dict(x, key=list(x['key'])) for x in r['best_safe']],
+                                              latency=[dict(x, key=list(x['key'])) for x in r['latency']])
+                                      for n, r in results.items()}}, indent=1))
+    else:
+        print(f"## Regression analysis\n\nBaseline: `{base_name}` ({len(base)} trials)\n")
+        for name, cand in sets[1:]:
+            print(markdown(name, results[name], args, len(base), len(cand)))
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,12 @@
 # A/B compare: baseline -> impair -> re-run -> restore
 # Uses existing bench.sh + report.sh in this folder.
 # Set SKIP_BASELINE=1 to reuse existing baseline (avoid redundant bench run)
+# TRIALS=N runs bench.sh N times per side so analyze.py can put confidence
+# intervals on the deltas. The impaired side is expected to be worse, so its
+# deltas are informational only. GATE=1 GATE_BASE=<CSVs of the reference
+# image> also compares this image's unimpaired runs with the reference and
+# exits non-zero on a regression beyond MAX_PPS_DROP / MAX_LATENCY_RISE
+# (percent).
 set -euo pipefail
 cd "$(dirname "$0")"
 
@@ -11,6 +17,22 @@ mkdir -p "$RUNS_DIR"
 
 latest_report() { ls -1t "$OUTDIR"/report_*.md 2>/dev/null | head -n1 || true; }
 latest_bench()  { ls -1t "$RUNS_DIR"/bench_*.csv 2>/dev/null | head -n1 || true; }
+TRIALS="${TRIALS:-1}"
+GATE="${GATE:-0}"
+if [[ "$GATE" == "1" && -z "${GATE_BASE:-}" ]]; then
+  echo "ERROR: GATE=1 needs GATE_BASE: the unimpaired bench CSVs (CSV, quoted glob or comma list) of the reference image"
+  exit 1
+fi
+
+# bench.sh TRIALS times; prints the comma-separated CSVs
+bench_trials() {
+  local csvs=() i
+  for ((i = 1; i <= TRIALS; i++)); do
+    ./bench.sh >&2
+    csvs+=("$(latest_bench)")
+  done
+  (IFS=,; echo "${csvs[*]}")
+}
 
 TS="$(date +%Y%m%d_%H%M%S)"
 CMP_MD="$OUTDIR/compare_${TS}.md"
@@ -20,6 +42,7 @@ if [[ "${SKIP_BASELINE:-0}" == "1" ]]; then
   echo "[compare] === USING EXISTING BASELINE (SKIP_BASELINE=1) ==="
   BASE_RPT="$(latest_report)"
   BASE_CSV="$(latest_bench)"
+  BASE_CSVS="$BASE_CSV"
   if [[ -z "$BASE_RPT" || -z "$BASE_CSV" ]]; then
     echo "ERROR: SKIP_BASELINE=1 but no existing report/CSV found!"
     echo "Run ./bench.sh and ./report.sh first, or unset SKIP_BASELINE"
@@ -28,7 +51,7 @@ if [[ "${SKIP_BASELINE:-0}" == "1" ]]; then
   cp -f "$BASE_RPT" "$OUTDIR/report_before_${TS}.md"
 else
   echo "[compare] === BASELINE ==="
-  ./bench.sh
+  BASE_CSVS="$(bench_trials)"
   ./report.sh
   BASE_RPT="$(latest_report)"
   BASE_CSV="$(latest_bench)"
@@ -39,7 +62,7 @@ echo "[compare] === IMPAIR ON ==="
 # Tune via env: IMP_LOSS, IMP_DELAY, IMP_JITTER, IFACE_A/B, NS, DUT_POD, DUT_CTR
 IFACES="${IFACES:-eth13 eth14 eth15 eth16}" IMP_LOSS="${IMP_LOSS:-1}" IMP_DELAY="${IMP_DELAY:-10ms}" IMP_JITTER="${IMP_JITTER:-2ms}" ./impair_on.sh
 
-./bench.sh
+IMP_CSVS="$(bench_trials)"
 ./report.sh
 IMP_RPT="$(latest_report)"
 IMP_CSV="$(latest_bench)"
@@ -63,4 +86,27 @@ echo "[compare] Writing summary: $CMP_MD"
   echo "- If loss unchanged, verify \`tc qdisc show\` on DUT and confirm flow path uses the impaired interfaces."
 } >"$CMP_MD"
 
+# Numbers: deltas with CIs. Impairment is meant to degrade the results, so
+# analyze.py's verdict (exit 1) is expected here and does not gate.
+ANALYZE_RC=0
+{ echo; echo "## Baseline vs impaired (informational)"; ./analyze.py "$BASE_CSVS" "$IMP_CSVS"; } >>"$CMP_MD" || ANALYZE_RC=$?
+if (( ANALYZE_RC > 1 )); then
+  echo "[compare] ERROR: analyze.py failed (exit $ANALYZE_RC)"
+  exit "$ANALYZE_RC"
+fi
+
+# Gate: reference image vs this image, both unimpaired.
+GATE_RC=0
+if [[ "$GATE" == "1" ]]; then
+  { echo; echo "## Gate: reference image vs this image (unimpaired)"; ./analyze.py "$GATE_BASE" "$BASE_CSVS"; } >>"$CMP_MD" || GATE_RC=$?
+  if (( GATE_RC > 1 )); then
+    echo "[compare] ERROR: analyze.py failed (exit $GATE_RC)"
+    exit "$GATE_RC"
+  fi
+fi
+
 echo "[compare] Done."
+if (( GATE_RC != 0 )); then
+  echo "[compare] GATE: this image regressed beyond thresholds against GATE_BASE, see $CMP_MD"
+  exit 1
+fi
@@ -0,0 +1,438 @@
+# dsl_spec.py — load, validate and expand DSL specs for run_dsl.py
+#
+# Specs are YAML (PyYAML if installed, otherwise the block/flow subset below,
+# which covers everything nl_run.py emits) or JSON. pps, pktsize, count and
+# ports accept sweep lists, under defaults or per scenario:
+#
+#   pps: [1k..50k step 5k, 60k]     # ranges (inclusive) and single values
+#   pktsize: [64, 512, 1500]
+#   ports: [[eth1, eth2], [eth3, eth4]]
+#
+# pktsize may also be a size mix, `imix` or {size: weight, ...}, and a
+# scenario may list several concurrent `flows` instead of `ports`.
+#
+# Each scenario expands to the cross product of its sweeps. Scenarios are
+# generated one at a time, so a matrix is never held in memory.
+import json, os, re
+
+SWEEP_KEYS = ('ports', 'pktsize', 'pps', 'count')   # outermost first
+NUMERIC_KEYS = ('pps', 'pktsize', 'count')
+SCENARIO_KEYS = {'name', 'ports', 'pps', 'pktsize', 'count', 'bidir', 'controller', 'impair',
+                 'settle', 'deadline', 'capture', 'latency', 'search', 'flows', 'soak'}
+FLOW_KEYS = {'name', 'ports', 'pps', 'pktsize', 'count', 'bidir'}
+DEFAULT_KEYS = SCENARIO_KEYS - {'name', 'ports', 'flows'} | {'ns', 'max_parallel', 'ports', 'controllers', 'retries', 'cooldown'}
+SUFFIXES = {'k': 1000, 'm': 1000 ** 2, 'g': 1000 ** 3}
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+IMIX = ((64, 7), (570, 4), (1518, 1))    # simple IMIX: (frame size, weight)
+RANGE_RE = re.compile(r'^(\S+?)\s*\.\.\s*(\S+?)(?:\s+step\s+(\S+))?$')
+
+class SpecError(ValueError):
+    """Raised for specs that cannot be parsed or fail validation."""
+
+# --- YAML subset -----------------------------------------------------------
+
+def _strip_comment(line):
+    quote = None
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '#' and (i == 0 or line[i - 1] in ' \t'):
+            return line[:i].rstrip()
+    return line.rstrip()
+
+def _split_flow(body):
+    """Split the inside of a flow collection on top-level commas."""
+    items, depth, quote, cur = [], 0, None, ''
+    for ch in body:
+        if quote:
+            quote = None if ch == quote else quote
+        elif ch in '"\'':
+            quote = ch
+        elif ch in '[{':
+            depth += 1
+        elif ch in ']}':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            items.append(cur.strip())
+            cur = ''
+            continue
+        cur += ch
+    if cur.strip():
+        items.append(cur.strip())
+    return items
+
+def _scalar(s):
+    s = s.strip()
+    if s.startswith('[') and s.endswith(']'):
+        return [_scalar(x) for x in _split_flow(s[1:-1])]
+    if s.startswith('{') and s.endswith('}'):
+        out = {}
+        for item in _split_flow(s[1:-1]):
+            k, _, v = item.partition(':')
+            out[_scalar(k)] = _scalar(v)
+        return out
+    if len(s) >= 2 and s[0] == s[-1] and s[0] in '"\'':
+        return s[1:-1]
+    low = s.lower()
+    if low in ('true', 'false'):
+        return low == 'true'
+    if low in ('', '~', 'null', 'none'):
+        return None
+    try:
+        return int(s)
+    except ValueError:
+        pass
+    try:
+        return float(s)
+    except ValueError:
+        return s
+
+_KEY_RE = re.compile(r'^("[^"]*"|\'[^\']*\'|[^:\'"]+?)\s*:(?:\s+(.*))?$')
+
+def _is_item(text):
+    return text == '-' or text.startswith('- ')
+
+def _block(lines, i, indent):
+    """Parse the block starting at lines[i] (indented exactly `indent`). Returns (value, next index)."""
+    if _is_item(lines[i][1]):
+        out = []
+        while i < len(lines) and lines[i][0] == indent and _is_item(lines[i][1]):
+            ln, text = lines[i][2], lines[i][1]
+            rest = text[1:].strip()
+            if not rest:
+                if i + 1 < len(lines) and lines[i + 1][0] > indent:
+                    val, i = _block(lines, i + 1, lines[i + 1][0])
+                else:
+                    val, i = None, i + 1
+            elif _is_item(rest) or (_KEY_RE.match(rest) and rest[0] not in '[{"\''):
+                # "- key: value" opens a mapping whose keys sit at the column of "key",
+                # "- - value" (PyYAML's nested lists) a list whose items sit at the inner "-"
+                col = indent + len(text) - len(rest)
+                lines[i] = (col, rest, ln)
+                val, i = _block(lines, i, col)
+            else:
+                val, i = _scalar(rest), i + 1
+            out.append(val)
+        return out, i
+
+    out = {}
+    while i < len(lines) and lines[i][0] == indent and not _is_item(lines[i][1]):
+        ind, text, ln = lines[i]
+        m = _KEY_RE.match(text)
+        if not m:
+            raise SpecError(f"line {ln}: expected 'key: value', got {text!r}")
+        key, val = _scalar(m.group(1)), m.group(2)
+        i += 1
+        if val is not None and val.strip():
+            out[key] = _scalar(val)
+        elif i < len(lines) and (lines[i][0] > indent or (lines[i][0] == indent and _is_item(lines[i][1]))):
+            out[key], i = _block(lines, i, lines[i][0])
+        else:
+            out[key] = None
+    if i < len(lines) and lines[i][0] > indent:
+        raise SpecError(f"line {lines[i][2]}: unexpected indentation")
+    return out, i
+
+def parse_yaml(text):
+    """Parse the YAML subset used by DSL specs: block mappings/lists, flow lists/maps, plain scalars."""
+    lines = []
+    for ln, raw in enumerate(text.splitlines(), start=1):
+        if '\t' in raw[:len(raw) - len(raw.lstrip())]:
+            raise SpecError(f"line {ln}: tabs are not allowed in indentation")
+        line = _strip_comment(raw)
+        if line.strip() and line.strip() != '---':
+            lines.append((len(line) - len(line.lstrip(' ')), line.strip(), ln))
+    if not lines:
+        return {}
+    val, i = _block(lines, 0, lines[0][0])
+    if i < len(lines):
+        raise SpecError(f"line {lines[i][2]}: unexpected dedent")
+    return val
+
+def _read_yaml(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        import yaml  # type: ignore
+    except ImportError:
+        return parse_yaml(text)
+    try:
+        return yaml.safe_load(text)
+    except yaml.YAMLError as e:
+        raise SpecError(str(e))
+
+# --- sweeps ----------------------------------------------------------------
+
+def parse_number(v):
+    """20000, '20k', '1.5M' -> int."""
+    if isinstance(v, bool):
+        raise SpecError(f"expected a number, got {v!r}")
+    if isinstance(v, (int, float)):
+        return int(v)
+    s = str(v).strip().lower()
+    mult = SUFFIXES.get(s[-1:], 1)
+    try:
+        return int(round(float(s[:-1] if mult > 1 else s) * mult))
+    except ValueError:
+        raise SpecError(f"expected a number, got {v!r}")
+
+def parse_duration(v):
+    """3600, '90s', '30m', '4h', '1.5h' -> seconds (float)."""
+    if isinstance(v, bool):
+        raise SpecError(f"expected a duration, got {v!r}")
+    if isinstance(v, (int, float)):
+        return float(v)
+    s = str(v).strip().lower()
+    mult = DURATION_UNITS.get(s[-1:], 1)
+    try:
+        return float(s[:-1] if s[-1:] in DURATION_UNITS else s) * mult
+    except ValueError:
+        raise SpecError(f"expected a duration like '30m' or '4h', got {v!r}")
+
+def _is_mix(v):
+    return isinstance(v, dict) or (isinstance(v, str) and v.strip().lower() == 'imix')
+
+def size_spec(v):
+    """pktsize value -> int, or a tuple of (size, weight) pairs for 'imix' / {size: weight}."""
+    if isinstance(v, tuple):
+        return v
+    if isinstance(v, str) and v.strip().lower() == 'imix':
+        return IMIX
+    if isinstance(v, dict):
+        if not v:
+            raise SpecError("size mix is empty")
+        pairs = tuple(sorted((parse_number(k), parse_number(w)) for k, w in v.items()))
+        if any(sz <= 0 or w <= 0 for sz, w in pairs):
+            raise SpecError(f"size mix needs positive sizes and weights, got {v}")
+        return pairs
+    return parse_number(v)
+
+def mean_size(size):
+    """Average frame size of a size_spec() value."""
+    if isinstance(size, tuple):
+        return round(sum(sz * w for sz, w in size) / sum(w for _, w in size))
+    return size
+
+def _segment(v):
+    """One sweep element -> a range or a 1-tuple."""
+    m = RANGE_RE.match(v.strip()) if isinstance(v, str) else None
+    if not m:
+        return (parse_number(v),)
+    lo, hi = parse_number(m.group(1)), parse_number(m.group(2))
+    if m.group(3) is None:
+        raise SpecError(f"range {v!r} needs a step, e.g. '{m.group(1)}..{m.group(2)} step N'")
+    step = parse_number(m.group(3))
+    if step <= 0 or hi < lo:
+        raise SpecError(f"range {v!r}: need lo <= hi and step > 0")
+    return range(lo, hi + 1, step)
+
+class Axis:
+    """A re-iterable list of sweep values; ranges are never materialized."""
+
+    def __init__(self, segments):
+        self.segments = segments
+
+    def __iter__(self):
+        for seg in self.segments:
+            yield from seg
+
+    def __len__(self):
+        return sum(len(seg) for seg in self.segments)
+
+def sweep_axis(key, v):
+    """Axis for a sweepable key, or None if v is a single value."""
+    if key == 'ports':
+        if isinstance(v, list) and v and all(isinstance(p, list) for p in v):
+            for p in v:
+                if len(p) != 2:
+                    raise SpecError(f"ports sweep entries must be 2-item lists, got {p}")
+            return Axis([[tuple(str(x) for x in p) for p in v]])
+        if not isinstance(v, list) or len(v) != 2:
+            raise SpecError(f"'ports' must be a 2-item list or a list of them, got {v}")
+        return None
+    if key == 'pktsize' and _is_mix(v):
+        size_spec(v)
+        return None
+    if isinstance(v, list):
+        if not v:
+            raise SpecError(f"'{key}' sweep is empty")
+        return Axis([(size_spec(x),) if key == 'pktsize' and _is_mix(x) else _segment(x) for x in v])
+    if isinstance(v, str) and RANGE_RE.match(v.strip()):
+        return Axis([_segment(v)])
+    parse_number(v)
+    return None
+
+def _product(axes):
+    if not axes:
+        yield ()
+        return
+    for v in axes[0]:
+        for rest in _product(axes[1:]):
+            yield (v,) + rest
+
+# --- validation / expansion ------------------------------------------------
+
+def _validate_flows(name, sc):
+    flows = sc['flows']
+    if not isinstance(flows, list) or not flows:
+        raise SpecError(f"Scenario '{name}': 'flows' must be a non-empty list")
+    if 'ports' in sc or sc.get('search'):
+        raise SpecError(f"Scenario '{name}': 'flows' can't be combined with 'ports' or 'search'")
+    for i, fl in enumerate(flows, start=1):
+        if not isinstance(fl, dict):
+            raise SpecError(f"Scenario '{name}': flow #{i} must be a mapping")
+        unknown = set(fl) - FLOW_KEYS
+        if unknown:
+            raise SpecError(f"Scenario '{name}': flow #{i}: unknown key(s) {', '.join(sorted(unknown))}")
+        ports = fl.get('ports')
+        if not isinstance(ports, list) or len(ports) != 2 or any(isinstance(p, list) for p in ports):
+            raise SpecError(f"Scenario '{name}': flow #{i}: 'ports' must be a 2-item list, got {ports}")
+        try:
+            if 'pps' in fl:
+                parse_number(fl['pps'])
+            if 'count' in fl:
+                parse_number(fl['count'])
+            if 'pktsize' in fl:
+                size_spec(fl['pktsize'])
+        except SpecError as e:
+            raise SpecError(f"Scenario '{name}': flow #{i}: {e}")
+
+def validate_defaults(defaults):
+    if not isinstance(defaults, dict):
+        raise SpecError("'defaults' must be a mapping")
+    unknown = set(defaults) - DEFAULT_KEYS
+    if unknown:
+        raise SpecError(f"defaults: unknown key(s) {', '.join(sorted(unknown))}")
+    if not isinstance(defaults.get('impair') or {}, dict):
+        raise SpecError("defaults: 'impair' must be a mapping")
+    for k in SWEEP_KEYS:
+        if k in defaults:
+            try:
+                sweep_axis(k, defaults[k])
+            except SpecError as e:
+                raise SpecError(f"defaults: {e}")
+    return defaults
+
+def validate_scenario(sc, defaults, n=1):
+    """Check one scenario (the n-th, for messages) against the already validated defaults."""
+    if not isinstance(sc, dict):
+        raise SpecError(f"scenario #{n} must be a mapping, got {sc!r}")
+    name = sc.get('name', f'#{n}')
+    unknown = set(sc) - SCENARIO_KEYS
+    if unknown:
+        raise SpecError(f"Scenario '{name}': unknown key(s) {', '.join(sorted(unknown))}")
+    if not isinstance(sc.get('impair') or {}, dict):
+        raise SpecError(f"Scenario '{name}': 'impair' must be a mapping")
+    if not isinstance(sc.get('search') or {}, (dict, bool)):
+        raise SpecError(f"Scenario '{name}': 'search' must be a mapping or true")
+    soak = sc.get('soak')
+    if soak:
+        if not isinstance(soak, (dict, bool, str, int, float)):
+            raise SpecError(f"Scenario '{name}': 'soak' must be a mapping, a duration or true")
+        if sc.get('search'):
+            raise SpecError(f"Scenario '{name}': 'soak' can't be combined with 'search'")
+        try:
+            for k, v in (soak.items() if isinstance(soak, dict) else [('duration', soak)]):
+                if k in ('duration', 'window', 'checkpoint', 'interval') and v is not True:
+                    parse_duration(v)
+        except SpecError as e:
+            raise SpecError(f"Scenario '{name}': soak: {e}")
+    if 'flows' in sc:
+        _validate_flows(name, sc)
+    elif 'ports' not in sc and 'ports' not in defaults:
+        raise SpecError(f"Scenario '{name}': 'ports' is required")
+    for k in SWEEP_KEYS:
+        if k in sc:
+            try:
+                sweep_axis(k, sc[k])
+            except SpecError as e:
+                raise SpecError(f"Scenario '{name}': {e}")
+    return sc
+
+def validate(spec):
+    if not isinstance(spec, dict):
+        raise SpecError("spec must be a mapping with 'defaults' and 'scenarios'")
+    defaults = validate_defaults(spec.get('defaults') or {})
+    scenarios = spec.get('scenarios')
+    if not isinstance(scenarios, list) or not scenarios:
+        raise SpecError("No scenarios in DSL file")
+    for n, sc in enumerate(scenarios, start=1):
+        validate_scenario(sc, defaults, n)
+    return spec
+
+def load_spec(path):
+    if not os.path.isfile(path):
+        raise SpecError(f"DSL file not found: {path}")
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                spec = json.load(f)
+            except ValueError as e:
+                raise SpecError(f"{path}: {e}")
+    elif ext in ('.yaml', '.yml'):
+        spec = _read_yaml(path)
+    else:
+        raise SpecError("Unsupported DSL format (use .yaml/.yml or .json)")
+    return validate(spec)
+
+def _label(key, v):
+    return {'ports': lambda p: f'{p[0]}-{p[1]}', 'pktsize': lambda s: 'imix' if isinstance(s, tuple) else f'{s}B',
+            'pps': lambda r: f'{r}pps', 'count': lambda c: f'{c}pkts'}[key](v)
+
+def expand_scenario(sc, defaults):
+    """
+    Yield the concrete scenarios of one scenario: every sweep replaced by one
+    of its values and the swept values appended to the name. A scenario
+    without sweeps passes through unchanged (numbers written as '20k' are
+    normalized).
+    """
+    name = sc.get('name', 'unnamed')
+    fixed, keys, axes = {}, [], []
+    for k in SWEEP_KEYS:
+        if (k not in sc and k not in defaults) or (k == 'ports' and 'flows' in sc):
+            continue
+        v = sc.get(k, defaults.get(k))
+        axis = sweep_axis(k, v)
+        if axis is None:
+            fixed[k] = size_spec(v) if k == 'pktsize' else parse_number(v) if k in NUMERIC_KEYS else v
+        else:
+            keys.append(k)
+            axes.append(axis)
+    for point in _product(axes):
+        out = dict(sc, **fixed)
+        out.update(zip(keys, [list(v) if k == 'ports' else v for k, v in zip(keys, point)]))
+        if keys:
+            out['name'] = '_'.join([name] + [_label(k, v) for k, v in zip(keys, point)])
+        yield out
+
+def expand(spec):
+    """Concrete scenarios of a validated spec, in order."""
+    defaults = spec.get('defaults') or {}
+    for sc in spec['scenarios']:
+        yield from expand_scenario(sc, defaults)
+
+def iter_scenarios(scenarios, defaults):
+    """
+    Validate and expand scenarios from any iterable (a generator is consumed
+    once, as it goes), so callers can feed scenarios without building a spec
+    file or list first.
+    """
+    for n, sc in enumerate(scenarios, start=1):
+        yield from expand_scenario(validate_scenario(sc, defaults, n), defaults)
+
+def count_points(spec):
+    """Number of scenarios expand() yields, computed without expanding."""
+    defaults = spec.get('defaults') or {}
+    total = 0
+    for sc in spec['scenarios']:
+        n = 1
+        for k in SWEEP_KEYS:
+            if (k in sc or k in defaults) and not (k == 'ports' and 'flows' in sc):
+                axis = sweep_axis(k, sc.get(k, defaults.get(k)))
+                n *= len(axis) if axis else 1
+        total += n
+    return total
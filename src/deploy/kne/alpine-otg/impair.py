@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# impair.py — diff-based netem manager for the DUT/CTL pods
+#
+# Python counterpart of impair_on.sh / impair_off.sh for run_dsl.py. The
+# manager remembers the netem settings it applied to every (pod, iface) and
+# on each change sends only the difference, as a single `kubectl exec` per
+# pod carrying all of that pod's tc commands. The tc/iproute2 check runs
+# once per pod. Pods are updated in parallel.
+#
+#   ./impair.py --dry-run on --loss 1 --delay 10ms --jitter 2ms   # print the execs
+#   ./impair.py off
+import argparse, os, shlex, subprocess, sys
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_IFACES = "eth13 eth14 eth15 eth16"
+UNKNOWN = object()   # state after a failed exec: resend on the next apply
+
+def netem_key(loss, delay, jitter):
+    return (str(loss), str(delay), str(jitter))
+
+def pods_from_env(env=None):
+    """[(pod, container, label)] as impair_on.sh picks them (DUT, plus CTL unless IMPAIR_BOTH=0)."""
+    env = os.environ if env is None else env
+    pods = [(env.get('DUT_POD', 'alpine-dut'), env.get('DUT_CTR', 'dataplane'), 'DUT')]
+    if env.get('IMPAIR_BOTH', '1') == '1':
+        pods.append((env.get('CTL_POD', 'alpine-ctl'), env.get('CTL_CTR', 'dataplane'), 'CTL'))
+    return pods
+
+class KubectlExecutor:
+    def __init__(self, ns):
+        self.ns = ns
+
+    def __call__(self, pod, ctr, script):
+        subprocess.run(['kubectl', '-n', self.ns, 'exec', pod, '-c', ctr, '--', 'sh', '-lc', script],
+                       check=True, stdout=subprocess.DEVNULL)
+
+class FakeExecutor:
+    """Records (pod, container, script) instead of running anything; optionally echoes them."""
+
+    def __init__(self, echo=False):
+        self.calls = []
+        self.echo = echo
+
+    def __call__(self, pod, ctr, script):
+        self.calls.append((pod, ctr, script))
+        if self.echo:
+            print(f"[impair] dry-run exec {pod}/{ctr}:\n  " + script.replace('\n', '\n  '))
+
+def _script(changes, setup):
+    lines = ['set -e']
+    if setup:
+        lines.append('command -v tc >/dev/null || (apk update && apk add --no-cache iproute2) >/dev/null')
+    for ifc, key in sorted(changes.items()):
+        q = shlex.quote(ifc)
+        if key is None:
+            lines.append(f'tc qdisc del dev {q} root 2>/dev/null || true')
+        else:
+            loss, delay, jitter = key
+            lines.append(f'ip link set {q} up || true')
+            lines.append(f'tc qdisc replace dev {q} root netem loss {shlex.quote(loss)}% '
+                         f'delay {shlex.quote(delay)} {shlex.quote(jitter)} distribution normal')
+    return '\n'.join(lines)
+
+class ImpairManager:
+    """
+    Tracks netem state per (pod, iface). The state starts out clean (no
+    qdisc), the same assumption the shell scripts make.
+    """
+
+    def __init__(self, ns, pods=None, executor=None):
+        self.ns = ns
+        self.pods = pods or pods_from_env()
+        self.executor = executor or KubectlExecutor(ns)
+        self.state = {}         # (pod, iface) -> netem key; missing means clean
+        self._ready = set()     # pods where tc is known to be installed
+        self.execs = 0
+
+    def current(self, ifc):
+        """The key applied to ifc on every pod, or UNKNOWN if the pods disagree or an exec failed."""
+        keys = {self.state.get((pod, ifc)) for pod, _, _ in self.pods}
+        return keys.pop() if len(keys) == 1 else UNKNOWN
+
+    def diff(self, desired):
+        """{pod: {iface: key}} of what apply(desired) would change."""
+        out = {}
+        for pod, _, _ in self.pods:
+            changes = {i: k for i, k in desired.items() if self.state.get((pod, i)) != k}
+            if changes:
+                out[pod] = changes
+        return out
+
+    def _apply_pod(self, pod, ctr, label, changes):
+        try:
+            self.executor(pod, ctr, _script(changes, setup=any(changes.values()) and pod not in self._ready))
+        except Exception:
+            for i in changes:
+                self.state[(pod, i)] = UNKNOWN
+            raise
+        if any(changes.values()):
+            self._ready.add(pod)
+        for i, k in changes.items():
+            if k is None:
+                self.state.pop((pod, i), None)
+            else:
+                self.state[(pod, i)] = k
+        desc = ', '.join(f"{i}={'clean' if k is None else 'loss %s%% delay %s/%s' % k}" for i, k in sorted(changes.items()))
+        print(f"[impair] {label} ({pod}): {desc}")
+
+    def apply(self, desired):
+        """
+        Bring every pod to desired ({iface: netem key or None}); interfaces
+        not mentioned are left alone. Returns the number of execs issued.
+        """
+        diff = self.diff(desired)
+        todo = [(pod, ctr, label, diff[pod]) for pod, ctr, label in self.pods if pod in diff]
+        if not todo:
+            return 0
+        with ThreadPoolExecutor(max_workers=len(todo)) as pool:
+            for f in [pool.submit(self._apply_pod, *t) for t in todo]:
+                f.result()
+        self.execs += len(todo)
+        return len(todo)
+
+    def clear(self, ifaces=None):
+        """Remove netem from ifaces (default: everything this manager applied)."""
+        if ifaces is None:
+            ifaces = {i for (_, i), k in self.state.items() if k is not None}
+        return self.apply(dict.fromkeys(ifaces))
+
+def main():
+    ap = argparse.ArgumentParser(description='Apply or clear netem on the DUT/CTL pods')
+    ap.add_argument('action', choices=('on', 'off'))
+    ap.add_argument('--loss', default=os.environ.get('IMP_LOSS', '1'), help='percent')
+    ap.add_argument('--delay', default=os.environ.get('IMP_DELAY', '10ms'))
+    ap.add_argument('--jitter', default=os.environ.get('IMP_JITTER', '2ms'))
+    ap.add_argument('--ifaces', default=os.environ.get('IFACES', DEFAULT_IFACES))
+    ap.add_argument('--dry-run', action='store_true', help='print the execs instead of running them')
+    args = ap.parse_args()
+    ns = os.environ.get('NS', 'twodut-alpine-otg')
+    mgr = ImpairManager(ns, executor=FakeExecutor(echo=True) if args.dry_run else None)
+    ifaces = args.ifaces.replace(',', ' ').split()
+    key = netem_key(args.loss, args.delay, args.jitter) if args.action == 'on' else None
+    # Standalone use has no prior state: treat every iface as unknown so it is always sent.
+    for pod, _, _ in mgr.pods:
+        for i in ifaces:
+            mgr.state[(pod, i)] = UNKNOWN
+    try:
+        mgr.apply(dict.fromkeys(ifaces, key))
+    except subprocess.CalledProcessError as e:
+        sys.exit(f"[impair] {e}")
+
+if __name__ == '__main__':
+    main()
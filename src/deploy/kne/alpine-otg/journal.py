@@ -0,0 +1,65 @@
+# journal.py — append-only completion journal for resumable DSL runs
+#
+# One JSON line per completed run, keyed by a hash of the run's effective
+# parameters and fsync'ed before the next line is written, so a crash loses
+# at most the runs that were still in flight. A torn last line (the process
+# died mid-write) is ignored on load and cut off before a resume appends.
+import hashlib, json, os, time
+
+def param_key(params):
+    """Stable hash of a JSON-serializable parameter dict."""
+    blob = json.dumps(params, sort_keys=True, separators=(',', ':'), default=list)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+def truncate_torn_tail(path):
+    """Cut a line-oriented file back to its last complete line; returns the number of bytes dropped."""
+    with open(path, 'r+b') as f:
+        size = pos = f.seek(0, os.SEEK_END)
+        keep = 0
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            i = f.read(step).rfind(b'\n')
+            if i >= 0:
+                keep = pos - step + i + 1
+                break
+            pos -= step
+        if keep < size:
+            f.truncate(keep)
+        return size - keep
+
+class RunJournal:
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.entries = {}
+        if resume and os.path.exists(path):
+            self.entries = self._load()
+            # A record appended to a torn line would be unreadable on the next resume.
+            truncate_torn_tail(path)
+        self._f = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self):
+        entries = {}
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    e = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(e, dict) and 'key' in e:
+                    entries[e['key']] = e
+        return entries
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def record(self, key, name, rows, summary=None):
+        """Commit a completed run: rows are its CSV lines, summary its search result (if any)."""
+        e = {'key': key, 'name': name, 'rows': rows, 'search': summary, 't': round(time.time(), 3)}
+        self._f.write(json.dumps(e) + '\n')
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self.entries[key] = e
+
+    def close(self):
+        self._f.close()
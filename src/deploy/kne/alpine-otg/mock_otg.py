@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# mock_otg.py — local stand-in for an OTG controller, for dry runs of the DSL tooling
+#
+# Implements just enough of the OTG REST API for otg_client.py: POST /config,
+# POST /control/state (flow_transmit start/stop) and POST /monitor/metrics
+# (port and flow). Traffic is simulated from wall-clock time: each flow sends
+# at `pps * rate_scale` until it reaches its fixed packet count and `loss`
+# percent of frames are dropped. With `capacity` set, a flow offered above
+# that rate additionally loses the excess, like a saturated DUT. Flows with
+# latency metrics enabled report `latency_us` plus up to `jitter_us` that
+# varies over time (min/avg/max since the flow started, as OTG does).
+#
+#   ./mock_otg.py --port 8080 --loss 0.5        # then: OTG_API=http://127.0.0.1:8080 ./run_dsl.py tests.yaml
+import argparse, json, math, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class MockOtgState:
+    def __init__(self, loss=0.0, rate_scale=1.0, capacity=None, latency_us=5.0, jitter_us=1.0):
+        self.loss = float(loss)
+        self.rate_scale = float(rate_scale)
+        self.capacity = capacity
+        self.latency_us = float(latency_us)
+        self.jitter_us = float(jitter_us)
+        self.lock = threading.Lock()
+        self.config = {'ports': [], 'flows': []}
+        self.started = {}   # flow name -> start time
+        self.stopped = {}   # flow name -> frames sent when stopped
+        self.requests = 0
+
+    def set_config(self, cfg):
+        with self.lock:
+            self.config = cfg
+            self.started.clear()
+            self.stopped.clear()
+
+    def transmit(self, state, names):
+        with self.lock:
+            flows = names or [f['name'] for f in self.config.get('flows', [])]
+            now = time.monotonic()
+            for n in flows:
+                if state == 'start':
+                    self.started[n] = now
+                    self.stopped.pop(n, None)
+                elif n in self.started:
+                    self.stopped[n] = self._sent(self._flow(n), now)
+
+    def _flow(self, name):
+        return next(f for f in self.config.get('flows', []) if f['name'] == name)
+
+    def _sent(self, flow, now):
+        if flow['name'] in self.stopped:
+            return self.stopped[flow['name']]
+        start = self.started.get(flow['name'])
+        if start is None:
+            return 0
+        pps = flow.get('rate', {}).get('pps', 1000) * self.rate_scale
+        sent = int((now - start) * pps)
+        dur = flow.get('duration', {})
+        if dur.get('choice', 'fixed_packets') == 'fixed_packets':
+            sent = min(sent, int(dur.get('fixed_packets', {}).get('packets', 1000)))
+        return sent
+
+    def _delivered(self, flow):
+        """Fraction of sent frames that are received."""
+        frac = (100.0 - self.loss) / 100.0
+        pps = flow.get('rate', {}).get('pps', 1000) * self.rate_scale
+        if self.capacity and pps > self.capacity:
+            frac *= self.capacity / pps
+        return frac
+
+    def _latency(self, flow, now):
+        # Latency follows base + jitter * (1 + sin(t)) / 2, so the cumulative
+        # average drifts while the flow runs.
+        e = now - self.started.get(flow['name'], now)
+        base, j = self.latency_us * 1000.0, self.jitter_us * 1000.0
+        avg_sin = (1 - math.cos(e)) / e if e > 0 else 0.0
+        max_sin = math.sin(min(e, math.pi / 2))
+        min_sin = 0.0 if e <= math.pi else (-1.0 if e >= 1.5 * math.pi else math.sin(e))
+        return {'minimum_ns': base + j / 2 * (1 + min_sin), 'average_ns': base + j / 2 * (1 + avg_sin),
+                'maximum_ns': base + j / 2 * (1 + max_sin)}
+
+    @staticmethod
+    def _mean_size(size):
+        pairs = size.get('weight_pairs', {}).get('custom') if size.get('choice') == 'weight_pairs' else None
+        if pairs:
+            return round(sum(p['size'] * p['weight'] for p in pairs) / sum(p['weight'] for p in pairs))
+        return size.get('fixed', 512)
+
+    def _flow_metrics(self, flow, now):
+        tx = self._sent(flow, now)
+        rx = int(tx * self._delivered(flow))
+        size = self._mean_size(flow.get('size', {}))
+        dur = flow.get('duration', {})
+        limit = dur.get('fixed_packets', {}).get('packets') if dur.get('choice', 'fixed_packets') == 'fixed_packets' else None
+        running = flow['name'] in self.started and flow['name'] not in self.stopped and (limit is None or tx < limit)
+        pps = flow.get('rate', {}).get('pps', 1000) * self.rate_scale if running else 0
+        port = flow.get('tx_rx', {}).get('port', {})
+        return {'name': flow['name'], 'port_tx': port.get('tx_name'), 'port_rx': (port.get('rx_names') or [None])[0],
+                'transmit': 'started' if running else 'stopped',
+                'frames_tx': str(tx), 'frames_rx': str(rx), 'bytes_tx': str(tx * size), 'bytes_rx': str(rx * size),
+                'frames_tx_rate': pps, 'frames_rx_rate': pps * self._delivered(flow),
+                **({'latency': self._latency(flow, now)} if flow.get('metrics', {}).get('latency', {}).get('enable') else {})}
+
+    def metrics(self, req):
+        with self.lock:
+            now = time.monotonic()
+            flows = [self._flow_metrics(f, now) for f in self.config.get('flows', [])]
+            if req.get('choice') == 'flow':
+                names = req.get('flow', {}).get('flow_names') or [f['name'] for f in flows]
+                return {'choice': 'flow_metrics', 'flow_metrics': [f for f in flows if f['name'] in names]}
+            ports = []
+            names = req.get('port', {}).get('port_names') or [p['name'] for p in self.config.get('ports', [])]
+            for p in self.config.get('ports', []):
+                if p['name'] not in names:
+                    continue
+                tx = sum(int(f['frames_tx']) for f in flows if f['port_tx'] == p['name'])
+                rx = sum(int(f['frames_rx']) for f in flows if f['port_rx'] == p['name'])
+                busy = any(f['transmit'] == 'started' for f in flows if f['port_tx'] == p['name'])
+                ports.append({'name': p['name'], 'location': p.get('location'), 'link': 'up',
+                              'transmit': 'started' if busy else 'stopped',
+                              'frames_tx': str(tx), 'frames_rx': str(rx)})
+            return {'choice': 'port_metrics', 'port_metrics': ports}
+
+def _handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'   # keep-alive, like the real controller
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, code, body):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self):
+            n = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(n) or b'{}')
+
+        def do_GET(self):
+            state.requests += 1
+            if self.path == '/config':
+                return self._reply(200, state.config)
+            self._reply(404, {'errors': [f'unknown path {self.path}']})
+
+        def do_POST(self):
+            state.requests += 1
+            try:
+                body = self._body()
+            except ValueError as e:
+                return self._reply(400, {'errors': [str(e)]})
+            if self.path == '/config':
+                state.set_config(body)
+                return self._reply(200, {'warnings': []})
+            if self.path == '/control/state':
+                ft = body.get('traffic', {}).get('flow_transmit', {})
+                state.transmit(ft.get('state'), ft.get('flow_names'))
+                return self._reply(200, {'warnings': []})
+            if self.path == '/monitor/metrics':
+                return self._reply(200, state.metrics(body))
+            self._reply(404, {'errors': [f'unknown path {self.path}']})
+    return Handler
+
+class MockOtgServer:
+    """In-process mock controller. `url` is usable as a DSL controller once start() returns."""
+
+    def __init__(self, host='127.0.0.1', port=0, loss=0.0, rate_scale=1.0, capacity=None, latency_us=5.0, jitter_us=1.0):
+        self.state = MockOtgState(loss, rate_scale, capacity, latency_us, jitter_us)
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self.state))
+        self.httpd.daemon_threads = True
+        self.url = f'http://{host}:{self.httpd.server_address[1]}'
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main():
+    ap = argparse.ArgumentParser(description='Mock OTG controller')
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8080)
+    ap.add_argument('--loss', type=float, default=0.0, help='percent of frames dropped')
+    ap.add_argument('--rate-scale', type=float, default=1.0, help='achieved fraction of the configured pps')
+    ap.add_argument('--capacity', type=float, default=None, help='pps above which a flow loses the excess')
+    ap.add_argument('--latency-us', type=float, default=5.0, help='base one-way latency reported for flows')
+    ap.add_argument('--jitter-us', type=float, default=1.0, help='latency variation on top of the base')
+    args = ap.parse_args()
+    srv = MockOtgServer(args.host, args.port, args.loss, args.rate_scale, args.capacity,
+                        args.latency_us, args.jitter_us)
+    print(f"[mock-otg] listening on {srv.url}")
+    try:
+        srv.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -1,56 +1,117 @@
 #!/usr/bin/env python3
-import os, re, sys, time, subprocess, shlex, tempfile, textwrap, json
+import os, re, sys, time, argparse
+import run_dsl, dsl_spec, otg_client
 
 USAGE = """\
 Examples:
   ./nl_run.py "baseline on eth1,eth2 bidir at 20kpps size 512 count 50000;
                impaired on eth1,eth2 loss 0.5% delay 5ms jitter 1ms bidir at 40kpps;
                on eth3,eth4 256B 15kpps bidir count 50000"
+  ./nl_run.py "on eth1,eth2 from 10kpps to 50kpps step 10kpps sizes 64,512,1500"
+  ./nl_run.py "on eth1,eth2 and eth3,eth4 at 10k,20kpps imix unidir"
 
 Notes: separate scenarios with ';' and include 'impaired' (or 'loss xx%') to turn impairment on.
+A rate range ('10k..50kpps step 10k'), a list of rates or sizes, or several port pairs
+turn the scenario into a sweep. --dry-run prints the generated spec without running it.
 """
 
-def kpps_to_int(s):
-    m=re.search(r'(\d+(\.\d+)?)\s*kpps', s)
-    if m: return int(float(m.group(1))*1000)
-    m=re.search(r'\b(\d+)\s*pps\b', s)
-    return int(m.group(1)) if m else None
-
-def pktsize(s):
-    m=re.search(r'(?:size|pktsize|packet size)\s*(\d+)', s); 
-    if m: return int(m.group(1))
-    m=re.search(r'\b(\d+)\s*B\b', s)
-    return int(m.group(1)) if m else None
-
-def count_pkts(s):
-    m=re.search(r'count\s*(\d+)', s); 
-    if m: return int(m.group(1))
-    m=re.search(r'\b(\d+)\s*(?:pkts|packets)\b', s)
-    return int(m.group(1)) if m else None
-
-def ports(s):
-    m=re.search(r'eth(\d)\s*[,/ -]\s*eth(\d)', s)
-    return (f"eth{m.group(1)}", f"eth{m.group(2)}") if m else None
-
-def loss(s):
-    m=re.search(r'loss\s*([\d.]+)\s*%', s); 
-    return float(m.group(1)) if m else None
-
-def delay(s):
-    m=re.search(r'delay\s*([\d]+ms)', s); 
-    return m.group(1) if m else None
-
-def jitter(s):
-    m=re.search(r'jitter\s*([\d]+ms)', s); 
-    return m.group(1) if m else None
-
-def bool_bidir(s):
-    return bool(re.search(r'\bbidir\b|both\s+directions', s))
-
-def scenario_name(i, s):
-    base = "impaired" if ("impair" in s or "loss" in s) else "baseline"
-    p = ports(s)
-    return f"{base}-{p[0][-1]}{p[1][-1]}-{i}" if p else f"{base}-{i}"
+NUM = r'\d+(?:\.\d+)?[kKmM]?'
+RATE = NUM + r'\s*(?:[kKmM]?pps)?'
+
+# One alternation scanned once per clause; earlier alternatives win at the
+# same position, so ranges and lists are tried before single values.
+TOKEN_RE = re.compile(r'''
+    (?P<srange>(?:packet\s+)?(?:pkt)?sizes?\s*(?:from\s+)?(?P<slo>\d+)\s*B?\s*(?:to|\.\.)\s*(?P<shi>\d+)\s*B?
+        \s*(?:step|by)\s*(?P<sst>\d+)\s*B?)
+  | (?P<size>(?:packet\s+)?(?:pkt)?sizes?\s*(?P<sval>imix|\d+(?:\s*B?\s*,\s*\d+)*)\s*B?)
+  | (?P<count>count\s*(?P<cval>''' + NUM + r''')|(?P<cval2>''' + NUM + r''')\s*(?:pkts|packets)\b)
+  | (?P<prange>(?:from\s+)?(?P<plo>''' + RATE + r''')\s*(?:to|\.\.)\s*(?P<phi>''' + NUM + r''')\s*(?P<punit>[kKmM]?pps)
+        (?:\s*(?:step|by|in\s+steps\s+of)\s*(?P<pst>''' + RATE + r'''))?)
+  | (?P<rate>(?P<rval>''' + NUM + r'''(?:\s*,\s*''' + NUM + r''')*)\s*(?P<runit>[kKmM]?pps)\b)
+  | (?P<bytes>(?P<bval>\d+\s*B(?:\s*,\s*\d+\s*B)*)\b)
+  | (?P<ports>\beth(?P<pa>\d+)\s*[,/ -]\s*eth(?P<pb>\d+))
+  | (?P<loss>loss\s*(?P<lval>[\d.]+)\s*%)
+  | (?P<delay>delay\s*(?P<dval>[\d.]+\s*(?:ms|us|s)))
+  | (?P<jitter>jitter\s*(?P<jval>[\d.]+\s*(?:ms|us|s)))
+  | (?P<bidir>\bbidir\b|both\s+directions)
+  | (?P<unidir>\bunidir\b|one\s+direction)
+  | (?P<imix>\bimix\b)
+  | (?P<impair>\bimpair(?:ed)?\b)
+''', re.X | re.I)
+
+def _unit(last, unit):
+    """The k/m multiplier shared by a list or range: from the unit ('kpps') or the last value ('50k')."""
+    for u in (unit[:1], last.strip()[-1:]):
+        if u.lower() in ('k', 'm'):
+            return u
+    return ''
+
+def _rate(tok, unit=''):
+    """'20', '20k', '20kpps', '1.5 mpps' -> pps; a bare number takes the k/m of unit."""
+    tok = re.sub(r'\s*pps$', '', tok.strip(), flags=re.I)
+    if tok[-1:].isdigit():
+        tok += unit[:1] if unit[:1].lower() in ('k', 'm') else ''
+    return dsl_spec.parse_number(tok)
+
+def _sweep(vals):
+    return vals[0] if len(vals) == 1 else vals
+
+def parse_clause(i, c, defs):
+    """
+    Scenario dict for one clause. The clause is tokenized in a single pass;
+    anything that is not a known phrase is ignored.
+    """
+    pairs, rates, sizes, imp = [], None, None, {}
+    count, bidir, impaired = None, defs["bidir"], False
+    for m in TOKEN_RE.finditer(c):
+        kind = m.lastgroup      # the enclosing alternative: it closes after its value groups
+        if kind == 'srange':
+            sizes = f"{m.group('slo')}..{m.group('shi')} step {m.group('sst')}"
+        elif kind == 'size':
+            v = m.group('sval')
+            sizes = 'imix' if v.lower() == 'imix' else _sweep([int(x) for x in re.findall(r'\d+', v)])
+        elif kind == 'bytes':
+            sizes = _sweep([int(x) for x in re.findall(r'\d+', m.group('bval'))])
+        elif kind == 'imix':
+            sizes = 'imix'
+        elif kind == 'count':
+            count = dsl_spec.parse_number(m.group('cval') or m.group('cval2'))
+        elif kind == 'prange':
+            unit = _unit(m.group('phi'), m.group('punit'))
+            if m.group('pst') is None:
+                raise dsl_spec.SpecError(f"clause {i}: rate range '{m.group(0)}' needs a step (e.g. 'step 10kpps')")
+            rates = f"{_rate(m.group('plo'), unit)}..{_rate(m.group('phi'), unit)} step {_rate(m.group('pst'), unit)}"
+        elif kind == 'rate':
+            unit = _unit(m.group('rval').split(',')[-1], m.group('runit'))
+            rates = _sweep([_rate(x, unit) for x in m.group('rval').split(',')])
+        elif kind == 'ports':
+            pairs.append([f"eth{m.group('pa')}", f"eth{m.group('pb')}"])
+        elif kind == 'loss':
+            impaired, imp['loss'] = True, float(m.group('lval'))
+        elif kind == 'delay':
+            imp['delay'] = m.group('dval').replace(' ', '')
+        elif kind == 'jitter':
+            imp['jitter'] = m.group('jval').replace(' ', '')
+        elif kind == 'bidir':
+            bidir = True
+        elif kind == 'unidir':
+            bidir = False
+        elif kind == 'impair':
+            impaired = True
+
+    base = "impaired" if impaired else "baseline"
+    tag = ''.join(p[0][3:] + p[1][3:] for p in pairs[:1])
+    scen = {
+        "name": f"{base}-{tag}-{i}" if tag else f"{base}-{i}",
+        "ports": _sweep(pairs) if len(pairs) > 1 else (pairs[0] if pairs else ["eth1", "eth2"]),
+        "pps": defs["pps"] if rates is None else rates,
+        "pktsize": defs["pktsize"] if sizes is None else sizes,
+        "count": count or defs["count"],
+        "bidir": bidir,
+    }
+    if impaired:
+        scen["impair"] = dict(defs["impair"], enabled=True, **imp)
+    return scen
 
 def build_yaml(defaults, scenarios):
     import yaml  # if PyYAML present, pretty; else manual
@@ -70,6 +131,8 @@ def build_yaml_min(defaults, scenarios):
                     if isinstance(item, dict):
                         out.append(" "*(indent+2) + "-")
                         out += [ " "*(indent+4) + line for line in emit_dict(item, indent+4) ]
+                    elif isinstance(item, list):
+                        out.append(" "*(indent+2) + f"- [{', '.join(map(str, item))}]")
                     else:
                         out.append(" "*(indent+2) + f"- {item}")
             else:
@@ -78,10 +141,24 @@ def build_yaml_min(defaults, scenarios):
     lines = emit_dict({"defaults": defaults, "scenarios": scenarios})
     return "\n".join(lines) + "\n"
 
+def write_audit(defs, scs, path):
+    try:
+        yaml_text = build_yaml(defs, scs)  # requires PyYAML
+    except Exception:
+        yaml_text = build_yaml_min(defs, scs)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(yaml_text)
+    return yaml_text
+
 def main():
-    if len(sys.argv) < 2: 
-        print(USAGE); sys.exit(1)
-    text = " ".join(sys.argv[1:]).strip()
+    ap = argparse.ArgumentParser(usage=USAGE)
+    ap.add_argument('text', nargs='+', help='scenario description')
+    ap.add_argument('-j', '--jobs', type=int, default=None, help='max runs in flight (see run_dsl.py)')
+    ap.add_argument('-n', '--dry-run', action='store_true', help='print the generated spec and exit')
+    ap.add_argument('--no-audit', action='store_true', help='do not keep a copy of the generated spec')
+    args = ap.parse_args()
+    text = " ".join(args.text).strip()
     clauses = [c.strip() for c in re.split(r';|\n', text) if c.strip()]
 
     defs = {
@@ -90,40 +167,29 @@ def main():
         "impair": {"enabled": False, "loss": 1, "delay": "10ms", "jitter": "2ms"}
     }
 
-    scs=[]
-    for i, c in enumerate(clauses, start=1):
-        p = ports(c) or ("eth1","eth2")
-        scen = {
-            "name": scenario_name(i, c),
-            "ports": [p[0], p[1]],
-            "pps": kpps_to_int(c) or defs["pps"],
-            "pktsize": pktsize(c) or defs["pktsize"],
-            "count": count_pkts(c) or defs["count"],
-            "bidir": bool_bidir(c) or defs["bidir"],
-        }
-        if "impaired" in c or "impair" in c or loss(c) is not None:
-            scen["impair"] = {
-                "enabled": True,
-                "loss": loss(c) or defs["impair"]["loss"],
-                "delay": delay(c) or defs["impair"]["delay"],
-                "jitter": jitter(c) or defs["impair"]["jitter"],
-            }
-        scs.append(scen)
-
-    tmp_yaml = os.path.join(tempfile.gettempdir(), f"tests_{int(time.time())}.yaml")
     try:
+        scs = [parse_clause(i, c, defs) for i, c in enumerate(clauses, start=1)]
+    except dsl_spec.SpecError as e:
+        sys.exit(f"[NL] {e}")
+    if args.dry_run:
         try:
-            yaml_text = build_yaml(defs, scs)  # requires PyYAML
+            print(build_yaml(defs, scs), end='')
         except Exception:
-            yaml_text = build_yaml_min(defs, scs)
-        with open(tmp_yaml, "w", encoding="utf-8") as f:
-            f.write(yaml_text)
-        print(f"[NL] Wrote {tmp_yaml}")
-        # run your DSL + report
-        subprocess.run(["./run_dsl.py", tmp_yaml], check=True)
-        subprocess.run(["./report.sh"], check=True)
-    finally:
-        pass 
+            print(build_yaml_min(defs, scs), end='')
+        return
+
+    # The spec is handed to run_dsl in-process; the YAML copy is only kept
+    # so a run can be audited (or rerun with run_dsl.py) later.
+    if not args.no_audit:
+        audit = os.path.join('../results/runs', f"nl_{time.strftime('%Y%m%d_%H%M%S')}.yaml")
+        write_audit(defs, scs, audit)
+        print(f"[NL] Wrote {audit}")
+    try:
+        run_dsl.run_scenarios(scs, defs, jobs=args.jobs, name='nl')
+    except dsl_spec.SpecError as e:
+        sys.exit(f"[NL] DSL error: {e}")
+    except otg_client.OtgError as e:
+        sys.exit(f"[NL] {e}")
 
 if __name__ == "__main__":
     main()
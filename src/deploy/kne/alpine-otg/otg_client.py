@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# otg_client.py — minimal in-process Open Traffic Generator (OTG) REST client
+#
+# Replaces the `otgen create | run | transform | display` pipeline: pushes a
+# flow config, starts/stops traffic and reads port/flow metrics as JSON over
+# a small pool of keep-alive HTTP(S) connections. ControllerPool hands out
+# idle, healthy controllers from a set of them to whichever worker asks next.
+import json, ssl, threading, queue, time, http.client
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from urllib.parse import urlsplit
+
+class OtgError(RuntimeError):
+    """Raised when the controller answers with an HTTP error or unparsable body."""
+
+def _from_json(cls, d):
+    # OTG serializes 64-bit counters as JSON strings; coerce to the field types.
+    kw = {}
+    for f in fields(cls):
+        v = d.get(f.name)
+        if v is not None:
+            kw[f.name] = f.type(v) if f.type in (int, float, str) else v
+    return cls(**kw)
+
+@dataclass
+class PortMetrics:
+    name: str = ''
+    frames_tx: int = 0
+    frames_rx: int = 0
+    bytes_tx: int = 0
+    bytes_rx: int = 0
+    frames_tx_rate: float = 0.0
+    frames_rx_rate: float = 0.0
+    transmit: str = ''
+
+    @classmethod
+    def from_json(cls, d):
+        return _from_json(cls, d)
+
+@dataclass
+class FlowMetrics:
+    name: str = ''
+    frames_tx: int = 0
+    frames_rx: int = 0
+    bytes_tx: int = 0
+    bytes_rx: int = 0
+    frames_tx_rate: float = 0.0
+    frames_rx_rate: float = 0.0
+    transmit: str = ''
+    # Cumulative since the flow started; None unless latency metrics are enabled.
+    latency_min_ns: float = None
+    latency_avg_ns: float = None
+    latency_max_ns: float = None
+
+    @classmethod
+    def from_json(cls, d):
+        m = _from_json(cls, d)
+        lat = d.get('latency') or {}
+        for f, k in (('latency_min_ns', 'minimum_ns'), ('latency_avg_ns', 'average_ns'), ('latency_max_ns', 'maximum_ns')):
+            if lat.get(k) is not None:
+                setattr(m, f, float(lat[k]))
+        return m
+
+def _pattern(value):
+    return {'choice': 'value', 'value': value}
+
+def _size(size):
+    if isinstance(size, (list, tuple)):
+        return {'choice': 'weight_pairs',
+                'weight_pairs': {'choice': 'custom',
+                                 'custom': [{'size': int(sz), 'weight': int(w)} for sz, w in size]}}
+    return {'choice': 'fixed', 'fixed': int(size)}
+
+def traffic_config(flows, latency=None):
+    """
+    OTG config with several concurrent flows. Each flow is a dict with name,
+    txl, rxl, src, dst, size (an int, or (size, weight) pairs for a size
+    mix), pps and count (None: transmit until stopped). Ports are named p1,
+    p2, ... in order of first use, so a single flow gets p1 -> p2. latency
+    is None or an OTG latency mode ('store_forward' or 'cut_through')
+    applied to every flow.
+    """
+    ports = {}
+    for f in flows:
+        for loc in (f['txl'], f['rxl']):
+            ports.setdefault(loc, f'p{len(ports) + 1}')
+    metrics = {'enable': True, 'loss': False, 'timestamps': False}
+    if latency:
+        metrics['latency'] = {'enable': True, 'mode': latency}
+    return {
+        'ports': [{'name': name, 'location': loc} for loc, name in ports.items()],
+        'flows': [{
+            'name': f['name'],
+            'tx_rx': {'choice': 'port', 'port': {'tx_name': ports[f['txl']], 'rx_names': [ports[f['rxl']]]}},
+            'packet': [
+                {'choice': 'ethernet', 'ethernet': {'src': _pattern('02:00:00:00:01:aa'),
+                                                    'dst': _pattern('02:00:00:00:02:aa')}},
+                {'choice': 'ipv4', 'ipv4': {'src': _pattern(f.get('src', '1.1.1.1')),
+                                            'dst': _pattern(f.get('dst', '2.2.2.2'))}},
+                {'choice': 'udp', 'udp': {'src_port': _pattern(5000), 'dst_port': _pattern(6000)}},
+            ],
+            'size': _size(f['size']),
+            'rate': {'choice': 'pps', 'pps': int(f['pps'])},
+            'duration': ({'choice': 'continuous', 'continuous': {'gap': 12}} if f['count'] is None else
+                         {'choice': 'fixed_packets', 'fixed_packets': {'packets': int(f['count']), 'gap': 12}}),
+            'metrics': dict(metrics),
+        } for f in flows],
+    }
+
+def flow_config(name, txl, rxl, src='1.1.1.1', dst='2.2.2.2', size=512, pps=1000, count=1000, latency=None):
+    """
+    OTG config equivalent to `otgen create flow -n name -s src -d dst --size size
+    -r pps -c count --tx p1 --rx p2 --txl txl --rxl rxl`.
+    """
+    return traffic_config([dict(name=name, txl=txl, rxl=rxl, src=src, dst=dst, size=size, pps=pps, count=count)],
+                          latency=latency)
+
+class OtgClient:
+    """
+    Thread-safe OTG client. Connections are kept alive and reused from a
+    small LIFO pool so consecutive requests skip the TCP/TLS handshake.
+    """
+
+    def __init__(self, api, timeout=10.0, pool_size=4, verify=False):
+        u = urlsplit(api if '://' in api else 'https://' + api)
+        self.api = api
+        self._https = u.scheme == 'https'
+        self._host = u.hostname
+        self._port = u.port or (443 if self._https else 80)
+        self._base = u.path.rstrip('/')
+        self._timeout = timeout
+        self._ctx = None
+        if self._https:
+            self._ctx = ssl.create_default_context() if verify else ssl._create_unverified_context()
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        # POST /config replaces the controller's whole config, so a
+        # config/start/collect cycle must own the controller while it runs.
+        self.lock = threading.Lock()
+
+    def _new_conn(self):
+        if self._https:
+            return http.client.HTTPSConnection(self._host, self._port, timeout=self._timeout, context=self._ctx)
+        return http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _request(self, method, path, body=None):
+        payload = None if body is None else json.dumps(body).encode()
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/json', 'Connection': 'keep-alive'}
+        # A pooled connection may have been closed by the server; retry once on a fresh one.
+        for attempt in (0, 1):
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                conn = self._new_conn()
+            try:
+                conn.request(method, self._base + path, body=payload, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.HTTPException, ConnectionError, OSError):
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            if resp.getheader('Connection', '').lower() == 'close':
+                conn.close()
+            else:
+                self._release(conn)
+            if resp.status >= 400:
+                raise OtgError(f"{method} {path} -> HTTP {resp.status}: {data[:200]!r}")
+            if not data:
+                return {}
+            try:
+                return json.loads(data)
+            except ValueError as e:
+                raise OtgError(f"{method} {path}: invalid JSON: {e}")
+
+    def ping(self):
+        """True if the controller answers GET /config."""
+        try:
+            self._request('GET', '/config')
+            return True
+        except (OtgError, OSError, http.client.HTTPException):
+            return False
+
+    def set_config(self, config):
+        return self._request('POST', '/config', config)
+
+    def _flow_transmit(self, state, flow_names=None):
+        body = {'choice': 'traffic',
+                'traffic': {'choice': 'flow_transmit',
+                            'flow_transmit': {'state': state, 'flow_names': list(flow_names or [])}}}
+        return self._request('POST', '/control/state', body)
+
+    def start_traffic(self, flow_names=None):
+        return self._flow_transmit('start', flow_names)
+
+    def stop_traffic(self, flow_names=None):
+        return self._flow_transmit('stop', flow_names)
+
+    def port_metrics(self, port_names=None):
+        res = self._request('POST', '/monitor/metrics',
+                            {'choice': 'port', 'port': {'port_names': list(port_names or [])}})
+        return {m.name: m for m in map(PortMetrics.from_json, res.get('port_metrics') or [])}
+
+    def flow_metrics(self, flow_names=None):
+        res = self._request('POST', '/monitor/metrics',
+                            {'choice': 'flow', 'flow': {'flow_names': list(flow_names or [])}})
+        return {m.name: m for m in map(FlowMetrics.from_json, res.get('flow_metrics') or [])}
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(api):
+    """Shared client per controller URL, so all runs against it share one connection pool."""
+    with _clients_lock:
+        c = _clients.get(api)
+        if c is None:
+            c = _clients[api] = OtgClient(api)
+        return c
+
+# Errors that mean "this controller failed", as opposed to a bug in the caller.
+CONTROLLER_ERRORS = (OtgError, OSError, http.client.HTTPException)
+
+class ControllerPool:
+    """
+    A set of controllers, each running one job at a time. acquire() hands
+    the caller any idle controller (work stealing: whoever is free next
+    takes the next job). A controller that fails is taken out for
+    `cooldown` seconds and must answer a health probe before it is used
+    again.
+    """
+
+    def __init__(self, apis, cooldown=10.0):
+        self.apis = list(dict.fromkeys(apis))
+        self.cooldown = cooldown
+        self._cond = threading.Condition()
+        self._busy = set()
+        self._down = {}        # api -> monotonic time when it may be probed again
+        self.stats = {a: {'jobs': 0, 'failures': 0, 'busy_s': 0.0} for a in self.apis}
+        self._since = {}
+        with ThreadPoolExecutor(max_workers=max(1, len(self.apis))) as pool:
+            alive = dict(zip(self.apis, pool.map(lambda a: get_client(a).ping(), self.apis)))
+        for a, ok in alive.items():
+            if not ok:
+                print(f"[otg] WARN: controller {a} is not reachable; will re-probe in {cooldown:.0f}s")
+                self._down[a] = time.monotonic() + cooldown
+        if not any(alive.values()):
+            raise OtgError(f"no reachable controller among {', '.join(self.apis)}")
+
+    def acquire(self, exclude=()):
+        """Block until a controller not in exclude is idle and healthy; returns its URL."""
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    usable = [a for a in self.apis if a not in exclude]
+                    if not usable:
+                        raise OtgError("no controller left to try")
+                    free = [a for a in usable if a not in self._busy and self._down.get(a, 0) <= now]
+                    if free:
+                        api = free[0]
+                        self._busy.add(api)
+                        break
+                    retry = [t for a, t in self._down.items() if a in usable and a not in self._busy]
+                    self._cond.wait(max(0.05, min(retry) - now) if retry else None)
+            if api not in self._down or get_client(api).ping():
+                with self._cond:
+                    self._down.pop(api, None)
+                    self._since[api] = time.monotonic()
+                return api
+            self.release(api, ok=False, counted=False)
+
+    def release(self, api, ok=True, counted=True):
+        with self._cond:
+            self._busy.discard(api)
+            if counted:
+                st = self.stats[api]
+                st['jobs'] += 1
+                st['busy_s'] += time.monotonic() - self._since.pop(api, time.monotonic())
+                if not ok:
+                    st['failures'] += 1
+            if not ok:
+                self._down[api] = time.monotonic() + self.cooldown
+            self._cond.notify_all()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# report.py — markdown report (+ charts) for the newest bench / DSL / scale CSV
+#
+# Charts are named after a hash of the data they plot and are only drawn when
+# that file does not exist yet, so an unchanged CSV reuses its images and an
+# older report keeps pointing at its own charts. matplotlib is imported only
+# when a chart actually has to be drawn.
+#
+#   ./report.py                       # newest CSV in results/runs
+#   ./report.py ../results/runs/bench_dsl_20250101_120000.csv
+import argparse, csv, glob, hashlib, json, os, sys, time
+
+OUTDIR = '../results'
+RUNS_DIR = os.path.join(OUTDIR, 'runs')
+CSV_GLOBS = ('bench_*.csv', 'scale_*.csv')        # bench_* also matches bench_dsl_*
+SAFE_LOSS_PCT = 0.1
+LATENCY_COLUMNS = ('lat_min_us', 'lat_avg_us', 'lat_max_us', 'lat_p50_us', 'lat_p90_us', 'lat_p99_us')
+CHART_VERSION = 1          # bump when the drawing code changes, to invalidate cached charts
+
+def latest_csv(runs_dir=RUNS_DIR):
+    paths = [p for g in CSV_GLOBS for p in glob.glob(os.path.join(runs_dir, g))]
+    return max(paths, key=os.path.getmtime) if paths else None
+
+def _int(x):
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        return None
+
+def read_rows(path):
+    rows = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            try:
+                pps = int(row.get('pps') or 0)
+                size = int(row.get('pktsize') or row.get('size') or 0)
+            except ValueError:
+                continue
+            tx = row.get('tx_from_p1')
+            rx = row.get('rx_on_p2')
+            if tx is None:
+                tx = row.get('p1_tx')
+            if rx is None:
+                rx = row.get('p2_rx')
+            lp = row.get('loss_pct')
+            try:
+                loss = float(lp) if lp not in (None, 'NA', '') else None
+            except ValueError:
+                loss = None
+            rows.append({'name': row.get('name', ''), 'pps': pps, 'pktsize': size, 'tx': _int(tx), 'rx': _int(rx),
+                         'loss_pct': loss, 'lat': {k: row.get(k) or '' for k in LATENCY_COLUMNS}})
+    return rows
+
+def best_pps(group, thresh=SAFE_LOSS_PCT):
+    ok = [g['pps'] for g in group if g['loss_pct'] is not None and g['loss_pct'] <= thresh]
+    return max(ok) if ok else None
+
+def main_section(csv_path, rows, by_size):
+    loss_values = [r['loss_pct'] for r in rows if r['loss_pct'] is not None]
+    avg_loss = round(sum(loss_values) / len(loss_values), 3) if loss_values else 0.0
+    lines = ["# OTG Bench Report\n", f"**Source CSV:** `{csv_path}`\n", "## Top takeaways\n",
+             f"- Total runs: **{len(rows)}**, average loss across reported runs: **{avg_loss}%**"]
+    for size in sorted(by_size):
+        bp = best_pps(by_size[size])
+        if bp:
+            lines.append(f"- {size}B: highest pps with ≤0.1% loss → **{bp} pps**")
+        else:
+            lines.append(f"- {size}B: no run met ≤0.1% loss threshold")
+
+    lines.append("\n## Detailed results\n")
+    lines.append("| name | pps | pktsize | tx_from_p1 | rx_on_p2 | loss_pct |")
+    lines.append("|---|---:|---:|---:|---:|---:|")
+    for r in rows:
+        tx = "NA" if r['tx'] is None else str(r['tx'])
+        rx = "NA" if r['rx'] is None else str(r['rx'])
+        lp = "NA" if r['loss_pct'] is None else f"{r['loss_pct']:.3f}"
+        lines.append(f"| {r['name']} | {r['pps']} | {r['pktsize']} | {tx} | {rx} | {lp} |")
+
+    lat_rows = [r for r in rows if r['lat']['lat_avg_us']]
+    if lat_rows:
+        lines.append("\n## Latency (µs)\n")
+        lines.append("| name | pps | pktsize | min | avg | p50 | p90 | p99 | max |")
+        lines.append("|---|---:|---:|---:|---:|---:|---:|---:|---:|")
+        for r in lat_rows:
+            l = r['lat']
+            lines.append(f"| {r['name']} | {r['pps']} | {r['pktsize']} | {l['lat_min_us']} | {l['lat_avg_us']} | "
+                         f"{l['lat_p50_us']} | {l['lat_p90_us']} | {l['lat_p99_us']} | {l['lat_max_us']} |")
+    return lines
+
+def trend_section(last=30):
+    """Best safe pps per size over the newest runs of the results store (after ingesting new CSVs)."""
+    import results_store
+    store = results_store.ResultStore(os.path.join(OUTDIR, 'store'))
+    store.ingest_dir(RUNS_DIR)
+    runs = store.select_runs(last=last)
+    if not runs:
+        return []
+    lines = [f"\n## Trend (last {last} runs)\n",
+             f"| size | best safe pps (loss <= {SAFE_LOSS_PCT}%, {len(runs)} runs) |", "|---:|---:|"]
+    lines += [f"| {size} | {pps} |" for size, pps in store.best_safe_pps(runs=runs).items()]
+    return lines
+
+def ops_section(rows):
+    rs = [x for x in rows if x['loss_pct'] is not None]
+    w = max(rs, key=lambda x: x['loss_pct']) if rs else None
+    lines = ["\n## Explain like I'm ops"]
+    if w:
+        lines.append(f"- Worst loss run: **{w['name']}** ({w['pps']} pps, {w['pktsize']}B) → loss **{w['loss_pct']:.2f}%**")
+        if w['loss_pct'] > 5:
+            lines.append("- Loss is very high. Check DUT br100 members and impairment settings.")
+        elif w['loss_pct'] > 1:
+            lines.append("- Moderate loss. Verify OTG port locations and engine link states.")
+        else:
+            lines.append("- Loss is low. Consider increasing pps or adding more port pairs.")
+        lines.append("- If protocols are in use, confirm adjacencies before line-rate.")
+        lines.append("- Capture a short pcap to localize drops.")
+    else:
+        lines.append("- No loss figure available; verify controller metrics parsing.")
+        lines.append("- Traffic ran but loss data was not present.")
+    return lines
+
+# --- charts ----------------------------------------------------------------
+
+def _draw_loss_vs_pps(plt, data):
+    for size, xs, ys in data:
+        plt.plot(xs, ys, marker='o', label=f"{size}B")
+    plt.xlabel("pps")
+    plt.ylabel("loss %")
+    plt.title("Loss vs PPS (by packet size)")
+    plt.legend()
+
+def _draw_best_safe(plt, data):
+    plt.bar([str(k) for k, _ in data], [v for _, v in data])
+    plt.xlabel("packet size (B)")
+    plt.ylabel("pps")
+    plt.title("Best safe PPS (≤0.1% loss)")
+
+CHARTS = {'loss_vs_pps': _draw_loss_vs_pps, 'best_safe_pps': _draw_best_safe}
+
+def chart(kind, data, chart_dir):
+    """
+    Path (relative to the report) of the chart for data, drawing it only if
+    no chart of this data exists yet. Returns None if it must be drawn and
+    matplotlib is not installed.
+    """
+    blob = json.dumps([CHART_VERSION, kind, data], separators=(',', ':'))
+    fn = f"{kind}_{hashlib.sha256(blob.encode()).hexdigest()[:16]}.png"
+    path = os.path.join(chart_dir, fn)
+    if not os.path.exists(path):
+        try:
+            import matplotlib
+            matplotlib.use("Agg")
+            import matplotlib.pyplot as plt
+        except ImportError:
+            return None
+        fig = plt.figure()
+        CHARTS[kind](plt, data)
+        tmp = path + '.tmp.png'
+        fig.savefig(tmp, bbox_inches='tight')
+        plt.close(fig)
+        os.replace(tmp, path)
+    return f"charts/{fn}"
+
+def charts_section(by_size, chart_dir):
+    loss = []
+    for size in sorted(by_size):
+        pts = [(r['pps'], r['loss_pct']) for r in by_size[size] if r['loss_pct'] is not None]
+        if pts:
+            loss.append([size, [p for p, _ in pts], [l for _, l in pts]])
+    safe = [[size, best_pps(by_size[size]) or 0] for size in sorted(by_size)]
+    loss_fn = chart('loss_vs_pps', loss, chart_dir)
+    best_fn = chart('best_safe_pps', safe, chart_dir)
+    if loss_fn is None or best_fn is None:
+        print("[report] matplotlib not installed; charts skipped", file=sys.stderr)
+        return []
+    return ["\n## Charts", f"![Loss vs PPS]({loss_fn})\n", f"![Best safe PPS]({best_fn})"]
+
+def build_report(csv_path, out_path, charts=True, trend=True):
+    rows = read_rows(csv_path)
+    by_size = {}
+    for r in rows:
+        by_size.setdefault(r['pktsize'], []).append(r)
+    lines = main_section(csv_path, rows, by_size)
+    if trend:
+        lines += trend_section()
+    lines += ops_section(rows)
+    if charts and rows:
+        chart_dir = os.path.join(os.path.dirname(out_path), 'charts')
+        os.makedirs(chart_dir, exist_ok=True)
+        lines += charts_section(by_size, chart_dir)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    return out_path
+
+def main():
+    ap = argparse.ArgumentParser(description='Markdown report for a bench/DSL/scale CSV')
+    ap.add_argument('csv', nargs='?', help='CSV to report on (default: newest in results/runs)')
+    ap.add_argument('--no-charts', action='store_true')
+    ap.add_argument('--no-trend', action='store_true', help='skip ingesting into the results store')
+    args = ap.parse_args()
+    csv_path = args.csv or latest_csv()
+    if not csv_path:
+        sys.exit(f"No CSV found in {RUNS_DIR}")
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    out = os.path.join(OUTDIR, f"report_{time.strftime('%Y%m%d_%H%M%S')}.md")
+    build_report(csv_path, out, charts=not args.no_charts, trend=not args.no_trend)
+    print(f"Wrote {out}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# results_store.py — append-only columnar store for bench / DSL / scale CSVs
+#
+# Every CSV is ingested once. Its rows are appended to one binary file per
+# column (float64 numbers, NaN for missing; strings dictionary-encoded as
+# int32 codes). runs.jsonl is the manifest and the index: one line per
+# ingested CSV with its run timestamp, row range and the row ids for every
+# (ns, controller, pair, size, pps) key in it. The manifest line is written
+# last and defines how many column rows are valid, so an ingest that dies
+# halfway is truncated away by the next one, torn manifest line included.
+#
+#   ./results_store.py ingest                      # every new CSV in results/runs
+#   ./results_store.py best-safe --last 30         # best pps per size with <= 0.1% loss
+#   ./results_store.py runs --last 10
+#   ./results_store.py rows --pair eth1-eth2 --size 64 --last 5
+import argparse, csv, glob, json, math, os, re, sys, time
+from array import array
+from journal import truncate_torn_tail
+
+STORE_DIR = '../results/store'
+RUNS_DIR = '../results/runs'
+CSV_GLOBS = ('bench_*.csv', 'scale_*.csv')       # bench_* also matches bench_dsl_*
+SAFE_LOSS_PCT = 0.1
+NUM_COLUMNS = ('pps', 'size', 'tx', 'rx', 'loss_pct', 'lat_avg_us', 'lat_p99_us', 'pps_p50')
+STR_COLUMNS = ('ns', 'api', 'pair', 'name')
+INDEX_FIELDS = ('ns', 'api', 'pair', 'size', 'pps')
+TS_RE = re.compile(r'(\d{8}_\d{6})')
+
+def _float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+def _kind(path):
+    base = os.path.basename(path)
+    return next((k for k in ('bench_dsl', 'scale', 'bench') if base.startswith(k + '_')), 'csv')
+
+def _run_ts(path):
+    """Run start from the <ts> in the file name, else the file's mtime."""
+    m = TS_RE.search(os.path.basename(path))
+    if m:
+        return time.mktime(time.strptime(m.group(1), '%Y%m%d_%H%M%S'))
+    return os.path.getmtime(path)
+
+def normalize(row):
+    """One CSV row of any of the bench/DSL/scale layouts -> store fields."""
+    return {
+        'ns': row.get('ns') or '', 'api': row.get('api') or '', 'pair': row.get('pair') or '',
+        'name': row.get('name') or '',
+        'pps': _float(row.get('pps')), 'size': _float(row.get('pktsize') or row.get('size')),
+        'tx': _float(row.get('p1_tx') or row.get('tx_from_p1')),
+        'rx': _float(row.get('p2_rx') or row.get('rx_on_p2')),
+        'loss_pct': _float(row.get('loss_pct')),
+        'lat_avg_us': _float(row.get('lat_avg_us')), 'lat_p99_us': _float(row.get('lat_p99_us')),
+        'pps_p50': _float(row.get('pps_p50')),
+    }
+
+def index_key(ns, api, pair, size, pps):
+    return f"{ns}|{api}|{pair}|{int(size) if size == size else ''}|{int(pps) if pps == pps else ''}"
+
+class ResultStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.runs = []
+        path = self._path('runs.jsonl')
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self.runs.append(json.loads(line))
+                    except ValueError:
+                        break       # torn last line: that ingest never completed
+        self.nrows = self.runs[-1]['end'] if self.runs else 0
+        self.sources = {r['source'] for r in self.runs}
+        self._strings = {c: self._load_strings(c) for c in STR_COLUMNS}
+        self._cache = {}
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _load_strings(self, col):
+        path = self._path(f'{col}.dict')
+        vals = []
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                vals = [json.loads(line) for line in f if line.endswith('\n')]
+        return vals
+
+    # --- ingest ------------------------------------------------------------
+
+    def _truncate(self):
+        """Drop column rows beyond the manifest and torn lines (left by an interrupted ingest)."""
+        for name in ['runs.jsonl'] + [f'{col}.dict' for col in STR_COLUMNS]:
+            if os.path.exists(self._path(name)):
+                truncate_torn_tail(self._path(name))
+        for col in NUM_COLUMNS + STR_COLUMNS:
+            path = self._path(f'{col}.col')
+            size = self.nrows * (8 if col in NUM_COLUMNS else 4)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def ingest(self, path):
+        """Append one CSV; returns its run entry, or None if it was ingested before or is empty."""
+        source = os.path.basename(path)
+        if source in self.sources:
+            return None
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = [normalize(r) for r in csv.DictReader(f)]
+        if not rows:
+            return None
+        self._truncate()
+        start, end = self.nrows, self.nrows + len(rows)
+        for col in NUM_COLUMNS:
+            with open(self._path(f'{col}.col'), 'ab') as f:
+                array('d', (r[col] for r in rows)).tofile(f)
+        for col in STR_COLUMNS:
+            vals, codes = self._strings[col], {v: i for i, v in enumerate(self._strings[col])}
+            new = []
+            for r in rows:
+                if r[col] not in codes:
+                    codes[r[col]] = len(vals)
+                    vals.append(r[col])
+                    new.append(r[col])
+            if new:
+                with open(self._path(f'{col}.dict'), 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(v) + '\n' for v in new)
+            with open(self._path(f'{col}.col'), 'ab') as f:
+                array('i', (codes[r[col]] for r in rows)).tofile(f)
+        index = {}
+        for i, r in enumerate(rows, start=start):
+            index.setdefault(index_key(*(r[k] for k in INDEX_FIELDS)), []).append(i)
+        entry = {'id': len(self.runs), 'source': source, 'kind': _kind(path), 'ts': _run_ts(path),
+                 'start': start, 'end': end, 'index': index}
+        with open(self._path('runs.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.runs.append(entry)
+        self.sources.add(source)
+        self.nrows = end
+        self._cache.clear()
+        return entry
+
+    def ingest_dir(self, runs_dir=RUNS_DIR):
+        """Ingest every CSV in runs_dir not seen before, oldest first."""
+        paths = sorted({p for g in CSV_GLOBS for p in glob.glob(os.path.join(runs_dir, g))}, key=_run_ts)
+        return [e for e in map(self.ingest, paths) if e]
+
+    # --- queries -----------------------------------------------------------
+
+    def column(self, col):
+        """Whole column as an array (strings as int32 codes); read once, then cached."""
+        if col not in self._cache:
+            a = array('d' if col in NUM_COLUMNS else 'i')
+            path = self._path(f'{col}.col')
+            if self.nrows:
+                with open(path, 'rb') as f:
+                    a.fromfile(f, self.nrows)
+            self._cache[col] = a
+        return self._cache[col]
+
+    def string(self, col, code):
+        return self._strings[col][code]
+
+    def select_runs(self, last=None, since=None, kind=None):
+        runs = [r for r in self.runs if (since is None or r['ts'] >= since) and (kind is None or r['kind'] == kind)]
+        runs.sort(key=lambda r: r['ts'])
+        return runs[-last:] if last else runs
+
+    def row_ids(self, runs, ns=None, api=None, pair=None, size=None, pps=None):
+        """Row ids of runs matching the filters, looked up through each run's index."""
+        want = dict(ns=ns, api=api, pair=pair,
+                    size=None if size is None else str(int(size)), pps=None if pps is None else str(int(pps)))
+        for r in runs:
+            for key, ids in r['index'].items():
+                parts = dict(zip(INDEX_FIELDS, key.split('|')))
+                if all(v is None or parts[k] == str(v) for k, v in want.items()):
+                    yield from ids
+
+    def rows(self, runs, cols=NUM_COLUMNS + STR_COLUMNS, **filters):
+        """Matching rows as dicts, each with its run's 'source' and 'ts'."""
+        data = {c: self.column(c) for c in cols}
+        for r in runs:
+            for i in self.row_ids([r], **filters):
+                row = {c: (self.string(c, data[c][i]) if c in STR_COLUMNS else data[c][i]) for c in cols}
+                row.update(source=r['source'], ts=r['ts'])
+                yield row
+
+    def best_safe_pps(self, last=30, threshold=SAFE_LOSS_PCT, runs=None, **filters):
+        """{size: highest pps with loss <= threshold} over the selected runs."""
+        runs = self.select_runs(last=last) if runs is None else runs
+        size, pps, loss = self.column('size'), self.column('pps'), self.column('loss_pct')
+        best = {}
+        for i in self.row_ids(runs, **filters):
+            if loss[i] <= threshold and pps[i] > best.get(size[i], -1):     # NaN loss never passes
+                best[size[i]] = pps[i]
+        return {int(s): int(p) for s, p in sorted(best.items()) if s == s}
+
+def _fmt_ts(ts):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))
+
+def main():
+    ap = argparse.ArgumentParser(description='Columnar store of bench/DSL/scale results')
+    ap.add_argument('--store', default=STORE_DIR)
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('ingest', help='ingest CSVs (default: every new one in results/runs)')
+    p.add_argument('csv', nargs='*')
+    p.add_argument('--runs-dir', default=RUNS_DIR)
+    for name, hlp in (('runs', 'list ingested runs'), ('best-safe', 'best pps per size under the loss threshold'),
+                      ('rows', 'print matching rows')):
+        p = sub.add_parser(name, help=hlp)
+        p.add_argument('--last', type=int, default=30 if name == 'best-safe' else None, help='only the newest N runs')
+        p.add_argument('--since', help='only runs at or after YYYYmmdd[_HHMMSS]')
+        p.add_argument('--kind', choices=('bench', 'bench_dsl', 'scale'))
+        if name != 'runs':
+            p.add_argument('--ns')
+            p.add_argument('--api')
+            p.add_argument('--pair')
+            p.add_argument('--size', type=int)
+            p.add_argument('--pps', type=int)
+        if name == 'best-safe':
+            p.add_argument('--threshold', type=float, default=SAFE_LOSS_PCT, help='max loss %% (default 0.1)')
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    store = ResultStore(args.store)
+    if args.cmd == 'ingest':
+        added = [e for e in map(store.ingest, args.csv) if e] if args.csv else store.ingest_dir(args.runs_dir)
+        for e in added:
+            print(f"[store] {e['source']}: {e['end'] - e['start']} rows")
+        print(f"[store] {len(added)} new CSVs, {len(store.runs)} runs / {store.nrows} rows in {store.root}")
+        return
+
+    since = None
+    if args.since:
+        s = args.since if '_' in args.since else args.since + '_000000'
+        since = time.mktime(time.strptime(s, '%Y%m%d_%H%M%S'))
+    runs = store.select_runs(last=args.last, since=since, kind=args.kind)
+    filters = {} if args.cmd == 'runs' else {k: getattr(args, k) for k in INDEX_FIELDS}
+    if args.cmd == 'runs':
+        for r in runs:
+            print(f"{r['id']:>5}  {_fmt_ts(r['ts'])}  {r['kind']:<9}  {r['end'] - r['start']:>5} rows  {r['source']}")
+    elif args.cmd == 'best-safe':
+        best = store.best_safe_pps(threshold=args.threshold, runs=runs, **filters)
+        print(f"| size | best safe pps (loss <= {args.threshold}%, {len(runs)} runs) |")
+        print("|---:|---:|")
+        for size, pps in best.items():
+            print(f"| {size} | {pps} |")
+    else:
+        w = csv.writer(sys.stdout)
+        cols = ('ns', 'api', 'pair', 'name', 'pps', 'size', 'tx', 'rx', 'loss_pct', 'lat_avg_us', 'lat_p99_us')
+        w.writerow(('run_ts',) + cols)
+        for row in store.rows(runs, **filters):
+            w.writerow([_fmt_ts(row['ts'])] + ['' if row[c] != row[c] else
+                                               int(row[c]) if c in ('pps', 'size', 'tx', 'rx') else row[c] for c in cols])
+    print(f"[store] query took {(time.perf_counter() - t0) * 1000:.1f} ms", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -1,89 +1,37 @@
 #!/usr/bin/env python3
 # run_dsl.py — run tests from a YAML/JSON DSL and produce a bench_* CSV + report
-import os, sys, json, subprocess, shlex, time, tempfile
+import os, sys, json, subprocess, time, argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import otg_client, timeseries, journal, dsl_spec
+from functools import partial
+from itertools import chain, islice
+from impair import ImpairManager, FakeExecutor, netem_key
 
 USAGE = f"""Usage:
   ./run_dsl.py path/to/tests.yaml
   ./run_dsl.py path/to/tests.json
+  ./run_dsl.py --jobs 4 path/to/tests.yaml   # up to 4 runs at once, packed into one config per controller
+  ./run_dsl.py --resume path/to/tests.yaml   # skip runs already in the journal
+  APIS="https://c1:8443;https://c2:8443" ./run_dsl.py tests.yaml   # spread runs over controllers
 """
 
-def _read_yaml_min(src: str):
-    """
-    Minimal YAML reader for simple key/value, dicts, and list-of-scalars.
-    """
-    try:
-        import yaml  # type: ignore
-        with open(src, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    except Exception:
-        pass
-    data = {}
-    stack = [(0, data)]
-    with open(src, 'r', encoding='utf-8') as f:
-        for raw in f:
-            line = raw.rstrip('\n')
-            if not line.strip() or line.lstrip().startswith('#'):
-                continue
-            indent = len(line) - len(line.lstrip(' '))
-            while stack and indent < stack[-1][0]:
-                stack.pop()
-            cur = stack[-1][1]
-            if line.lstrip().startswith('- '):
-                # list item
-                item = line.lstrip()[2:].strip()
-                if not isinstance(cur, list):
-                    # create a list under previous key if needed
-                    if isinstance(cur, dict):
-                        # last inserted key?
-                        # minimal: look back; if none, fail
-                        raise ValueError("Minimal YAML: list must follow a key")
-                    else:
-                        raise ValueError("Minimal YAML structure error")
-                cur.append(_coerce(item))
-            else:
-                if ':' not in line:
-                    raise ValueError("Minimal YAML expects 'key: value'")
-                key, val = line.lstrip().split(':', 1)
-                key = key.strip()
-                val = val.strip()
-                if not val:
-                    # a nested mapping or list follows
-                    nxt = {}
-                    if isinstance(cur, dict):
-                        cur[key] = nxt
-                    else:
-                        raise ValueError("Minimal YAML: nested value under non-dict")
-                    stack.append((indent+2, nxt))
-                else:
-                    if isinstance(cur, dict):
-                        cur[key] = _coerce(val)
-                    else:
-                        raise ValueError("Minimal YAML: key under non-dict")
-    return data
-
-def _coerce(s: str):
-    if s.lower() in ('true','false'):
-        return s.lower() == 'true'
-    if s.lower() in ('null','none'):
-        return None
-    try:
-        if s.isdigit() or (s.startswith('-') and s[1:].isdigit()):
-            return int(s)
-        # float?
-        return float(s)
-    except Exception:
-        return s
-
-def load_spec(path: str):
-    if not os.path.isfile(path):
-        sys.exit(f"DSL file not found: {path}")
-    ext = os.path.splitext(path)[1].lower()
-    if ext in ('.json',):
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    if ext in ('.yaml', '.yml'):
-        return _read_yaml_min(path)
-    sys.exit("Unsupported DSL format (use .yaml/.yml or .json)")
+DEFAULT_IFACES = "eth13 eth14 eth15 eth16"
+POLL_INTERVAL_S = 0.5
+SETTLE_S = 1.0             # rx must stay unchanged this long after transmit stops
+DEADLINE_FACTOR = 1.5      # auto deadline: expected duration * factor + slack
+DEADLINE_SLACK_S = 10.0
+CONTROLLER_RETRIES = 2     # extra attempts on other controllers after a failure
+CONTROLLER_COOLDOWN_S = 10.0
+SEARCH_DEFAULTS = {'min': 1000, 'loss_threshold': 0.1, 'tolerance': '1%', 'max_trials': 12, 'duration': 2}
+SOAK_DEFAULTS = {'duration': '1h', 'window': 60, 'interval': 1.0, 'checkpoint': 300,
+                 'drift': {'pps_pct': 5.0, 'loss_pct': 0.1, 'latency_pct': 20.0}}
+KEY_FIELDS = ('name', 'ns', 'ctrl', 'txl', 'rxl', 'src', 'dst', 'pps', 'size', 'mix', 'count', 'flows',
+              'impair', 'latency', 'search', 'soak')
+SERIES_COLUMNS = ('pps_p5', 'pps_p50', 'pps_p95', 'worst_loss_1s_pct')
+LATENCY_COLUMNS = ('lat_min_us', 'lat_avg_us', 'lat_max_us', 'lat_p50_us', 'lat_p90_us', 'lat_p99_us')
+LATENCY_MODES = ('store_forward', 'cut_through')
+# Runs packed into one OTG config must agree on these.
+PACK_KEYS = ('ctrl', 'ns', 'impair', 'latency', 'capture')
 
 def sh(cmd: str, env=None, check=True, capture=False):
     if capture:
@@ -91,138 +39,781 @@ def sh(cmd: str, env=None, check=True, capture=False):
     else:
         return subprocess.run(cmd, shell=True, env=env, check=check)
 
-def parse_table_for_counters(txt: str):
-    p1tx=p1rx=p2tx=p2rx=0
-    for line in txt.splitlines():
-        parts = [p.strip() for p in line.split('|')]
-        if len(parts) < 5: 
-            continue
-        name, tx, rx = parts[1], parts[2], parts[3]
-        if name == 'p1':
-            p1tx = int(tx) if tx.isdigit() else 0
-            p1rx = int(rx) if rx.isdigit() else 0
-        elif name == 'p2':
-            p2tx = int(tx) if tx.isdigit() else 0
-            p2rx = int(rx) if rx.isdigit() else 0
-    return p1tx, p1rx, p2tx, p2rx
-
 def loss_pct(p1tx, p2rx):
     if p1tx > 0:
         return round((p1tx - p2rx) * 100.0 / p1tx, 3)
     return 'NA'
 
-def main():
-    if len(sys.argv) != 2:
-        sys.exit(USAGE)
-    spec = load_spec(sys.argv[1])
+def read_controller_from_env_file(path='../.env'):
+    if not os.path.exists(path):
+        return ''
+    for line in open(path, 'r', encoding='utf-8'):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        # support: OTG_API=...   and   export OTG_API="..."
+        if 'OTG_API' in line:
+            # strip leading 'export ' if present
+            if line.startswith('export '):
+                line = line[len('export '):]
+            if line.startswith('OTG_API='):
+                ctrl = line.split('=',1)[1].strip().strip('"').strip("'")
+                if ctrl:
+                    return ctrl
+    return ''
+
+def controller_pool_apis(defaults):
+    """Controllers shared by runs that don't pin one: defaults.controllers or env APIS (';'-separated)."""
+    v = defaults.get('controllers', os.environ.get('APIS', ''))
+    if isinstance(v, str):
+        v = v.replace(',', ';').split(';')
+    return [str(a).strip() for a in v if str(a).strip()]
+
+def _ifaces(v):
+    if v is None:
+        return None
+    if isinstance(v, str):
+        v = v.replace(',', ' ').split()
+    return tuple(sorted(str(x) for x in v))
 
-    defaults = spec.get('defaults', {})
-    scenarios = spec.get('scenarios', [])
-    if not isinstance(scenarios, list) or not scenarios:
-        sys.exit("No scenarios in DSL file")
+def _capture_interval(v):
+    """DSL 'capture' value -> sample interval in seconds (None = off). Accepts bool, seconds or {interval: s}."""
+    if isinstance(v, dict):
+        return float(v.get('interval', 1.0)) if v.get('enabled', True) else None
+    if v is True:
+        return 1.0
+    if not v:
+        return None
+    return float(v)
+
+def _latency_mode(v, name):
+    """DSL 'latency' value -> OTG latency mode (None = off). Accepts bool, a mode or {mode: ...}."""
+    if isinstance(v, dict):
+        v = v.get('mode', 'store_forward') if v.get('enabled', True) else None
+    if v is True:
+        return 'store_forward'
+    if not v:
+        return None
+    if v not in LATENCY_MODES:
+        raise dsl_spec.SpecError(f"Scenario '{name}': latency mode must be one of {', '.join(LATENCY_MODES)}, got {v}")
+    return v
+
+def _size(v):
+    """pktsize -> (CSV size string, size mix or None); a mix reports its mean frame size."""
+    size = dsl_spec.size_spec(v)
+    return str(dsl_spec.mean_size(size)), (size if isinstance(size, tuple) else None)
+
+def _profile_flows(name, sc, pps, size, count, bidir):
+    """Flows of a multi-flow scenario; each entry inherits pps/pktsize/count/bidir from the scenario."""
+    flows = []
+    for fl in sc['flows']:
+        q1, q2 = (str(p) for p in fl['ports'])
+        fsize, fmix = _size(fl.get('pktsize', size))
+        f = dict(pps=str(dsl_spec.parse_number(fl.get('pps', pps))), size=fsize, mix=fmix,
+                 count=str(dsl_spec.parse_number(fl.get('count', count))))
+        tag = f"{name}_{fl.get('name', f'{q1}-{q2}')}"
+        flows.append(dict(f, name=f'{tag}_fwd', txl=q1, rxl=q2, src='1.1.1.1', dst='2.2.2.2'))
+        if bool(fl.get('bidir', bidir)):
+            flows.append(dict(f, name=f'{tag}_rev', txl=q2, rxl=q1, src='2.2.2.2', dst='1.1.1.1'))
+    return flows
+
+def _sizes(v):
+    if isinstance(v, (list, tuple)):
+        return [int(x) for x in v]
+    return [int(x) for x in str(v).replace('[', ' ').replace(']', ' ').replace(',', ' ').split()]
+
+def _search_spec(sc_search, def_search, pps, size, name):
+    """Normalize a scenario's 'search' block (RFC 2544-style zero-loss search); None if absent."""
+    if not sc_search:
+        return None
+    s = dict(SEARCH_DEFAULTS, max=int(float(pps)), sizes=[int(size)])
+    s.update(def_search or {})
+    if isinstance(sc_search, dict):
+        s.update(sc_search)
+    s['sizes'] = _sizes(s['sizes'])
+    s['min'], s['max'] = dsl_spec.parse_number(s['min']), dsl_spec.parse_number(s['max'])
+    s['loss_threshold'] = float(s['loss_threshold'])
+    s['max_trials'] = int(s['max_trials'])
+    s['duration'] = None if s['duration'] in (None, '', 0) else float(s['duration'])
+    tol = str(s['tolerance']).strip()
+    s['tolerance'] = max(1, int(s['max'] * float(tol[:-1]) / 100.0) if tol.endswith('%') else int(float(tol)))
+    if not 0 < s['min'] <= s['max']:
+        raise dsl_spec.SpecError(f"Scenario '{name}': search needs 0 < min <= max, got {s['min']}..{s['max']}")
+    return s
+
+def _soak_spec(sc_soak, def_soak, name):
+    """Normalize a scenario's 'soak' block (continuous traffic for 'duration'); None if absent."""
+    if not sc_soak:
+        return None
+    s = dict(SOAK_DEFAULTS)
+    for v in (def_soak, sc_soak):
+        if isinstance(v, dict):
+            s.update(v)
+        elif v is not None and v is not True:
+            s['duration'] = v
+    s['drift'] = dict(SOAK_DEFAULTS['drift'], **(s['drift'] or {}))
+    for k in ('duration', 'window', 'interval', 'checkpoint'):
+        s[k] = dsl_spec.parse_duration(s[k])
+    s['drift'] = {k: float(v) for k, v in s['drift'].items()}
+    if not 0 < s['interval'] <= s['window'] or s['duration'] <= 0 or s['checkpoint'] <= 0:
+        raise dsl_spec.SpecError(f"Scenario '{name}': soak needs 0 < interval <= window and a positive duration/checkpoint")
+    return s
+
+def build_runs(spec):
+    """
+    Expand DSL scenarios (sweeps included) into individual traffic runs, one
+    per direction. Each run carries the ports it occupies and the impairment
+    it needs, which is all the scheduler looks at. Returns (run iterator,
+    impairable ifaces); runs are generated lazily in DSL order.
+    spec['scenarios'] may be any iterable; each scenario is validated when
+    it is reached.
+    """
+    defaults = spec.get('defaults') or {}
 
     PPS      = str(defaults.get('pps', 20000))
-    SIZE     = str(defaults.get('pktsize', 512))
+    SIZE     = defaults.get('pktsize', 512)
     COUNT    = str(defaults.get('count', 50000))
     BIDIR    = bool(defaults.get('bidir', False))
     NS       = str(defaults.get('ns', os.environ.get('NS','twodut-alpine-otg')))
-    CTRL     = str(defaults.get('controller', os.environ.get('OTG_API','')))
-    if not CTRL and os.path.exists('../.env'):
-        for line in open('../.env', 'r', encoding='utf-8'):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-            # support: OTG_API=...   and   export OTG_API="..."
-            if 'OTG_API' in line:
-                # strip leading 'export ' if present
-                if line.startswith('export '):
-                    line = line[len('export '):]
-                if line.startswith('OTG_API='):
-                    CTRL = line.split('=',1)[1].strip().strip('"').strip("'")
-                    if CTRL:
-                        break
-    if not CTRL:
-        sys.exit("No controller specified (defaults.controller or env OTG_API)")
+    # With a controller pool, runs that don't name a controller get ctrl=None
+    # and are bound to whichever pool member is free when they start.
+    CTRL = None if controller_pool_apis(defaults) else str(defaults.get('controller', os.environ.get('OTG_API','')))
+    if CTRL == '':
+        CTRL = read_controller_from_env_file()
+    if CTRL == '':
+        raise dsl_spec.SpecError("No controller specified (defaults.controller(s), env OTG_API or APIS)")
 
     imp_def = defaults.get('impair', {})
     IMP_EN  = bool(imp_def.get('enabled', False))
     IMP_LOSS = str(imp_def.get('loss', 1))
     IMP_DELAY = str(imp_def.get('delay', '10ms'))
     IMP_JITTER = str(imp_def.get('jitter', '2ms'))
+    IMP_IFACES = _ifaces(imp_def.get('ifaces', os.environ.get('IFACES', DEFAULT_IFACES)))
+    SETTLE   = float(defaults.get('settle', SETTLE_S))
+    CAPTURE  = _capture_interval(defaults.get('capture'))
+    LATENCY  = _latency_mode(defaults.get('latency'), 'defaults')
+    DEADLINE = defaults.get('deadline')
+
+    def runs():
+        index = 0
+        for sc in dsl_spec.iter_scenarios(spec['scenarios'], defaults):
+            name = sc.get('name', 'unnamed')
+
+            pps   = str(sc.get('pps', PPS))
+            size, mix = _size(sc.get('pktsize', SIZE))
+            count = str(sc.get('count', COUNT))
+            bidir = bool(sc.get('bidir', BIDIR))
+            ctrl  = str(sc['controller']) if 'controller' in sc else CTRL
+            settle = float(sc.get('settle', SETTLE))
+            deadline = sc.get('deadline', DEADLINE)
+            capture = _capture_interval(sc['capture']) if 'capture' in sc else CAPTURE
+            latency = _latency_mode(sc['latency'], name) if 'latency' in sc else LATENCY
+
+            # A soak streams until stopped: its flows have no packet count.
+            soak = _soak_spec(sc.get('soak'), defaults.get('soak'), name)
+
+            imp = sc.get('impair', {})
+            impair = None
+            if bool(imp.get('enabled', IMP_EN)):
+                impair = {
+                    'loss': str(imp.get('loss', IMP_LOSS)),
+                    'delay': str(imp.get('delay', IMP_DELAY)),
+                    'jitter': str(imp.get('jitter', IMP_JITTER)),
+                    'ifaces': _ifaces(imp.get('ifaces')) or IMP_IFACES,
+                }
+
+            base = dict(scenario=name, ns=NS, pps=pps, size=size, mix=mix, count=None if soak else count, ctrl=ctrl,
+                        impair=impair, settle=settle, deadline=None if deadline is None else float(deadline),
+                        capture=capture, latency=latency, search=None, soak=soak, flows=None)
+
+            # A multi-flow scenario is a single run with all its flows in one OTG config.
+            if 'flows' in sc:
+                flows = _profile_flows(name, sc, pps, sc.get('pktsize', SIZE), count, bidir)
+                if soak:
+                    flows = [dict(f, count=None) for f in flows]
+                yield dict(base, index=index, name=name, flows=flows, txl=None, rxl=None, src=None, dst=None,
+                           ports=frozenset(p for f in flows for p in (f['txl'], f['rxl'])))
+                index += 1
+                continue
+
+            p1, p2 = (str(p) for p in sc['ports'])
+            base['ports'] = frozenset((p1, p2))
+            search = base['search'] = _search_spec(sc.get('search'), defaults.get('search'), pps, size, name)
+            # A search scenario becomes one search job per packet size and direction.
+            for sz in (search['sizes'] if search else [size]):
+                tag = f'{name}_{sz}B' if search else name
+                if search:
+                    mix = None
+                yield dict(base, size=str(sz), mix=mix, index=index, name=f'{tag}_fwd',
+                           txl=p1, rxl=p2, src='1.1.1.1', dst='2.2.2.2')
+                index += 1
+                if bidir:
+                    yield dict(base, size=str(sz), mix=mix, index=index, name=f'{tag}_rev',
+                               txl=p2, rxl=p1, src='2.2.2.2', dst='1.1.1.1')
+                    index += 1
+    return runs(), IMP_IFACES
+
+def _impair_key(impair):
+    if impair is None:
+        return None
+    return netem_key(impair['loss'], impair['delay'], impair['jitter'])
+
+def runs_conflict(a, b, all_ifaces):
+    """
+    Two runs conflict when they are pinned to the same controller, or when
+    they need different netem settings on overlapping DUT interfaces. Runs
+    without impairment need every impairable interface clean.
+
+    A controller holds one OTG config at a time (POST /config replaces it),
+    so separate runs on it can only take turns; runs that may share it go
+    into one config instead (see can_pack). A pooled run (ctrl None) holds
+    a pool member of its own for its whole cycle, and a pinned run that
+    names the same member waits for the client lock, so neither can clobber
+    the other's config.
+    """
+    if a['ctrl'] is not None and a['ctrl'] == b['ctrl']:
+        return True
+    if _impair_key(a['impair']) == _impair_key(b['impair']):
+        return False
+    scope_a = set(a['impair']['ifaces'] if a['impair'] else all_ifaces)
+    scope_b = set(b['impair']['ifaces'] if b['impair'] else all_ifaces)
+    return bool(scope_a & scope_b)
+
+def can_pack(batch, run):
+    """
+    True if run can join batch in one multi-flow OTG config: plain runs (no
+    search or soak) that agree on PACK_KEYS and use ports and flow names no
+    run of the batch uses. Flows on disjoint ports don't share counters, so
+    each run's results can be read back on their own.
+    """
+    first = batch[0]
+    if first['search'] or first['soak'] or run['search'] or run['soak']:
+        return False
+    if any(run[k] != first[k] for k in PACK_KEYS):
+        return False
+    if any(run['ports'] & r['ports'] for r in batch):
+        return False
+    names = {f['name'] for r in batch for f in run_flows(r)}
+    return not any(f['name'] in names for f in run_flows(run))
+
+class ImpairState:
+    """
+    Scheduler view of the netem settings per DUT interface. Switching goes
+    through an ImpairManager, which sends only the interfaces that change,
+    one exec per pod.
+    """
+
+    def __init__(self, manager, all_ifaces):
+        self.manager = manager
+        self.all_ifaces = tuple(all_ifaces)
+
+    def _desired(self, run):
+        imp = run['impair']
+        if imp is None:
+            return dict.fromkeys(self.all_ifaces)
+        return dict.fromkeys(imp['ifaces'], _impair_key(imp))
+
+    def satisfied(self, run):
+        return all(self.manager.current(i) == k for i, k in self._desired(run).items())
+
+    def prepare(self, run):
+        """Apply the impairment run needs. The scheduler guarantees no conflicting run is in flight."""
+        self.manager.apply(self._desired(run))
+
+    def off(self):
+        self.manager.clear()
+
+def schedule(runs, max_parallel, execute, conflict, prepare=None, prefer=None, lookahead=None, pack=None,
+             admit=None):
+    """
+    Run batches of runs with at most max_parallel runs in flight.
+
+    Runs are pulled lazily from the iterable into a window of at most
+    lookahead pending runs (default: 8 per job). Pending runs are considered
+    in order and the first one that conflicts with nothing in flight, and
+    that admit(run, batches in flight) accepts, starts a batch; runs for
+    which prefer() is true go first (e.g. those needing no impairment
+    change). Later pending runs that pack(batch, run) accepts join the
+    batch. execute(batch) runs it as one unit and returns one result per
+    run. prepare() is called from this thread with the batch's first run
+    right before the batch is submitted. Yields (run, result) as batches
+    finish.
+    """
+    source = iter(runs)
+    lookahead = lookahead or max(8, 8 * max_parallel)
+    pending = []
+    running = {}    # future -> batch
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        while True:
+            pending.extend(islice(source, lookahead - len(pending)))
+            if not (pending or running):
+                break
+            while pending:
+                room = max_parallel - sum(len(b) for b in running.values())
+                if room <= 0:
+                    break
+                batches = list(running.values())
+
+                def free(r):
+                    return not any(conflict(r, o) for b in batches for o in b)
+                startable = [r for r in pending if free(r) and (admit is None or admit(r, batches))]
+                if not startable:
+                    break
+                pick = next((r for r in startable if prefer and prefer(r)), startable[0])
+                pending.remove(pick)
+                batch = [pick]
+                for r in (list(pending) if pack else []):
+                    if len(batch) >= room:
+                        break
+                    if free(r) and pack(batch, r):
+                        pending.remove(r)
+                        batch.append(r)
+                if prepare:
+                    prepare(pick)
+                running[pool.submit(execute, batch)] = batch
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                batch = running.pop(fut)
+                yield from zip(batch, fut.result())
+
+def run_flows(run):
+    """The flows of a run: its profile, or the run itself as a single flow."""
+    if run['flows']:
+        return run['flows']
+    return [{k: run[k] for k in ('name', 'txl', 'rxl', 'src', 'dst', 'pps', 'size', 'mix', 'count')}]
+
+def expected_duration(run):
+    """Seconds the generator needs to send count packets at pps (the slowest flow for a profile)."""
+    if run.get('soak'):
+        return run['soak']['duration']
+    return max((float(f['count']) / float(f['pps']) if float(f['pps']) > 0 else 0.0) for f in run_flows(run))
+
+def run_deadline(run):
+    """Seconds to wait for a run: its deadline, or the expected duration * DEADLINE_FACTOR + DEADLINE_SLACK_S."""
+    if run['deadline'] is not None:
+        return run['deadline']
+    return expected_duration(run) * DEADLINE_FACTOR + DEADLINE_SLACK_S
+
+def packed_run(batch):
+    """A run carrying every flow of batch, for polling; the longest settle and deadline win."""
+    if len(batch) == 1:
+        return batch[0]
+    return dict(batch[0], name=f"{batch[0]['name']}+{len(batch) - 1}", flows=[f for r in batch for f in run_flows(r)],
+                ports=frozenset().union(*(r['ports'] for r in batch)), settle=max(r['settle'] for r in batch),
+                deadline=max(run_deadline(r) for r in batch))
+
+def wait_for_completion(client, run, port_names, captures=None, latencies=None):
+    """
+    Poll flow metrics until every flow has stopped transmitting and total
+    rx has not moved for run['settle'] seconds, or until the run's deadline
+    (by default the expected duration * DEADLINE_FACTOR + DEADLINE_SLACK_S)
+    passes. With captures (flow name -> SeriesCapture), flow and port
+    metrics are sampled every capture interval for the whole run; with
+    latency histograms (flow name -> LatencyHistogram), every flow poll is
+    folded into them. Returns (seconds waited, timed_out).
+    """
+    captures, latencies = captures or {}, latencies or {}
+    names = [f['name'] for f in run_flows(run)]
+    expected = expected_duration(run)
+    settle = run['settle']
+    deadline_s = run_deadline(run)
+    if captures:
+        interval = min(c.interval for c in captures.values())
+    else:
+        interval = min(POLL_INTERVAL_S, max(settle / 2, 0.05))
+    start = time.monotonic()
+    if not captures and not latencies:
+        # Nothing can finish before the expected duration; don't poll during it.
+        time.sleep(min(expected, deadline_s))
+    last_rx, stable_since, tick = None, None, 0
+    while True:
+        now = time.monotonic()
+        flows = client.flow_metrics(names)
+        if captures:
+            ports = client.port_metrics(port_names)
+            for n, cap in captures.items():
+                cap.add(now - start, flows.get(n), ports)
+        for n, lat in latencies.items():
+            lat.add(flows.get(n))
+        if len(flows) == len(names) and all(f.transmit == 'stopped' for f in flows.values()):
+            rx = sum(f.frames_rx for f in flows.values())
+            if rx != last_rx:
+                last_rx, stable_since = rx, now
+            elif now - stable_since >= settle:
+                return now - start, False
+        if now - start >= deadline_s:
+            return now - start, True
+        # Sleep to the next tick of a fixed grid so samples don't drift.
+        tick = max(tick + 1, int((time.monotonic() - start) / interval) + 1)
+        time.sleep(max(0.0, start + tick * interval - time.monotonic()))
+
+def soak_traffic(client, run, series_dir, latencies=None):
+    """
+    Stream the run's flows (started, with no packet count) for the soak
+    duration, folding every poll into a per-flow SoakAggregator. Every
+    checkpoint interval, and at the end, one line per flow goes to
+    <series_dir>/<run>.soak.jsonl. Then stops traffic and waits for rx to
+    settle. Returns (seconds waited, timed_out, summary).
+    """
+    s, latencies = run['soak'], latencies or {}
+    names = [f['name'] for f in run_flows(run)]
+    aggs = {n: timeseries.SoakAggregator(s['window'], s['interval']) for n in names}
+    os.makedirs(series_dir, exist_ok=True)
+    path = os.path.join(series_dir, f"{run['name']}.soak.jsonl")
+
+    def checkpoint(out, t):
+        drift = {}
+        for n, a in aggs.items():
+            d = a.drift(**s['drift'])
+            out.write(json.dumps({'t': round(t, 3), 'flow': n, 'frames_tx': a.frames_tx, 'frames_rx': a.frames_rx,
+                                  'rolling': a.rolling(), 'first': a.first, 'last': a.last, 'drift': d}) + '\n')
+            if d:
+                drift[n] = d
+        out.flush()
+        rolling = [a.rolling() for a in aggs.values()]
+        rx = sum(r['rx_pps'] or 0 for r in rolling)
+        loss = max((r['loss_pct'] for r in rolling if r['loss_pct'] is not None), default=None)
+        lat = [r['lat_avg_us'] for r in rolling if r['lat_avg_us'] is not None]
+        print(f"[DSL] soak {run['name']} t={t:.0f}s: rx {rx:.0f} pps, loss {'NA' if loss is None else loss}%"
+              + (f", lat {max(lat)} us" if lat else '') + (f", DRIFT {drift}" if drift else ''))
+        return drift
+
+    start = time.monotonic()
+    next_ckpt, tick = s['checkpoint'], 0
+    with open(path, 'w', encoding='utf-8') as out:
+        while True:
+            t = time.monotonic() - start
+            flows = client.flow_metrics(names)
+            for n, a in aggs.items():
+                a.add(t, flows.get(n))
+            for n, lat in latencies.items():
+                lat.add(flows.get(n))
+            if t >= s['duration']:
+                drift = checkpoint(out, t)
+                break
+            if t >= next_ckpt:
+                checkpoint(out, t)
+                next_ckpt += s['checkpoint']
+            tick = max(tick + 1, int((time.monotonic() - start) / s['interval']) + 1)
+            time.sleep(max(0.0, start + tick * s['interval'] - time.monotonic()))
+
+    client.stop_traffic()
+    # Let frames still in flight arrive before the final counters are read.
+    last_rx, stable_since, end = None, None, time.monotonic() + DEADLINE_SLACK_S
+    while True:
+        now = time.monotonic()
+        rx = sum(f.frames_rx for f in client.flow_metrics(names).values())
+        if rx != last_rx:
+            last_rx, stable_since = rx, now
+        elif now - stable_since >= run['settle']:
+            timed_out = False
+            break
+        if now >= end:
+            timed_out = True
+            break
+        time.sleep(min(POLL_INTERVAL_S, max(run['settle'] / 2, 0.05)))
+    if drift:
+        print(f"[DSL] WARN: soak {run['name']} drifted between first and last window: {drift}")
+    summary = {'kind': 'soak', 'name': run['name'], 'duration_s': round(t, 3), 'window_s': s['window'],
+               'thresholds': s['drift'], 'drift': bool(drift), 'path': path,
+               'flows': {n: {'first': a.first, 'last': a.last, 'windows': len(a.windows) if a.first else 0,
+                             'drift': a.drift(**s['drift'])} for n, a in aggs.items()}}
+    return time.monotonic() - start, timed_out, summary
+
+def run_batch(batch, series_dir=None):
+    """
+    Run the flows of every run in batch in one OTG config (see can_pack)
+    and return, per run, [(row run, counters)] with one row per flow. A
+    single-flow run reports its port counters; in a profile, tx/rx come
+    from the flow's own counters (ports are shared).
+    """
+    for r in batch:
+        if r['flows']:
+            print(f"[DSL] Run: {r['name']}  flows={len(r['flows'])} ports={','.join(sorted(r['ports']))} "
+                  f"impair={r['impair'] is not None}")
+        else:
+            print(f"[DSL] Run: {r['name']}  ports={r['txl']}->{r['rxl']}  pps={r['pps']} "
+                  f"size={'mix' if r['mix'] else r['size']} {'soak=%gs' % r['soak']['duration'] if r['soak'] else 'count=' + str(r['count'])} impair={r['impair'] is not None}")
+    if len(batch) > 1:
+        print(f"[DSL] Packed {len(batch)} runs into one config on {batch[0]['ctrl']}")
+    run = packed_run(batch)
+    flows = run_flows(run)
+    client = otg_client.get_client(run['ctrl'])
+    captures, soak = {}, None
+    # A soak writes its own bounded checkpoints instead of a full series.
+    if run['capture'] and series_dir and not run['soak']:
+        os.makedirs(series_dir, exist_ok=True)
+        captures = {f['name']: timeseries.SeriesCapture(os.path.join(series_dir, f"{f['name']}.jsonl"), run['capture'])
+                    for f in flows}
+    latencies = {f['name']: timeseries.LatencyHistogram() for f in flows} if run['latency'] else {}
+    cfg = otg_client.traffic_config([dict(f, size=f['mix'] or f['size']) for f in flows], latency=run['latency'])
+    port_of = {p['location']: p['name'] for p in cfg['ports']}
+    with client.lock:
+        client.set_config(cfg)
+        client.start_traffic()
+        try:
+            if run['soak']:
+                waited, timed_out, soak = soak_traffic(client, run, series_dir or '../results/runs', latencies)
+            else:
+                waited, timed_out = wait_for_completion(client, run, list(port_of.values()), captures, latencies)
+        finally:
+            for cap in captures.values():
+                cap.close()
+        ports = client.port_metrics(list(port_of.values()))
+        profiles = [f['name'] for r in batch if r['flows'] for f in r['flows']]
+        flow_metrics = client.flow_metrics(profiles) if profiles else {}
+        client.stop_traffic()
+    if timed_out:
+        print(f"[DSL] WARN: {run['name']} did not settle within {waited:.1f}s; counters may be partial")
+    results = []
+    for member in batch:
+        rows = []
+        for f in run_flows(member):
+            tx, rx = ports.get(port_of[f['txl']]), ports.get(port_of[f['rxl']])
+            fm = flow_metrics.get(f['name'])
+            summary = captures[f['name']].summary() if captures else {}
+            if latencies:
+                summary.update(latencies[f['name']].summary())
+            counters = {
+                'api': member['ctrl'],
+                'p1_tx': (fm.frames_tx if fm else 0) if member['flows'] else (tx.frames_tx if tx else 0),
+                'p1_rx': tx.frames_rx if tx else 0,
+                'p2_tx': rx.frames_tx if rx else 0,
+                'p2_rx': (fm.frames_rx if fm else 0) if member['flows'] else (rx.frames_rx if rx else 0),
+                'expected_s': round(expected_duration(member), 3), 'wait_s': round(waited, 3), 'timed_out': timed_out,
+                **{k: summary.get(k, '') for k in SERIES_COLUMNS + LATENCY_COLUMNS},
+            }
+            if soak:
+                counters['soak'] = soak
+            rows.append((dict(member, **f) if member['flows'] else member, counters))
+        results.append(rows)
+    return results
+
+def search_rate(run, trial):
+    """
+    Binary search for the highest pps in [min, max] whose loss is at or
+    below loss_threshold, stopping once the pass/fail bracket is within
+    tolerance or max_trials is reached. Each trial runs for 'duration'
+    seconds (count = pps * duration), or 'count' packets when duration is
+    unset. Returns ([(trial_run, counters), ...], summary).
+    """
+    s = run['search']
+    rows, path = [], []
+
+    def attempt(pps):
+        count = int(pps * s['duration']) if s['duration'] else int(run['count'])
+        t = dict(run, pps=str(pps), count=str(max(1, count)), name=f"{run['name']}_t{len(path) + 1}")
+        c = trial(t)[0][1]
+        loss = loss_pct(c['p1_tx'], c['p2_rx'])
+        ok = loss != 'NA' and loss <= s['loss_threshold']
+        rows.append((t, c))
+        path.append({'pps': pps, 'loss_pct': loss, 'pass': ok})
+        print(f"[DSL] search {run['name']}: {pps} pps -> loss {loss}% {'PASS' if ok else 'FAIL'}")
+        return ok
+
+    best, fail = None, None
+    if attempt(s['max']):
+        best = s['max']
+    elif attempt(s['min']):
+        best, fail = s['min'], s['max']
+        while fail - best > s['tolerance'] and len(path) < s['max_trials']:
+            mid = (best + fail) // 2
+            if attempt(mid):
+                best = mid
+            else:
+                fail = mid
+    summary = {'name': run['name'], 'pair': f"{run['txl']}-{run['rxl']}", 'pktsize': int(run['size']),
+               'loss_threshold': s['loss_threshold'], 'tolerance': s['tolerance'],
+               'converged_pps': best, 'lowest_fail_pps': fail, 'trials': len(path), 'path': path}
+    return rows, summary
+
+def run_pooled(batch, pool, series_dir=None, retries=CONTROLLER_RETRIES):
+    """
+    Run a batch on the next free controller of the pool. If the controller
+    fails, retry on a different one, up to `retries` more times.
+    """
+    tried = []
+    while True:
+        api = pool.acquire(exclude=tried)
+        try:
+            result = run_batch([dict(r, ctrl=api) for r in batch], series_dir)
+        except otg_client.CONTROLLER_ERRORS as e:
+            pool.release(api, ok=False)
+            tried.append(api)
+            if len(tried) > retries or len(tried) == len(pool.apis):
+                raise
+            print(f"[DSL] WARN: {batch[0]['name']} failed on {api} ({e}); retrying on another controller")
+            continue
+        pool.release(api)
+        return result
+
+def execute(batch, series_dir=None, pool=None, retries=CONTROLLER_RETRIES):
+    """
+    Scheduler entry point: a batch of plain runs sharing one OTG config, or
+    a single search or soak job. Returns (rows, search or soak summary) per
+    run.
+    """
+    run = batch[0]
+    if run['ctrl'] is None:
+        trial = partial(run_pooled, pool=pool, series_dir=series_dir, retries=retries)
+    else:
+        trial = partial(run_batch, series_dir=series_dir)
+    if run['search']:
+        return [search_rate(run, lambda t: trial([t])[0])]
+    return [(rows, rows[0][1].get('soak') if r['soak'] else None) for r, rows in zip(batch, trial(batch))]
+
+def run_key(run):
+    """Journal key: hash of everything that determines what a run measures."""
+    return journal.param_key({k: run[k] for k in KEY_FIELDS})
+
+def csv_row(run, c):
+    return (f"{run['ns']},{c['api']},{run['txl']}-{run['rxl']},{run['name']},{run['pps']},{run['size']},"
+            f"{c['p1_tx']},{c['p1_rx']},{c['p2_tx']},{c['p2_rx']},{loss_pct(c['p1_tx'],c['p2_rx'])},"
+            f"{c['expected_s']},{c['wait_s']},{int(c['timed_out'])},"
+            + ",".join(str(c[k]) for k in SERIES_COLUMNS + LATENCY_COLUMNS) + "\n")
+
+def run_scenarios(scenarios, defaults=None, jobs=None, capture=None, impair_dry_run=False,
+                  resume=False, journal_path=None, name='dsl', report=True):
+    """
+    Library entry point: run scenarios (a list, or any iterable such as a
+    generator, of DSL scenario dicts) under defaults, exactly as the CLI runs
+    a spec file. name picks the default journal file. Returns a dict with
+    the CSV path, the search and soak summaries and run counts. Raises
+    dsl_spec.SpecError for an invalid scenario (also when it is only
+    reached mid-run, runs are expanded lazily) and otg_client.OtgError
+    when no controller of the pool is reachable.
+    """
+    defaults = dsl_spec.validate_defaults(defaults or {})
+    runs, all_ifaces = build_runs({'defaults': defaults, 'scenarios': scenarios})
+    first = next(runs, None)
+    if first is None:
+        raise dsl_spec.SpecError("No scenarios")
+    runs = chain([first], runs)
+    apis = controller_pool_apis(defaults)
+    pool = None
+    if apis:
+        pool = otg_client.ControllerPool(apis, cooldown=float(defaults.get('cooldown', CONTROLLER_COOLDOWN_S)))
+        print(f"[DSL] Controller pool: {' '.join(apis)}")
+    jobs = jobs or int(defaults.get('max_parallel', max(4, len(apis))))
+    retries = int(defaults.get('retries', CONTROLLER_RETRIES))
+    impair = ImpairState(ImpairManager(first['ns'], executor=FakeExecutor(echo=True) if impair_dry_run else None),
+                         all_ifaces)
+    if isinstance(scenarios, (list, tuple)):
+        print(f"[DSL] {dsl_spec.count_points({'defaults': defaults, 'scenarios': scenarios})} scenario points ({name})")
 
     outdir = '../results/runs'
     os.makedirs(outdir, exist_ok=True)
     ts = time.strftime('%Y%m%d_%H%M%S')
     csv_path = os.path.join(outdir, f'bench_dsl_{ts}.csv')
+    series_dir = os.path.join(outdir, f'series_{ts}')
+    search_path = os.path.join(outdir, f'search_{ts}.jsonl')
+    soak_path = os.path.join(outdir, f'soak_{ts}.jsonl')
+    jrnl = journal.RunJournal(journal_path or os.path.join(outdir, f'journal_{name}.jsonl'), resume=resume)
 
     with open(csv_path, 'w', encoding='utf-8') as f:
-        f.write('ns,api,pair,name,pps,pktsize,p1_tx,p1_rx,p2_tx,p2_rx,loss_pct\n')
-
-    for sc in scenarios:
-        name = sc.get('name', 'unnamed')
-        ports = sc.get('ports', [])
-        if not isinstance(ports, list) or len(ports) != 2:
-            sys.exit(f"Scenario '{name}': 'ports' must be a 2-item list, got {ports}")
-        p1, p2 = str(ports[0]), str(ports[1])
-
-        pps   = str(sc.get('pps', PPS))
-        size  = str(sc.get('pktsize', SIZE))
-        count = str(sc.get('count', COUNT))
-        bidir = bool(sc.get('bidir', BIDIR))
-        ctrl  = str(sc.get('controller', CTRL))
-
-        imp = sc.get('impair', {})
-        use_imp = bool(imp.get('enabled', IMP_EN))
-        loss = str(imp.get('loss', IMP_LOSS))
-        delay = str(imp.get('delay', IMP_DELAY))
-        jitter = str(imp.get('jitter', IMP_JITTER))
-
-        print(f"\n[DSL] Scenario: {name}  ports={p1}->{p2}  pps={pps} size={size} count={count} bidir={bidir} impair={use_imp}")
-        if use_imp:
-            env = os.environ.copy()
-            env.update({'NS': NS, 'IMP_LOSS': loss, 'IMP_DELAY': delay, 'IMP_JITTER': jitter})
-            sh('./impair_on.sh', env=env, check=True)
-
-        tmp = tempfile.NamedTemporaryFile(delete=False); tmp.close()
-        cmd = (
-            "otgen create flow -n {name} -s 1.1.1.1 -d 2.2.2.2 --size {size} -r {pps} -c {cnt} "
-            "--tx p1 --rx p2 --txl {p1} --rxl {p2} "
-            "| otgen run -k -a {api} -y -m port "
-            "| otgen transform -m port "
-            "| TERM=dumb env TERM=dumb timeout 6s otgen display --mode table > {out}"
-        ).format(name=shlex.quote(name+'_fwd'), size=size, pps=pps, cnt=count, p1=p1, p2=p2, api=ctrl, out=tmp.name)
-        sh(cmd, check=True)
-        table = open(tmp.name, 'r', encoding='utf-8').read()
-        p1tx,p1rx,p2tx,p2rx = parse_table_for_counters(table)
-        with open(csv_path, 'a', encoding='utf-8') as f:
-            f.write(f"{NS},{ctrl},{p1}-{p2},{name}_fwd,{pps},{size},{p1tx},{p1rx},{p2tx},{p2rx},{loss_pct(p1tx,p2rx)}\n")
-        time.sleep(2)
-        os.unlink(tmp.name)
-
-        if bidir:
-            tmp = tempfile.NamedTemporaryFile(delete=False); tmp.close()
-            cmd = (
-                "otgen create flow -n {name} -s 2.2.2.2 -d 1.1.1.1 --size {size} -r {pps} -c {cnt} "
-                "--tx p1 --rx p2 --txl {rp1} --rxl {rp2} "
-                "| otgen run -k -a {api} -y -m port "
-                "| otgen transform -m port "
-                "| TERM=dumb env TERM=dumb timeout 6s otgen display --mode table > {out}"
-            ).format(name=shlex.quote(name+'_rev'), size=size, pps=pps, cnt=count, rp1=p2, rp2=p1, api=ctrl, out=tmp.name)
-            sh(cmd, check=True)
-            table = open(tmp.name, 'r', encoding='utf-8').read()
-            p1tx,p1rx,p2tx,p2rx = parse_table_for_counters(table)
+        f.write('ns,api,pair,name,pps,pktsize,p1_tx,p1_rx,p2_tx,p2_rx,loss_pct,expected_s,wait_s,timed_out,'
+                + ','.join(SERIES_COLUMNS + LATENCY_COLUMNS) + '\n')
+
+    # A pooled batch holds a pool member for its whole cycle; don't start
+    # more of them than there are members, so waiting runs can still be
+    # packed into the next batch.
+    def admit(r, batches):
+        return r['ctrl'] is not None or sum(b[0]['ctrl'] is None for b in batches) < len(pool.apis)
+
+    # Runs finish out of order; rows are flushed in DSL order as soon as the
+    # leading run is done, so the CSV matches a serial run. Runs found in the
+    # journal are not executed; their recorded rows go into the new CSV.
+    done, next_idx, searches, soaks = {}, 0, [], []
+    stats = {'total': 0, 'resumed': 0}
+
+    def todo():
+        for r in runs:
+            stats['total'] += 1
+            r['key'] = run_key(r)
+            if capture:
+                r['capture'] = capture
+            e = jrnl.get(r['key'])
+            if e is None:
+                yield r
+            else:
+                stats['resumed'] += 1
+                done[r['index']] = (e['rows'], e['search'])
+
+    def flush():
+        nonlocal next_idx
+        while next_idx in done:
+            lines, summary = done.pop(next_idx)
             with open(csv_path, 'a', encoding='utf-8') as f:
-                f.write(f"{NS},{ctrl},{p2}-{p1},{name}_rev,{pps},{size},{p1tx},{p1rx},{p2tx},{p2rx},{loss_pct(p1tx,p2rx)}\n")
-            time.sleep(2)
-            os.unlink(tmp.name)
+                f.writelines(lines)
+            if summary:
+                soak = summary.get('kind') == 'soak'
+                (soaks if soak else searches).append(summary)
+                with open(soak_path if soak else search_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(summary) + '\n')
+            next_idx += 1
 
-        if use_imp:
-            sh('./impair_off.sh', check=True)
+    t0 = time.time()
+    try:
+        for run, (rows, summary) in schedule(todo(), jobs, partial(execute, series_dir=series_dir, pool=pool, retries=retries),
+                                             conflict=lambda a, b: runs_conflict(a, b, all_ifaces),
+                                             prepare=impair.prepare, prefer=impair.satisfied, pack=can_pack,
+                                             admit=admit if pool else None):
+            lines = [csv_row(r, counters) for r, counters in rows]
+            jrnl.record(run['key'], run['name'], lines, summary)
+            done[run['index']] = (lines, summary)
+            flush()
+        flush()
+    finally:
+        impair.off()
+        jrnl.close()
+
+    for sm in searches:
+        conv = 'none' if sm['converged_pps'] is None else f"{sm['converged_pps']} pps"
+        print(f"[DSL] search {sm['name']}: converged {conv} (<= {sm['loss_threshold']}% loss) in {sm['trials']} trials")
+    if searches:
+        print(f"[DSL] Wrote search paths: {search_path}")
+    for sm in soaks:
+        print(f"[DSL] soak {sm['name']}: {sm['duration_s']:.0f}s, "
+              + ('DRIFT ' + ', '.join(f"{n}: {v['drift']}" for n, v in sm['flows'].items() if v['drift'])
+                 if sm['drift'] else 'no drift beyond thresholds'))
+    if soaks:
+        print(f"[DSL] Wrote soak summaries: {soak_path} (checkpoints in {series_dir})")
+
+    if pool:
+        for api, st in pool.stats.items():
+            print(f"[DSL] controller {api}: {st['jobs']} jobs, {st['failures']} failed, busy {st['busy_s']:.1f}s")
+    if resume:
+        print(f"[DSL] Resumed {stats['resumed']} runs from {jrnl.path}")
+    print(f"\n[DSL] {stats['total'] - stats['resumed']} of {stats['total']} runs in {time.time()-t0:.1f}s (jobs={jobs})")
+    print(f"[DSL] Wrote CSV: {csv_path}")
+    if report:
+        sh('./report.sh', check=True)
+        print("[DSL] Report generated (latest in results/).")
+    return {'csv': csv_path, 'searches': searches, 'soaks': soaks, 'runs': stats['total'], 'resumed': stats['resumed']}
 
-    print(f"\n[DSL] Wrote CSV: {csv_path}")
-    sh('./report.sh', check=True)
-    print("[DSL] Report generated (latest in results/).")
+def main():
+    ap = argparse.ArgumentParser(usage=USAGE)
+    ap.add_argument('spec', help='DSL file (.yaml/.yml/.json)')
+    ap.add_argument('-j', '--jobs', type=int, default=None,
+                    help='max runs in flight (default: defaults.max_parallel or 4)')
+    ap.add_argument('--capture', type=float, nargs='?', const=1.0, default=None, metavar='SECONDS',
+                    help='sample metrics every SECONDS (default 1) for every run into results/runs/series_<ts>/')
+    ap.add_argument('--impair-dry-run', action='store_true',
+                    help='print the netem changes instead of running kubectl exec')
+    ap.add_argument('--resume', action='store_true',
+                    help='skip runs already completed in the journal and reuse their rows')
+    ap.add_argument('--journal', default=None,
+                    help='journal file (default: results/runs/journal_<spec name>.jsonl)')
+    args = ap.parse_args()
+    try:
+        spec = dsl_spec.load_spec(args.spec)
+        run_scenarios(spec['scenarios'], spec.get('defaults'), jobs=args.jobs, capture=args.capture,
+                      impair_dry_run=args.impair_dry_run, resume=args.resume, journal_path=args.journal,
+                      name=os.path.splitext(os.path.basename(args.spec))[0])
+    except dsl_spec.SpecError as e:
+        sys.exit(f"DSL error: {e}")
+    except otg_client.OtgError as e:
+        sys.exit(f"[DSL] {e}")
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# scale_matrix.py — multi-port / multi-node scaler (asyncio)
+#
+# Runs one flow per (controller, port pair, direction). POST /config
+# replaces a controller's whole config, so each controller gets one job: a
+# config holding all of its pair/direction flows, started together. At most
+# CONC controllers run at once and each one's HTTP requests go through a
+# token bucket of CTRL_RPS requests per second. Every flow reports its own
+# tx/rx counters (p1_tx, p2_rx) next to the counters of its tx and rx ports
+# (p1_rx, p2_tx), and rows go through a single writer task, so they never
+# interleave. A progress line shows the achieved pps summed over all
+# running flows.
+#
+#   PORT_PAIRS="eth1,eth2;eth3,eth4" BIDIR=1 PPS=10000 ./scale_matrix.py
+#   APIS="https://c1:8443;https://c2:8443" CONC=4 ./scale_matrix.py
+import argparse, asyncio, os, sys, time
+import otg_client
+from run_dsl import loss_pct, read_controller_from_env_file
+
+POLL_INTERVAL_S = 0.5
+SETTLE_S = 1.0
+DEADLINE_FACTOR = 1.5
+DEADLINE_SLACK_S = 10.0
+PROGRESS_INTERVAL_S = 1.0
+CSV_HEADER = "ns,api,pair,name,pps,pktsize,p1_tx,p1_rx,p2_tx,p2_rx,loss_pct\n"
+
+class RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self._tokens = self.burst
+        self._t = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._t) * self.rate)
+                self._t = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class Controller:
+    def __init__(self, api, rps):
+        self.api = api
+        self.client = otg_client.OtgClient(api)
+        self.limiter = RateLimiter(rps)
+
+    async def call(self, method, *args):
+        """Run one blocking client request in a thread, after taking a rate-limit token."""
+        await self.limiter.acquire()
+        return await asyncio.to_thread(getattr(self.client, method), *args)
+
+class Progress:
+    def __init__(self, total):
+        self.total = total
+        self.done = self.failed = 0
+        self.rates = {}          # (api, flow) of running flows -> latest tx rate
+        self.t0 = time.monotonic()
+
+    def line(self):
+        return (f"[scale] {self.done + self.failed}/{self.total} done ({self.failed} failed), "
+                f"{len(self.rates)} running, {sum(self.rates.values()):,.0f} pps aggregate, "
+                f"{time.monotonic() - self.t0:.0f}s")
+
+async def run_job(ctrl, flows, args, progress):
+    """
+    Push all flows of one controller in one config, start them together and
+    wait until every flow has finished and total rx has settled. Returns
+    one CSV row per flow.
+    """
+    names = [name for name, _, _ in flows]
+    cfg = otg_client.traffic_config([dict(name=name, txl=txl, rxl=rxl, size=args.size, pps=args.pps, count=args.pkts)
+                                     for name, txl, rxl in flows])
+    port_of = {p['location']: p['name'] for p in cfg['ports']}
+    expected = args.pkts / float(args.pps)
+    deadline = expected * DEADLINE_FACTOR + DEADLINE_SLACK_S
+    await ctrl.call('set_config', cfg)
+    await ctrl.call('start_traffic')
+    start = time.monotonic()
+    last_rx, stable_since = None, None
+    try:
+        while True:
+            await asyncio.sleep(POLL_INTERVAL_S)
+            now = time.monotonic()
+            metrics = await ctrl.call('flow_metrics', names)
+            for name, flow in metrics.items():
+                if flow.transmit == 'stopped':
+                    progress.rates.pop((ctrl.api, name), None)
+                else:
+                    progress.rates[(ctrl.api, name)] = flow.frames_tx_rate
+            if len(metrics) == len(names) and all(f.transmit == 'stopped' for f in metrics.values()):
+                rx = sum(f.frames_rx for f in metrics.values())
+                if rx != last_rx:
+                    last_rx, stable_since = rx, now
+                elif now - stable_since >= SETTLE_S:
+                    break
+            if now - start >= deadline:
+                print(f"[scale] WARN: {len(names)} flows on {ctrl.api} did not settle within {deadline:.0f}s",
+                      file=sys.stderr)
+                break
+        metrics = await ctrl.call('flow_metrics', names)
+        ports = await ctrl.call('port_metrics', list(port_of.values()))
+    finally:
+        for name in names:
+            progress.rates.pop((ctrl.api, name), None)
+        await ctrl.call('stop_traffic')
+    rows = []
+    for name, txl, rxl in flows:
+        fm, tx, rx = metrics.get(name), ports.get(port_of[txl]), ports.get(port_of[rxl])
+        c = [fm.frames_tx if fm else 0, tx.frames_rx if tx else 0, rx.frames_tx if rx else 0, fm.frames_rx if fm else 0]
+        print(f"[OK] {ctrl.api} {txl}->{rxl} {name}  p1_tx={c[0]} p2_rx={c[3]}")
+        rows.append(f"{args.ns},{ctrl.api},{txl}-{rxl},{name},{args.pps},{args.size},"
+                    f"{c[0]},{c[1]},{c[2]},{c[3]},{loss_pct(c[0], c[3])}\n")
+    return rows
+
+async def writer(path, queue):
+    """The only task that touches the CSV: one row per queue item, flushed as it arrives."""
+    with open(path, 'a', encoding='utf-8') as f:
+        while True:
+            row = await queue.get()
+            if row is None:
+                return
+            f.write(row)
+            f.flush()
+
+async def reporter(progress, stop):
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), PROGRESS_INTERVAL_S)
+        except asyncio.TimeoutError:
+            print(progress.line(), file=sys.stderr)
+
+async def run_matrix(args, apis, pairs):
+    ctrls = [Controller(a, args.ctrl_rps) for a in apis]
+    alive = await asyncio.gather(*(asyncio.to_thread(c.client.ping) for c in ctrls))
+    for c, ok in zip(ctrls, alive):
+        if not ok:
+            print(f"WARN: skipping unreachable controller: {c.api}", file=sys.stderr)
+    ctrls = [c for c, ok in zip(ctrls, alive) if ok]
+    if not ctrls:
+        print("ERROR: no reachable controllers; aborting.", file=sys.stderr)
+        return 2
+
+    flows = []
+    for p1, p2 in pairs:
+        base = f"scale_{p1}_{p2}"
+        flows.append((f"{base}_fwd", p1, p2))
+        if args.bidir:
+            flows.append((f"{base}_rev", p2, p1))
+
+    print(f"APIs: {' '.join(c.api for c in ctrls)}")
+    print(f"Pairs: {' '.join(f'{a},{b}' for a, b in pairs)}")
+    print(f"Writing: {args.out}")
+    print(f"BIDIR: {int(args.bidir)}, PPS: {args.pps}, SIZE: {args.size}, PKTS: {args.pkts}, CONC: {args.conc}, "
+          f"CTRL_RPS: {args.ctrl_rps}\n")
+
+    progress = Progress(len(ctrls) * len(flows))
+    queue, stop = asyncio.Queue(), asyncio.Event()
+    sem = asyncio.Semaphore(args.conc)
+
+    async def guarded(ctrl):
+        async with sem:
+            try:
+                rows = await run_job(ctrl, flows, args, progress)
+            except otg_client.CONTROLLER_ERRORS as e:
+                progress.failed += len(flows)
+                print(f"[SKIP] {ctrl.api}: {len(flows)} flows (run failed: {e})", file=sys.stderr)
+                return
+            progress.done += len(rows)
+            for row in rows:
+                await queue.put(row)
+
+    w = asyncio.create_task(writer(args.out, queue))
+    r = asyncio.create_task(reporter(progress, stop))
+    try:
+        await asyncio.gather(*(guarded(c) for c in ctrls))
+    finally:
+        stop.set()
+        await queue.put(None)
+        await asyncio.gather(w, r)
+        for c in ctrls:
+            c.client.close()
+    print(progress.line(), file=sys.stderr)
+    return 0
+
+def main():
+    env = os.environ.get
+    ap = argparse.ArgumentParser(description='Run one flow per controller / port pair / direction')
+    ap.add_argument('--ns', default=env('NS', 'default'))
+    ap.add_argument('--pps', type=int, default=int(env('PPS', 10000)))
+    ap.add_argument('--size', type=int, default=int(env('SIZE', 512)))
+    ap.add_argument('--pkts', type=int, default=int(env('PKTS', 10000)))
+    ap.add_argument('--conc', type=int, default=int(env('CONC', 2)), help='max controllers running at once')
+    ap.add_argument('--ctrl-rps', type=float, default=float(env('CTRL_RPS', 20)),
+                    help='max HTTP requests per second to one controller')
+    ap.add_argument('--pairs', default=env('PORT_PAIRS', 'eth1,eth2'), help='"eth1,eth2;eth3,eth4"')
+    ap.add_argument('--apis', default=env('APIS', ''), help='";"-separated controller URLs (default: OTG_API)')
+    ap.add_argument('--bidir', action='store_true', default=env('BIDIR', '0') == '1')
+    ap.add_argument('--out', default=env('OUTCSV'))
+    args = ap.parse_args()
+    if args.conc < 1 or args.ctrl_rps <= 0 or args.pps <= 0:
+        ap.error('--conc, --ctrl-rps and --pps must be positive')
+
+    apis = [a for a in args.apis.split(';') if a.strip()]
+    if not apis:
+        api = env('OTG_API') or read_controller_from_env_file()
+        if not api:
+            sys.exit("Missing OTG_API in .env or APIS env var")
+        apis = [api]
+    pairs = [tuple(p.split(',')) for p in args.pairs.split(';') if p.strip()]
+    if any(len(p) != 2 for p in pairs):
+        sys.exit(f"PORT_PAIRS must look like 'eth1,eth2;eth3,eth4', got {args.pairs!r}")
+
+    outdir = '../results/runs'
+    os.makedirs(outdir, exist_ok=True)
+    args.out = args.out or os.path.join(outdir, f"scale_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+    with open(args.out, 'w', encoding='utf-8') as f:
+        f.write(CSV_HEADER)
+    rc = asyncio.run(run_matrix(args, apis, pairs))
+    if rc == 0:
+        print(f"\nDone. CSV at: {args.out}")
+    sys.exit(rc)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import pytest
+
+import dsl_spec
+import nl_run
+
+DEFS = {'pps': 20000, 'pktsize': 512, 'count': 50000, 'bidir': True,
+        'impair': {'enabled': False, 'loss': 1, 'delay': '10ms', 'jitter': '2ms'}}
+
+def expand(scenarios, defaults=None):
+    return list(dsl_spec.iter_scenarios(scenarios, defaults or {}))
+
+def test_range_and_list_sweeps_expand_to_the_cross_product():
+    out = expand([{'name': 's', 'ports': [['eth1', 'eth2'], ['eth3', 'eth4']],
+                   'pps': ['10k..30k step 10k', '50k'], 'pktsize': [64, 'imix']}])
+    assert len(out) == 2 * 4 * 2
+    assert out[0] == {'name': 's_eth1-eth2_64B_10000pps', 'ports': ['eth1', 'eth2'], 'pps': 10000, 'pktsize': 64}
+    assert out[1]['name'] == 's_eth1-eth2_64B_20000pps'
+    assert out[4]['pktsize'] == dsl_spec.IMIX and out[4]['name'] == 's_eth1-eth2_imix_10000pps'
+    assert out[-1]['ports'] == ['eth3', 'eth4'] and out[-1]['pps'] == 50000
+
+def test_defaults_sweep_and_normalize():
+    out = expand([{'name': 'a'}, {'name': 'b', 'pps': '5k'}], {'ports': ['eth1', 'eth2'], 'pps': [1000, 2000]})
+    assert [s['name'] for s in out] == ['a_1000pps', 'a_2000pps', 'b']
+    assert out[2]['pps'] == 5000
+
+def test_count_points_matches_expansion_without_materializing():
+    spec = dsl_spec.validate({'defaults': {'ports': ['eth1', 'eth2']},
+                              'scenarios': [{'name': 'a', 'pps': ['1..1000000 step 1', 7]},
+                                            {'name': 'b', 'pktsize': [64, 128]}]})
+    assert dsl_spec.count_points(spec) == 1000001 + 2
+    assert len(dsl_spec.sweep_axis('pps', '1..1000000 step 1')) == 1000000
+    small = {'scenarios': [{'name': 'a', 'ports': ['eth1', 'eth2'], 'pps': ['1k..5k step 2k', 9]}]}
+    assert dsl_spec.count_points(small) == len(list(dsl_spec.expand(small))) == 4
+
+@pytest.mark.parametrize('sc,msg', [
+    ({'pps': '1k..5k'}, 'needs a step'),
+    ({'pps': '5k..1k step 1k'}, 'lo <= hi'),
+    ({'pps': []}, 'is empty'),
+    ({'pktsize': {}}, 'size mix is empty'),
+    ({'ports': [['eth1']]}, '2-item'),
+    ({'rate': 1}, 'unknown key'),
+    ({'pps': 'fast'}, 'expected a number'),
+])
+def test_invalid_sweeps_are_rejected(sc, msg):
+    with pytest.raises(dsl_spec.SpecError, match=msg):
+        expand([dict({'name': 'x', 'ports': ['eth1', 'eth2']}, **sc)])
+
+def test_nl_yaml_round_trips_through_the_subset_parser():
+    text = ("baseline on eth1,eth2 bidir at 20kpps size 512 count 50000;"
+            "impaired on eth1,eth2 loss 0.5% delay 5ms jitter 1ms at 40kpps;"
+            "on eth1,eth2 and eth3,eth4 from 10kpps to 50kpps step 10kpps sizes 64,512,1500 unidir;"
+            "on eth5,eth6 imix")
+    scs = [nl_run.parse_clause(i, c, DEFS) for i, c in enumerate(text.split(';'), start=1)]
+    spec = dsl_spec.parse_yaml(nl_run.build_yaml_min(DEFS, scs))
+    assert spec == {'defaults': DEFS, 'scenarios': scs}
+    points = list(dsl_spec.expand(dsl_spec.validate(spec)))
+    assert len(points) == 1 + 1 + 2 * 5 * 3 + 1
+    assert points[1]['impair'] == {'enabled': True, 'loss': 0.5, 'delay': '5ms', 'jitter': '1ms'}
+
+def test_yaml_subset_matches_pyyaml():
+    yaml = pytest.importorskip('yaml')
+    text = nl_run.build_yaml(DEFS, [{'name': 'a', 'ports': [['eth1', 'eth2'], ['eth3', 'eth4']],
+                                     'pps': '1k..3k step 1k', 'pktsize': {64: 7, 1500: 1}, 'bidir': False}])
+    assert dsl_spec.parse_yaml(text) == yaml.safe_load(text)
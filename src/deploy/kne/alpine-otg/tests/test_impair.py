@@ -0,0 +1,59 @@
+import pytest
+
+import impair
+
+PODS = [('dut', 'dataplane', 'DUT'), ('ctl', 'dataplane', 'CTL')]
+NETEM = impair.netem_key(1, '10ms', '2ms')
+
+def manager(fail=()):
+    ex = impair.FakeExecutor()
+
+    def run(pod, ctr, script):
+        ex(pod, ctr, script)
+        if pod in fail:
+            raise RuntimeError('exec failed')
+    return impair.ImpairManager('ns', pods=PODS, executor=run), ex
+
+def test_one_exec_per_pod_for_all_interfaces():
+    m, ex = manager()
+    assert m.apply({'eth13': NETEM, 'eth14': NETEM}) == 2
+    assert sorted(c[0] for c in ex.calls) == ['ctl', 'dut']
+    for _, _, script in ex.calls:
+        assert script.count('tc qdisc replace') == 2
+        assert 'apk add' in script
+    assert m.current('eth13') == NETEM
+
+def test_unchanged_state_issues_no_exec():
+    m, ex = manager()
+    m.apply({'eth13': NETEM})
+    assert m.apply({'eth13': NETEM}) == 0
+    assert m.diff({'eth13': NETEM}) == {}
+    assert len(ex.calls) == 2 and m.execs == 2
+
+def test_only_the_difference_is_sent():
+    m, ex = manager()
+    m.apply({'eth13': NETEM, 'eth14': NETEM})
+    ex.calls.clear()
+    other = impair.netem_key(5, '10ms', '2ms')
+    assert m.diff({'eth13': NETEM, 'eth14': other}) == {'dut': {'eth14': other}, 'ctl': {'eth14': other}}
+    m.apply({'eth13': NETEM, 'eth14': other})
+    for _, _, script in ex.calls:
+        assert 'eth13' not in script and 'eth14' in script
+        # tc was set up by the first apply.
+        assert 'apk add' not in script
+
+def test_clear_removes_what_was_applied():
+    m, ex = manager()
+    m.apply({'eth13': NETEM})
+    ex.calls.clear()
+    assert m.clear() == 2
+    assert all('tc qdisc del dev eth13' in c[2] for c in ex.calls)
+    assert m.current('eth13') is None
+    assert m.clear() == 0
+
+def test_failed_exec_is_resent():
+    m, ex = manager(fail={'ctl'})
+    with pytest.raises(RuntimeError):
+        m.apply({'eth13': NETEM})
+    assert m.current('eth13') is impair.UNKNOWN
+    assert m.diff({'eth13': NETEM}) == {'ctl': {'eth13': NETEM}}
@@ -0,0 +1,52 @@
+import journal
+
+def test_param_key_is_order_independent():
+    assert journal.param_key({'a': 1, 'b': [1, 2]}) == journal.param_key({'b': [1, 2], 'a': 1})
+    assert journal.param_key({'a': 1}) != journal.param_key({'a': 2})
+
+def test_resume_returns_recorded_runs(tmp_path):
+    path = str(tmp_path / 'j.jsonl')
+    j = journal.RunJournal(path)
+    j.record('k1', 'run1', ['row1\n'])
+    j.record('k2', 'run2', ['row2\n'], {'kind': 'soak'})
+    j.close()
+    j = journal.RunJournal(path, resume=True)
+    assert j.get('k1')['rows'] == ['row1\n']
+    assert j.get('k2')['search'] == {'kind': 'soak'}
+    assert j.get('k3') is None
+    j.close()
+
+def test_without_resume_the_journal_starts_over(tmp_path):
+    path = str(tmp_path / 'j.jsonl')
+    j = journal.RunJournal(path)
+    j.record('k1', 'run1', [])
+    j.close()
+    j = journal.RunJournal(path)
+    assert j.get('k1') is None
+    j.close()
+    assert journal.RunJournal(path, resume=True).get('k1') is None
+
+def test_record_after_a_torn_line_survives_the_next_resume(tmp_path):
+    path = str(tmp_path / 'j.jsonl')
+    j = journal.RunJournal(path)
+    j.record('k1', 'run1', ['row1\n'])
+    j.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"key": "k2", "name": "ru')      # died mid-write
+    j = journal.RunJournal(path, resume=True)
+    assert j.get('k1') and j.get('k2') is None
+    j.record('k3', 'run3', ['row3\n'])
+    j.close()
+    j = journal.RunJournal(path, resume=True)
+    assert j.get('k1') and j.get('k3')['rows'] == ['row3\n']
+    j.close()
+
+def test_truncate_torn_tail(tmp_path):
+    path = tmp_path / 'f'
+    path.write_bytes(b'one\ntwo\nthr')
+    assert journal.truncate_torn_tail(str(path)) == 3
+    assert path.read_bytes() == b'one\ntwo\n'
+    assert journal.truncate_torn_tail(str(path)) == 0
+    path.write_bytes(b'x' * 5000)
+    assert journal.truncate_torn_tail(str(path)) == 5000
+    assert path.read_bytes() == b''
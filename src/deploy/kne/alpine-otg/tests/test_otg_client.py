@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+import otg_client
+from mock_otg import MockOtgServer
+
+@pytest.fixture
+def server():
+    s = MockOtgServer(loss=10.0, rate_scale=1000.0).start()
+    yield s
+    s.stop()
+
+def flows(count=100):
+    return [dict(name='f1', txl='eth1', rxl='eth2', size=512, pps=1000, count=count),
+            dict(name='f2', txl='eth3', rxl='eth4', size=[(64, 1), (1500, 1)], pps=1000, count=count)]
+
+def test_traffic_config_names_ports_in_order_of_use():
+    cfg = otg_client.traffic_config(flows(), latency='store_forward')
+    assert [(p['name'], p['location']) for p in cfg['ports']] == [('p1', 'eth1'), ('p2', 'eth2'),
+                                                                  ('p3', 'eth3'), ('p4', 'eth4')]
+    assert cfg['flows'][1]['tx_rx']['port'] == {'tx_name': 'p3', 'rx_names': ['p4']}
+    assert cfg['flows'][0]['metrics']['latency'] == {'enable': True, 'mode': 'store_forward'}
+    assert cfg['flows'][1]['size']['choice'] == 'weight_pairs'
+
+def test_config_traffic_and_metrics(server):
+    c = otg_client.OtgClient(server.url)
+    assert c.ping()
+    c.set_config(otg_client.traffic_config(flows()))
+    assert server.state.config['flows'][0]['name'] == 'f1'
+    c.start_traffic()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        fm = c.flow_metrics()
+        if all(m.transmit == 'stopped' for m in fm.values()):
+            break
+        time.sleep(0.01)
+    assert set(fm) == {'f1', 'f2'}
+    assert fm['f1'].frames_tx == 100 and fm['f1'].frames_rx == 90
+    assert fm['f1'].bytes_tx == 100 * 512
+    assert fm['f2'].bytes_tx == 100 * 782
+    pm = c.port_metrics(['p1', 'p4'])
+    assert set(pm) == {'p1', 'p4'}
+    assert pm['p1'].frames_tx == 100 and pm['p4'].frames_rx == 90
+    c.close()
+
+def test_stop_and_latency(server):
+    c = otg_client.OtgClient(server.url)
+    c.set_config(otg_client.flow_config('f', 'eth1', 'eth2', count=None, latency='cut_through'))
+    c.start_traffic(['f'])
+    time.sleep(0.02)
+    c.stop_traffic(['f'])
+    m = c.flow_metrics(['f'])['f']
+    assert m.transmit == 'stopped' and m.frames_tx > 0
+    assert m.frames_tx == c.flow_metrics(['f'])['f'].frames_tx
+    assert m.latency_min_ns <= m.latency_avg_ns <= m.latency_max_ns
+
+def test_connections_are_reused(server):
+    c = otg_client.OtgClient(server.url)
+    for _ in range(5):
+        c.flow_metrics()
+    assert c._pool.qsize() == 1
+    c.close()
+    assert c._pool.qsize() == 0
+
+def test_http_error_raises_otg_error(server):
+    c = otg_client.OtgClient(server.url)
+    with pytest.raises(otg_client.OtgError, match='HTTP 404'):
+        c._request('POST', '/nope', {})
+
+def test_pool_skips_unreachable_controllers(server):
+    pool = otg_client.ControllerPool([server.url, 'http://127.0.0.1:1'], cooldown=60)
+    assert pool.acquire() == server.url
+    pool.release(server.url)
+    assert pool.stats[server.url]['jobs'] == 1
+    with pytest.raises(otg_client.OtgError, match='no reachable controller'):
+        otg_client.ControllerPool(['http://127.0.0.1:1'])
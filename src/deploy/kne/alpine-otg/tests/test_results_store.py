@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+import results_store
+
+HEADER = 'ns,api,pair,name,pps,pktsize,p1_tx,p1_rx,p2_tx,p2_rx,loss_pct\n'
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HEADER)
+        for pair, name, pps, size, loss in rows:
+            f.write(f'ns1,api1,{pair},{name},{pps},{size},1000,0,0,1000,{loss}\n')
+    return str(path)
+
+@pytest.fixture
+def csvs(tmp_path):
+    return [
+        write_csv(tmp_path / 'bench_dsl_20260101_000000.csv', [('eth1-eth2', 'a', 1000, 64, 0.0),
+                                                               ('eth1-eth2', 'b', 2000, 64, 0.5)]),
+        write_csv(tmp_path / 'bench_dsl_20260102_000000.csv', [('eth3-eth4', 'c', 3000, 128, 0.0)]),
+        write_csv(tmp_path / 'bench_dsl_20260103_000000.csv', [('eth1-eth2', 'd', 1500, 64, 0.05)]),
+    ]
+
+def test_ingest_and_query(tmp_path, csvs):
+    store = results_store.ResultStore(str(tmp_path / 'store'))
+    assert [e['end'] - e['start'] for e in map(store.ingest, csvs)] == [2, 1, 1]
+    assert store.ingest(csvs[0]) is None
+    store = results_store.ResultStore(str(tmp_path / 'store'))
+    assert store.nrows == 4
+    assert store.best_safe_pps(last=None) == {64: 1500, 128: 3000}
+    assert [r['name'] for r in store.rows(store.select_runs(), pair='eth1-eth2')] == ['a', 'b', 'd']
+
+def test_interrupted_ingest_is_truncated_away(tmp_path, csvs):
+    root = str(tmp_path / 'store')
+    store = results_store.ResultStore(root)
+    store.ingest(csvs[0])
+    # Die after the columns and half of the manifest line were written.
+    with open(os.path.join(root, 'pps.col'), 'ab') as f:
+        f.write(b'\0' * 24)
+    with open(os.path.join(root, 'name.dict'), 'a', encoding='utf-8') as f:
+        f.write('"tor')
+    with open(os.path.join(root, 'runs.jsonl'), 'a', encoding='utf-8') as f:
+        f.write('{"id": 1, "source": "bench_dsl_2026')
+
+    store = results_store.ResultStore(root)
+    assert len(store.runs) == 1 and store.nrows == 2
+    store.ingest(csvs[1])
+    store.ingest(csvs[2])
+
+    store = results_store.ResultStore(root)
+    assert [r['source'] for r in store.runs] == [os.path.basename(p) for p in csvs]
+    assert store.nrows == 4
+    assert os.path.getsize(os.path.join(root, 'pps.col')) == 4 * 8
+    assert [r['name'] for r in store.rows(store.select_runs())] == ['a', 'b', 'c', 'd']
+    assert list(store.column('pps')) == [1000.0, 2000.0, 3000.0, 1500.0]
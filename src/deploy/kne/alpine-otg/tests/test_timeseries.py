@@ -0,0 +1,39 @@
+from otg_client import FlowMetrics
+
+import timeseries
+
+def poll(tx, rx, lat_ns=None):
+    return FlowMetrics(name='f', frames_tx=tx, frames_rx=rx, latency_avg_ns=lat_ns)
+
+def test_interval_latency_from_cumulative_average():
+    agg = timeseries.SoakAggregator(window_s=2, interval_s=1)
+    agg.add(0, poll(0, 0, None))
+    agg.add(1, poll(100, 100, 1000.0))      # no latency at the previous poll: not used
+    agg.add(2, poll(200, 200, 2000.0))      # interval mean: (2000*200 - 1000*100) / 100 = 3000 ns
+    w = agg.last
+    assert w['rx_pps'] == 100.0 and w['loss_pct'] == 0.0
+    assert w['lat_avg_us'] == 3.0
+
+def test_latency_missing_on_the_previous_poll_is_skipped():
+    agg = timeseries.SoakAggregator(window_s=1, interval_s=1)
+    agg.add(0, poll(1000, 1000, None))
+    agg.add(1, poll(1100, 1100, 5000.0))
+    # Using 0 for the previous average would count all 1100 frames in one interval.
+    assert agg.last['lat_avg_us'] is None
+
+def test_intervals_without_latency_do_not_dilute_the_average():
+    agg = timeseries.SoakAggregator(window_s=3, interval_s=1)
+    agg.add(0, poll(0, 0, 1000.0))
+    agg.add(1, poll(100, 100, 1000.0))
+    agg.add(2, poll(200, 200, None))
+    agg.add(3, poll(300, 300, None))
+    assert agg.last['rx_pps'] == 100.0
+    assert agg.last['lat_avg_us'] == 1.0
+
+def test_drift_against_the_first_window():
+    agg = timeseries.SoakAggregator(window_s=1, interval_s=1)
+    agg.add(0, poll(0, 0, 1000.0))
+    agg.add(1, poll(100, 100, 1000.0))
+    agg.add(2, poll(200, 150, 2000.0))     # 50 of 100 delivered, interval mean 4000 ns
+    assert agg.drift(pps_pct=10, loss_pct=1, latency_pct=10) == {
+        'rx_pps_pct': -50.0, 'loss_pct_points': 50.0, 'lat_avg_pct': 300.0}
@@ -0,0 +1,221 @@
+# timeseries.py — fixed-interval metrics capture for DSL runs
+#
+# A SeriesCapture streams one JSON line per sample (flow + port counters) to
+# a per-run file through a buffered writer and keeps just enough state to
+# summarize the run: achieved-pps percentiles over the intervals in which the
+# flow was transmitting, and the worst loss over any window of >= 1 second.
+#
+# LatencyHistogram turns OTG's cumulative flow latency (min/avg/max since the
+# flow started) into bucketed percentiles: each poll's interval-mean latency,
+# weighted by the frames received in that interval, lands in a log-spaced
+# bucket.
+#
+# SoakAggregator keeps a soak run in constant memory: the samples of the
+# current window in a ring buffer with running sums, a bounded history of
+# closed-window summaries, and the first window for drift comparison.
+import json, math
+from collections import deque
+
+WRITE_BUFFER = 1 << 16
+LOSS_WINDOW_S = 1.0
+LAT_BUCKETS_PER_DECADE = 20     # ~12% bucket width
+LAT_MIN_NS = 100.0
+SOAK_HISTORY = 60               # closed-window summaries kept per flow
+
+def percentile(sorted_vals, p):
+    """Nearest-rank percentile of an already sorted list (None if empty)."""
+    if not sorted_vals:
+        return None
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(p / 100.0 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+class SeriesCapture:
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = float(interval)
+        self._f = open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER)
+        self._prev = None
+        self._window = deque()     # (t, tx, rx) samples spanning the current loss window
+        self.samples = 0
+        self.pps = []              # achieved tx pps per transmitting interval
+        self.worst_loss = None
+
+    def add(self, t, flow, ports):
+        """Record one sample taken t seconds into the run."""
+        rec = {'t': round(t, 3)}
+        if flow is not None:
+            rec.update(transmit=flow.transmit, frames_tx=flow.frames_tx, frames_rx=flow.frames_rx,
+                       frames_tx_rate=flow.frames_tx_rate, frames_rx_rate=flow.frames_rx_rate)
+        for name, p in sorted(ports.items()):
+            rec[name] = {'frames_tx': p.frames_tx, 'frames_rx': p.frames_rx}
+        self._f.write(json.dumps(rec, separators=(',', ':')) + '\n')
+        self.samples += 1
+        if flow is None:
+            return
+
+        cur = (t, flow.frames_tx, flow.frames_rx, flow.transmit == 'started')
+        if self._prev is not None and self._prev[3] and cur[3] and cur[0] > self._prev[0]:
+            self.pps.append((cur[1] - self._prev[1]) / (cur[0] - self._prev[0]))
+        self._prev = cur
+
+        # Slide the window start forward while the window still spans LOSS_WINDOW_S.
+        self._window.append(cur[:3])
+        while len(self._window) > 2 and self._window[-1][0] - self._window[1][0] >= LOSS_WINDOW_S:
+            self._window.popleft()
+        t0, tx0, rx0 = self._window[0]
+        dtx, drx = cur[1] - tx0, cur[2] - rx0
+        if cur[0] - t0 >= LOSS_WINDOW_S and dtx > 0:
+            loss = max(0.0, (dtx - drx) * 100.0 / dtx)
+            if self.worst_loss is None or loss > self.worst_loss:
+                self.worst_loss = loss
+
+    def close(self):
+        self._f.close()
+
+    def summary(self):
+        vals = sorted(self.pps)
+        rnd = lambda v: '' if v is None else round(v, 1)
+        return {
+            'samples': self.samples,
+            'pps_p5': rnd(percentile(vals, 5)),
+            'pps_p50': rnd(percentile(vals, 50)),
+            'pps_p95': rnd(percentile(vals, 95)),
+            'worst_loss_1s_pct': '' if self.worst_loss is None else round(self.worst_loss, 3),
+        }
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = {}         # bucket index -> frames
+        self.frames = 0
+        self.min_ns = None
+        self.max_ns = None
+        self.avg_ns = None
+        self._prev = (0, 0.0)     # (frames_rx, cumulative avg ns) at the previous poll
+
+    @staticmethod
+    def _bucket(ns):
+        return int(math.floor(math.log10(max(ns, LAT_MIN_NS) / LAT_MIN_NS) * LAT_BUCKETS_PER_DECADE))
+
+    @staticmethod
+    def _mid(b):
+        return LAT_MIN_NS * 10 ** ((b + 0.5) / LAT_BUCKETS_PER_DECADE)
+
+    def add(self, flow):
+        """Fold in one flow metrics poll (an otg_client.FlowMetrics with latency fields)."""
+        if flow is None or flow.latency_avg_ns is None:
+            return
+        rx, avg = flow.frames_rx, flow.latency_avg_ns
+        prx, pavg = self._prev
+        if rx > prx:
+            interval_avg = (avg * rx - pavg * prx) / (rx - prx)
+            b = self._bucket(interval_avg)
+            self.buckets[b] = self.buckets.get(b, 0) + (rx - prx)
+            self.frames += rx - prx
+            self._prev = (rx, avg)
+        self.avg_ns = avg
+        if flow.latency_min_ns is not None:
+            self.min_ns = flow.latency_min_ns
+        if flow.latency_max_ns is not None:
+            self.max_ns = flow.latency_max_ns
+
+    def percentile_ns(self, p):
+        """Geometric midpoint of the bucket holding the p-th percentile frame, clamped to the observed min/max."""
+        if not self.frames:
+            return None
+        rank = math.ceil(p / 100.0 * self.frames)
+        seen = 0
+        for b in sorted(self.buckets):
+            seen += self.buckets[b]
+            if seen >= rank:
+                v = self._mid(b)
+                if self.max_ns is not None:
+                    v = min(v, self.max_ns)
+                if self.min_ns is not None:
+                    v = max(v, self.min_ns)
+                return v
+        return self.max_ns
+
+    def summary(self):
+        us = lambda v: '' if v is None else round(v / 1000.0, 3)
+        return {
+            'lat_min_us': us(self.min_ns), 'lat_avg_us': us(self.avg_ns), 'lat_max_us': us(self.max_ns),
+            'lat_p50_us': us(self.percentile_ns(50)), 'lat_p90_us': us(self.percentile_ns(90)),
+            'lat_p99_us': us(self.percentile_ns(99)),
+        }
+
+class SoakAggregator:
+    def __init__(self, window_s, interval_s, history=SOAK_HISTORY):
+        self.per_window = max(1, int(round(window_s / interval_s)))
+        # (dt, dtx, drx, lat_ns * frames, frames behind that latency) per interval
+        self._ring = deque(maxlen=self.per_window)
+        self._sums = [0.0, 0, 0, 0.0, 0]
+        self._fill = 0                               # samples since the last window closed
+        self._prev = None                            # (t, frames_tx, frames_rx, cumulative avg ns)
+        self.windows = deque(maxlen=history)
+        self.first = None
+        self.frames_tx = self.frames_rx = 0
+
+    def add(self, t, flow):
+        """Fold in one flow metrics poll taken t seconds into the soak."""
+        if flow is None:
+            return
+        cur = (t, flow.frames_tx, flow.frames_rx, flow.latency_avg_ns)
+        self.frames_tx, self.frames_rx = flow.frames_tx, flow.frames_rx
+        prev, self._prev = self._prev, cur
+        if prev is None or cur[0] <= prev[0]:
+            return
+        dt, dtx, drx = cur[0] - prev[0], cur[1] - prev[1], cur[2] - prev[2]
+        lat, lat_rx = 0.0, 0
+        if cur[3] is not None and prev[3] is not None and drx > 0:
+            # Interval mean from OTG's cumulative average, as in LatencyHistogram.
+            lat, lat_rx = cur[3] * cur[2] - prev[3] * prev[2], drx
+        sample = (dt, dtx, drx, lat, lat_rx)
+        if len(self._ring) == self._ring.maxlen:
+            for i, v in enumerate(self._ring[0]):
+                self._sums[i] -= v
+        self._ring.append(sample)
+        for i, v in enumerate(sample):
+            self._sums[i] += v
+        self._fill += 1
+        if self._fill >= self.per_window:
+            self._fill = 0
+            w = dict(self.rolling(), t=round(t, 3))
+            self.windows.append(w)
+            if self.first is None:
+                self.first = w
+
+    def rolling(self):
+        """Aggregates over the last window's worth of samples."""
+        dt, dtx, drx, lat, lat_rx = self._sums
+        return {
+            'tx_pps': round(dtx / dt, 1) if dt else None,
+            'rx_pps': round(drx / dt, 1) if dt else None,
+            'loss_pct': round(max(0.0, (dtx - drx) * 100.0 / dtx), 4) if dtx > 0 else None,
+            'lat_avg_us': round(lat / lat_rx / 1000.0, 3) if lat_rx > 0 else None,
+        }
+
+    @property
+    def last(self):
+        return self.windows[-1] if self.windows else None
+
+    def drift(self, pps_pct, loss_pct, latency_pct):
+        """
+        {metric: change} for the metrics whose last window moved past its
+        threshold from the first window: rx pps dropping by more than
+        pps_pct percent, loss rising by more than loss_pct points, latency
+        rising by more than latency_pct percent.
+        """
+        a, b, out = self.first, self.last, {}
+        if a is None or b is None or a is b:
+            return out
+        if a['rx_pps'] and b['rx_pps'] is not None:
+            d = (b['rx_pps'] - a['rx_pps']) * 100.0 / a['rx_pps']
+            if -d > pps_pct:
+                out['rx_pps_pct'] = round(d, 2)
+        if a['loss_pct'] is not None and b['loss_pct'] is not None and b['loss_pct'] - a['loss_pct'] > loss_pct:
+            out['loss_pct_points'] = round(b['loss_pct'] - a['loss_pct'], 4)
+        if a['lat_avg_us'] and b['lat_avg_us'] is not None:
+            d = (b['lat_avg_us'] - a['lat_avg_us']) * 100.0 / a['lat_avg_us']
+            if d > latency_pct:
+                out['lat_avg_pct'] = round(d, 2)
+        return out
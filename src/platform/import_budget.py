@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+"""
+    import_budget
+    Import-time and startup budget for the AlpineVS sonic_platform package.
+
+    Every target is imported in a fresh interpreter under -X importtime, with
+    the installed SONiC base packages or, where they are missing (or with
+    --stubs always), the stand-ins from stubs/. The cumulative
+    time of the target's own line is taken (median over --runs), and the
+    modules its import pulled in are checked against the ones it must leave
+    for first use. Object construction (Platform, Chassis) is timed in the
+    same way. Exits 1 when a median exceeds its budget or a deferred module
+    was imported.
+
+    ./import_budget.py                        # check, print a table
+    ./import_budget.py --json out.json        # also write the numbers
+    ./import_budget.py --top 10               # slowest modules under each import
+    ./import_budget.py --budget sonic_platform.chassis=8000
+    ./import_budget.py --stubs always         # measure against the stand-ins
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STUBS_DIR = os.path.join(SCRIPT_DIR, "stubs")
+PLATFORM_API_DIR = os.path.join(SCRIPT_DIR, "..", "sonic-platform-alpinevs", "alpinevs-platform")
+
+# Cumulative microseconds allowed for each import, measured on a fresh
+# interpreter. Before imports were deferred, sonic_platform.chassis took
+# ~30 ms and sonic_platform.pcie ~55 ms on a small VM. Medians there now:
+# sonic_platform ~950 us, platform ~1900 us, chassis ~1700 us,
+# led_control ~23 ms (logging and enum alone are ~22 ms) and pcie ~1400 us.
+# Each budget is about twice that.
+IMPORT_BUDGETS_US = {
+    "sonic_platform": 2000,
+    "sonic_platform.platform": 4000,
+    "sonic_platform.chassis": 3500,
+    "sonic_platform.led_control": 48000,
+    "sonic_platform.pcie": 3000,
+}
+
+# Modules each import must leave for first use.
+DEFERRED = {
+    "sonic_platform": ("sonic_platform.platform", "sonic_platform.chassis", "sonic_platform.telemetry_device"),
+    "sonic_platform.platform": ("json", "sonic_platform.led_control", "sonic_platform.telemetry_device"),
+    "sonic_platform.chassis": ("json", "copy", "typing", "sonic_platform.led_control",
+                               "sonic_platform.telemetry_device"),
+    "sonic_platform.led_control": ("copy", "typing"),
+    "sonic_platform.pcie": ("yaml", "subprocess", "copy"),
+}
+
+# Microseconds allowed for constructing platform objects (after import).
+# Measured ~7 us for Platform() and ~2 us for Chassis() on the same VM.
+CONSTRUCT_BUDGETS_US = {
+    "Platform()": 15,
+    "Chassis()": 5,
+}
+
+CONSTRUCT_SNIPPET = """
+import json, time
+t0 = time.perf_counter()
+from sonic_platform.platform import Platform
+from sonic_platform.chassis import Chassis
+t1 = time.perf_counter()
+Platform()
+t2 = time.perf_counter()
+Chassis()
+t3 = time.perf_counter()
+print(json.dumps({"Platform()": (t2 - t1) * 1e6, "Chassis()": (t3 - t2) * 1e6}))
+"""
+
+
+def _have_sonic_packages():
+    """
+    Returns True when the real SONiC base packages import in this interpreter.
+    """
+    proc = subprocess.run([sys.executable, "-c", "import sonic_platform_base, sonic_py_common, swsscommon"],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return proc.returncode == 0
+
+
+def _env(stubs="always"):
+    """
+    Environment for the measuring interpreters. stubs is "always" (use the
+    stand-ins from stubs/), "never" (use the installed SONiC packages) or
+    "auto" (the installed packages when they import, else the stand-ins).
+    """
+    env = dict(os.environ)
+    if stubs == "auto":
+        stubs = "never" if _have_sonic_packages() else "always"
+    paths = [os.path.abspath(PLATFORM_API_DIR)]
+    if stubs == "always":
+        paths.insert(0, os.path.abspath(STUBS_DIR))
+    env["PYTHONPATH"] = os.pathsep.join(paths + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+    env.pop("SONIC_PROFILE_DIR", None)
+    return env
+
+
+def parse_importtime(text):
+    """
+    Parses -X importtime output.
+
+    Returns:
+        list: (module, self_us, cumulative_us, depth) in output order.
+    """
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            rows.append((name.strip(), int(self_us), int(cumulative_us),
+                         (len(name) - len(name.lstrip())) // 2))
+        except ValueError:
+            continue
+    return rows
+
+
+def measure_import(module, runs, env=None):
+    """
+    Imports module in `runs` fresh interpreters.
+
+    Returns:
+        dict: Median cumulative/self time of the module and, from the
+            median run, every module its import loaded.
+    """
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module],
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              universal_newlines=True, env=env or _env())
+        if proc.returncode != 0:
+            raise RuntimeError("import {} failed:\n{}".format(module, proc.stderr))
+        rows = parse_importtime(proc.stderr)
+        # Everything after site's own imports belongs to the -c command.
+        start = max((i + 1 for i, r in enumerate(rows) if r[0] == "site" and r[3] == 0), default=0)
+        rows = rows[start:]
+        target = next(r for r in reversed(rows) if r[0] == module)
+        samples.append((target[2], target[1], rows))
+    samples.sort(key=lambda s: s[0])
+    cumulative, self_us, rows = samples[len(samples) // 2]
+    return {
+        "cumulative_us": cumulative,
+        "self_us": self_us,
+        "samples_us": [s[0] for s in samples],
+        "modules": [{"module": r[0], "self_us": r[1], "cumulative_us": r[2]} for r in rows],
+    }
+
+
+def measure_construction(runs, env=None):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", CONSTRUCT_SNIPPET], stdout=subprocess.PIPE,
+                             universal_newlines=True, env=env or _env(), check=True).stdout
+        samples.append(json.loads(out))
+    return {name: round(statistics.median(s[name] for s in samples), 1) for name in CONSTRUCT_BUDGETS_US}
+
+
+def _parse_budgets(values):
+    budgets = {}
+    for value in values:
+        name, _, us = value.partition("=")
+        budgets[name] = int(us)
+    return budgets
+
+
+def check(runs=5, overrides=None, top=0, stubs="always", out=sys.stdout):
+    """
+    Measures every import and construction against its budget, printing a
+    table to `out`.
+
+    Returns:
+        tuple: (results, failures) where failures is a list of messages.
+    """
+    overrides = overrides or {}
+    env = _env(stubs)
+    failures = []
+    results = {"imports": {}, "construction": {}}
+    print("{:<32} {:>12} {:>12} {:>12}".format("import", "self us", "cumul. us", "budget us"), file=out)
+    for module, budget in IMPORT_BUDGETS_US.items():
+        budget = overrides.get(module, budget)
+        m = measure_import(module, runs, env)
+        loaded = {r["module"] for r in m["modules"]}
+        early = [d for d in DEFERRED.get(module, ()) if d in loaded]
+        results["imports"][module] = dict(m, budget_us=budget, deferred_but_loaded=early)
+        flag = ""
+        if m["cumulative_us"] > budget:
+            flag = "  OVER BUDGET"
+            failures.append("import {} took {} us (budget {} us)".format(module, m["cumulative_us"], budget))
+        if early:
+            flag += "  loads " + ", ".join(early)
+            failures.append("import {} loads {}, which must be deferred".format(module, ", ".join(early)))
+        print("{:<32} {:>12} {:>12} {:>12}{}".format(module, m["self_us"], m["cumulative_us"], budget, flag),
+              file=out)
+        if top:
+            for r in sorted(m["modules"], key=lambda r: -r["self_us"])[:top]:
+                print("    {:<40} {:>10} {:>10}".format(r["module"], r["self_us"], r["cumulative_us"]), file=out)
+
+    print("\n{:<32} {:>12} {:>12}".format("construction", "us", "budget us"), file=out)
+    for name, us in measure_construction(runs, env).items():
+        budget = overrides.get(name, CONSTRUCT_BUDGETS_US[name])
+        results["construction"][name] = {"us": us, "budget_us": budget}
+        flag = ""
+        if us > budget:
+            flag = "  OVER BUDGET"
+            failures.append("{} took {} us (budget {} us)".format(name, us, budget))
+        print("{:<32} {:>12} {:>12}{}".format(name, us, budget, flag), file=out)
+    return results, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time and startup budget for sonic_platform")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=0, help="show the N slowest modules under each import")
+    parser.add_argument("--budget", action="append", default=[],
+                        help="override a budget: name=microseconds (repeatable)")
+    parser.add_argument("--stubs", choices=("auto", "always", "never"), default="auto",
+                        help="use the SONiC stand-ins from stubs/: auto uses the installed packages when "
+                             "they import (default: %(default)s)")
+    parser.add_argument("--json", help="write the measurements to this file")
+    args = parser.parse_args()
+
+    results, failures = check(args.runs, _parse_budgets(args.budget), args.top, args.stubs)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(dict(results, failures=failures), fh, indent=2, sort_keys=True)
+            fh.write("\n")
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nAll imports and constructions within budget.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+
+"""
+    pcie_sim
+    Simulated PCIe/AER device tree for load-testing the AlpineVS Pcie plugin.
+
+    generate  Build <root>/pci/0000:<bus>:<dev>.<fn>/aer_dev_* for N devices,
+              a matching <root>/pcie.yaml and lspci/sudo shims under
+              <root>/bin so that dump_conf_yaml can run against the tree.
+    advance   Increment AER counters of the generated tree at configurable
+              rates until interrupted (or for --duration seconds).
+    bench     Time get_pcie_check, get_pcie_aer_stats and dump_conf_yaml
+              against the generated tree and print the results as JSON.
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import stat
+import sys
+import threading
+import time
+
+import yaml
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PLATFORM_API_DIR = os.path.join(SCRIPT_DIR, "..", "sonic-platform-alpinevs", "alpinevs-platform")
+
+# Severity name as used by Pcie.get_pcie_aer_stats -> sysfs file name
+AER_FILES = {
+    "correctable": "aer_dev_correctable",
+    "fatal": "aer_dev_fatal",
+    "non_fatal": "aer_dev_nonfatal",
+}
+AER_TOTALS = {
+    "correctable": "TOTAL_ERR_COR",
+    "fatal": "TOTAL_ERR_FATAL",
+    "non_fatal": "TOTAL_ERR_NONFATAL",
+}
+
+DEVICE_NAMES = [
+    ("0600", "Host bridge: Intel Corporation 440FX - 82441FX PMC [Natoma] (rev 02)"),
+    ("0601", "ISA bridge: Intel Corporation 82371SB PIIX3 ISA [Natoma/Triton II]"),
+    ("0200", "Ethernet controller: Red Hat, Inc. Virtio network device"),
+    ("0100", "SCSI storage controller: Red Hat, Inc. Virtio block device"),
+    ("0604", "PCI bridge: Red Hat, Inc. QEMU PCIe Root port"),
+]
+
+
+def _aer_counter_names():
+    """Reads the counter names per severity from the static AER files shipped next to this script."""
+    names = {}
+    for severity, fname in AER_FILES.items():
+        names[severity] = []
+        path = os.path.join(SCRIPT_DIR, fname)
+        if os.path.isfile(path):
+            with open(path) as fh:
+                for line in fh:
+                    fields = line.split()
+                    if fields and fields[0] != AER_TOTALS[severity]:
+                        names[severity].append(fields[0])
+    return names
+
+
+def _bdf(index):
+    """Maps a device index onto a unique (bus, dev, fn) triple."""
+    return index // 256, (index // 8) % 32, index % 8
+
+
+def _device_dir(root, bus, dev, fn):
+    return os.path.join(root, "pci", "%04x:%02x:%02x.%d" % (0, bus, dev, fn))
+
+
+def _write_atomic(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as fh:
+        fh.write(text)
+    os.replace(tmp, path)
+
+
+def _format_aer(severity, counters):
+    lines = ["{} {}".format(name, value) for name, value in counters.items()]
+    lines.append("{} {}".format(AER_TOTALS[severity], sum(counters.values())))
+    return "\n".join(lines) + "\n"
+
+
+def _parse_aer(path, severity):
+    counters = {}
+    with open(path) as fh:
+        for line in fh:
+            field, value = line.split()
+            if field != AER_TOTALS[severity]:
+                counters[field] = int(value)
+    return counters
+
+
+def _write_exec(path, text):
+    with open(path, "w") as fh:
+        fh.write(text)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def generate(root, devices, missing=0, seed=0):
+    """
+    Builds a simulated device tree under root.
+
+    Args:
+        root: Output directory.
+        devices: Number of BDFs to create.
+        missing: Number of devices listed in pcie.yaml but absent from the
+            tree, so that get_pcie_check reports failures.
+        seed: Seed for device name selection.
+
+    Returns:
+        int: The number of devices listed in pcie.yaml.
+    """
+    if devices + missing > 256 * 32 * 8:
+        raise ValueError("at most {} devices are supported".format(256 * 32 * 8))
+    rng = random.Random(seed)
+    counter_names = _aer_counter_names()
+    os.makedirs(os.path.join(root, "pci"), exist_ok=True)
+    os.makedirs(os.path.join(root, "bin"), exist_ok=True)
+
+    conf = []
+    lspci = []
+    lspci_n = []
+    for index in range(devices + missing):
+        bus, dev, fn = _bdf(index)
+        class_id, name = rng.choice(DEVICE_NAMES)
+        device_id = "%04x" % (0x1000 + index % 0x100)
+        conf.append({"bus": "%02x" % bus, "dev": "%02x" % dev, "fn": "%d" % fn,
+                     "id": device_id, "name": name})
+        lspci.append("%02x:%02x.%d %s" % (bus, dev, fn, name))
+        lspci_n.append("%02x:%02x.%d %s: 1af4:%s" % (bus, dev, fn, class_id, device_id))
+        if index >= devices:
+            continue
+        dev_path = _device_dir(root, bus, dev, fn)
+        os.makedirs(dev_path, exist_ok=True)
+        for severity, fname in AER_FILES.items():
+            counters = dict.fromkeys(counter_names[severity], 0)
+            _write_atomic(os.path.join(dev_path, fname), _format_aer(severity, counters))
+
+    with open(os.path.join(root, "pcie.yaml"), "w") as fh:
+        yaml.dump(conf, fh, default_flow_style=False)
+    with open(os.path.join(root, "lspci.txt"), "w") as fh:
+        fh.write("\n".join(lspci) + "\n")
+    with open(os.path.join(root, "lspci_n.txt"), "w") as fh:
+        fh.write("\n".join(lspci_n) + "\n")
+
+    # Pcie.get_pcie_device runs "sudo lspci [-n]"; put these first on PATH.
+    root_abs = os.path.abspath(root)
+    _write_exec(os.path.join(root, "bin", "sudo"), '#!/bin/sh\nexec "$@"\n')
+    _write_exec(os.path.join(root, "bin", "lspci"),
+                '#!/bin/sh\n'
+                'if [ "$1" = "-n" ]; then cat "{0}/lspci_n.txt"; else cat "{0}/lspci.txt"; fi\n'.format(root_abs))
+    return len(conf)
+
+
+def _list_devices(root):
+    pci_dir = os.path.join(root, "pci")
+    return sorted(os.path.join(pci_dir, d) for d in os.listdir(pci_dir))
+
+
+def advance(root, rates, interval=1.0, duration=None, seed=None, stop_event=None):
+    """
+    Increments AER counters across the tree until stopped.
+
+    Each tick waits for its interval, then applies the errors of that
+    interval; the last tick is shortened to what is left of duration, so
+    a full run applies rate * duration errors.
+
+    Args:
+        root: Directory created by generate().
+        rates: Dict of severity -> errors per second across the whole tree.
+        interval: Seconds between two rewrites of the touched files.
+        duration: Stop after this many seconds; run forever when None.
+        seed: Seed for picking devices and counters.
+        stop_event: threading.Event that ends the run early when set.
+
+    Returns:
+        dict: Total increments applied per severity.
+    """
+    if interval <= 0:
+        raise ValueError("interval must be positive, got {}".format(interval))
+    if duration is not None and duration < 0:
+        raise ValueError("duration must not be negative, got {}".format(duration))
+    for severity, rate in rates.items():
+        if rate < 0:
+            raise ValueError("rate of {} must not be negative, got {}".format(severity, rate))
+    rng = random.Random(seed)
+    dev_paths = _list_devices(root)
+    if not dev_paths:
+        raise ValueError("no devices under {}".format(root))
+    counters = {}
+    applied = dict.fromkeys(rates, 0)
+    stop_event = stop_event or threading.Event()
+
+    start = time.monotonic()
+    covered = 0.0
+    while duration is None or covered < duration:
+        step = interval if duration is None else min(interval, duration - covered)
+        covered += step
+        if stop_event.wait(max(0.0, start + covered - time.monotonic())):
+            break
+        touched = set()
+        for severity, rate in rates.items():
+            # From the running total, so float steps can't drop an error.
+            events = int(rate * covered + 1e-9) - applied[severity]
+            for _ in range(events):
+                dev_path = rng.choice(dev_paths)
+                key = (dev_path, severity)
+                if key not in counters:
+                    counters[key] = _parse_aer(os.path.join(dev_path, AER_FILES[severity]), severity)
+                names = list(counters[key])
+                if not names:
+                    continue
+                counters[key][rng.choice(names)] += 1
+                touched.add(key)
+            applied[severity] += events
+        for dev_path, severity in touched:
+            _write_atomic(os.path.join(dev_path, AER_FILES[severity]),
+                          _format_aer(severity, counters[(dev_path, severity)]))
+    return applied
+
+
+def _import_pcie():
+    try:
+        from sonic_platform.pcie import Pcie
+    except ImportError:
+        sys.path.insert(0, os.path.abspath(PLATFORM_API_DIR))
+        from sonic_platform.pcie import Pcie
+    return Pcie
+
+
+def _timed(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {"min_s": samples[0], "median_s": samples[len(samples) // 2], "max_s": samples[-1]}
+
+
+def bench(root, iterations=5):
+    """Times the Pcie plugin against the generated tree."""
+    Pcie = _import_pcie()
+    root = os.path.abspath(root)
+    pcie = Pcie(root)
+    pcie.PCI_DEVICE_DIR = os.path.join(root, "pci")
+
+    devices = pcie.get_pcie_check()
+
+    def _all_aer():
+        for item in devices:
+            pcie.get_pcie_aer_stats(bus=int(item["bus"], 16), dev=int(item["dev"], 16),
+                                    func=int(item["fn"], 16))
+
+    def _dump():
+        # Write pcie_bench.yaml so the generated pcie.yaml is left alone.
+        pcie._conf_rev = "bench"
+        try:
+            pcie.dump_conf_yaml()
+        finally:
+            pcie._conf_rev = None
+
+    path = os.environ.get("PATH", "")
+    os.environ["PATH"] = os.path.join(root, "bin") + os.pathsep + path
+    try:
+        results = {
+            "devices": len(devices),
+            "iterations": iterations,
+            "get_pcie_check": _timed(pcie.get_pcie_check, iterations),
+            "get_pcie_aer_stats_all": _timed(_all_aer, iterations),
+            "dump_conf_yaml": _timed(_dump, iterations),
+        }
+    finally:
+        os.environ["PATH"] = path
+    return results
+
+
+def _parse_rate(value):
+    """argparse type for --rate: 'severity=errors_per_second' -> (severity, rate)."""
+    severity, sep, rate = value.partition("=")
+    if severity not in AER_FILES:
+        raise argparse.ArgumentTypeError(
+            "unknown severity '{}' (use {})".format(severity, ", ".join(AER_FILES)))
+    try:
+        rate = float(rate) if sep else None
+    except ValueError:
+        rate = None
+    if rate is None or rate < 0:
+        raise argparse.ArgumentTypeError(
+            "expected {}=<errors per second >= 0>, got '{}'".format(severity, value))
+    return severity, rate
+
+
+def _positive_float(value):
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0.0
+    if number <= 0:
+        raise argparse.ArgumentTypeError("expected a positive number, got '{}'".format(value))
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated PCIe/AER device tree")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="build a device tree and pcie.yaml")
+    gen.add_argument("--root", required=True)
+    gen.add_argument("--devices", type=int, default=1000)
+    gen.add_argument("--missing", type=int, default=0,
+                     help="devices listed in pcie.yaml but absent from the tree")
+    gen.add_argument("--seed", type=int, default=0)
+
+    adv = sub.add_parser("advance", help="increment AER counters in the background")
+    adv.add_argument("--root", required=True)
+    adv.add_argument("--rate", action="append", default=[], type=_parse_rate,
+                     help="severity=errors_per_second, e.g. correctable=100 (repeatable)")
+    adv.add_argument("--interval", type=_positive_float, default=1.0)
+    adv.add_argument("--duration", type=_positive_float, default=None)
+    adv.add_argument("--seed", type=int, default=None)
+
+    bch = sub.add_parser("bench", help="time the Pcie plugin against the tree")
+    bch.add_argument("--root", required=True)
+    bch.add_argument("--iterations", type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        count = generate(args.root, args.devices, args.missing, args.seed)
+        print("Generated {} devices ({} missing) under {}".format(count, args.missing, args.root))
+    elif args.command == "advance":
+        rates = dict(args.rate) or {"correctable": 10.0}
+        stop_event = threading.Event()
+
+        def _stop(signum, frame):
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+        applied = advance(args.root, rates, args.interval, args.duration, args.seed, stop_event)
+        print(json.dumps({"applied": applied}))
+    else:
+        print(json.dumps(bench(args.root, args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
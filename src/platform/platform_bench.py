@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+
+"""
+    platform_bench
+    Offline micro-benchmarks for the AlpineVS sonic_platform package and the
+    fake xcvrd.
+
+    sonic_platform_base, sonic_py_common and swsscommon are replaced by the
+    stand-ins under stubs/ (swsscommon is a working in-memory database), so
+    the suite runs on any machine without SONiC packages or Redis.
+
+    run       Run the benchmarks and write the results as JSON, together
+              with the git revision and Python version they were taken on.
+    compare   Compare two result files; exits 1 if a benchmark's median got
+              slower by more than --threshold percent.
+
+    ./platform_bench.py run --out base.json
+    ./platform_bench.py run --only led,xcvrd --repeat 9
+    ./platform_bench.py compare base.json cand.json --threshold 10
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STUBS_DIR = os.path.join(SCRIPT_DIR, "stubs")
+PLATFORM_API_DIR = os.path.join(SCRIPT_DIR, "..", "sonic-platform-alpinevs", "alpinevs-platform")
+
+# Stubs first so that installed SONiC packages don't change what is measured.
+for _path in (PLATFORM_API_DIR, STUBS_DIR, SCRIPT_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, os.path.abspath(_path))
+
+RESULT_FORMAT = 1
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD_PCT = 10.0
+
+
+def _measure(func, number, repeat):
+    """
+    Calls func() `repeat` times; each call performs `number` operations.
+
+    Returns:
+        dict: Per-operation time in microseconds (min/median/mean/max over
+            the repeats) and operations per second at the median.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1e6 / number)
+    median = statistics.median(samples)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": round(min(samples), 3),
+        "median_us": round(median, 3),
+        "mean_us": round(statistics.mean(samples), 3),
+        "max_us": round(max(samples), 3),
+        "ops_per_s": round(1e6 / median, 1) if median else None,
+    }
+
+
+#
+# LedControl ===================================================================
+#
+
+def _status_mixes(count, seed):
+    """Transceiver status lists covering breakouts, LACP bitmaps, missing and bad fields."""
+    rng = random.Random(seed)
+    oper = ["up", "down", ""]
+    admin = ["up", "down"]
+    health = ["good", "bad", "unknown", ""]
+    lacp = ["63", "61", "5", "48", "0", "garbage"]
+    mixes = []
+    for i in range(count):
+        lanes = rng.choice([1, 1, 2, 4, 8])
+        statuses = []
+        for _ in range(lanes):
+            status = {"oper_status": rng.choice(oper), "admin_status": rng.choice(admin),
+                      "health_ind": rng.choice(health)}
+            if rng.random() < 0.5:
+                status["lacp_state"] = rng.choice(lacp)
+            if rng.random() < 0.1:
+                del status["health_ind"]
+            statuses.append(status)
+        if i % 50 == 0:
+            statuses = None          # handled as "no statuses": LED off
+        mixes.append((str(rng.randint(1, 34)), statuses))
+    return mixes
+
+
+def bench_led(workdir, args):
+    from sonic_platform import led_control
+
+    led_dir = os.path.join(workdir, "leds")
+    os.makedirs(led_dir)
+    sysfs_paths = {str(i): os.path.join(led_dir, "led_{}".format(i)) for i in range(1, 35)}
+    lookup = {state: value for value, state in enumerate(led_control.LedState)}
+    led = led_control.LedControl(sysfs_paths, lookup)
+    mixes = _status_mixes(args.led_mixes, args.seed)
+
+    def _run():
+        for tcvr, statuses in mixes:
+            led.port_link_state_change_extended(tcvr, statuses)
+
+    return {"port_link_state_change_extended": dict(
+        _measure(_run, len(mixes), args.repeat), mixes=len(mixes))}
+
+
+#
+# TelemetryDevice ==============================================================
+#
+
+def _telemetry_config(name, metrics, children, prefix="m"):
+    return {
+        "name": name,
+        "type": "TEMPERATURE",
+        "metrics": {"{}{}".format(prefix, i): str(i) for i in range(metrics)},
+        "children": [{"name": "{}_child{}".format(name, c),
+                      "metrics": {"{}{}".format(prefix, i): str(i) for i in range(metrics // 10 + 1)}}
+                     for c in range(children)],
+    }
+
+
+def bench_telemetry(workdir, args):
+    from sonic_platform.telemetry_device import TelemetryDevice
+
+    dynamic_dir = os.path.join(workdir, "dynamic")
+    os.makedirs(dynamic_dir)
+    metrics, children = args.telemetry_metrics, args.telemetry_children
+    # The overlay rewrites half of the metrics, adds as many new ones and
+    # touches every child plus as many new children.
+    overlay = _telemetry_config("dev0", metrics // 2, children * 2)
+    overlay["metrics"].update({"new{}".format(i): "1" for i in range(metrics // 2)})
+    with open(os.path.join(dynamic_dir, "dev0.json"), "w") as fh:
+        json.dump(overlay, fh)
+    device = TelemetryDevice(_telemetry_config("dev0", metrics, children), dynamic_dir)
+    device.get_device_info()         # first call adds the new entries; measure the steady state
+
+    return {"get_device_info": dict(
+        _measure(device.get_device_info, 1, args.repeat), metrics=metrics, children=children)}
+
+
+#
+# Chassis ======================================================================
+#
+
+def bench_chassis(workdir, args):
+    from sonic_platform.chassis import Chassis
+
+    telemetry_dir = os.path.join(workdir, "telemetry") + os.sep
+    os.makedirs(os.path.join(telemetry_dir, "dynamic"))
+    for f in range(args.chassis_files):
+        devices = [_telemetry_config("dev{}_{}".format(f, d), 20, 4) for d in range(args.chassis_devices)]
+        with open(os.path.join(telemetry_dir, "dev{}.json".format(f)), "w") as fh:
+            json.dump(devices, fh)
+    led_fmt = os.path.join(workdir, "led_{0:d}")
+
+    class BenchChassis(Chassis):
+        TELEMETRY_DIR = telemetry_dir
+        DYNAMIC_TELEMETRY_DIR = os.path.join(telemetry_dir, "dynamic") + os.sep
+        PATH_LED_FMT = led_fmt
+        PATH_SFP_PLUS_LED_FMT = led_fmt
+
+    def _with_devices():
+        BenchChassis().get_all_telemetry_devices()
+
+    params = dict(files=args.chassis_files, devices_per_file=args.chassis_devices)
+    return {
+        "construct": dict(_measure(BenchChassis, 1, args.repeat), **params),
+        "construct_with_telemetry_devices": dict(_measure(_with_devices, 1, args.repeat), **params),
+    }
+
+
+#
+# Pcie =========================================================================
+#
+
+def bench_pcie(workdir, args):
+    import pcie_sim
+    from sonic_platform.pcie import Pcie
+
+    root = os.path.join(workdir, "pcie")
+    pcie_sim.generate(root, args.pcie_devices, missing=args.pcie_devices // 100, seed=args.seed)
+    pcie = Pcie(root)
+    pcie.PCI_DEVICE_DIR = os.path.join(root, "pci")
+    bdfs = [(int(d["bus"], 16), int(d["dev"], 16), int(d["fn"], 16)) for d in pcie.get_pcie_check()]
+
+    def _all_aer():
+        for bus, dev, fn in bdfs:
+            pcie.get_pcie_aer_stats(bus=bus, dev=dev, func=fn)
+
+    return {
+        "get_pcie_check": dict(_measure(pcie.get_pcie_check, 1, args.repeat), devices=len(bdfs)),
+        "get_pcie_aer_stats": dict(_measure(_all_aer, len(bdfs), args.repeat), devices=len(bdfs)),
+    }
+
+
+#
+# xcvrd ========================================================================
+#
+
+def bench_xcvrd(workdir, args):
+    from swsscommon import swsscommon
+    from xcvrd import xcvrd
+
+    swsscommon.reset()
+    daemon = xcvrd.DaemonXcvrd(xcvrd.SYSLOG_IDENTIFIER)
+    appl_db = swsscommon.DBConnector("APPL_DB", 0)
+    appl_state_db = swsscommon.DBConnector("APPL_STATE_DB", 0)
+    state_db = swsscommon.DBConnector("STATE_DB", 0)
+    app_port_tbl = swsscommon.ProducerStateTable(appl_db, swsscommon.APP_PORT_TABLE_NAME)
+    appl_state_port_tbl = swsscommon.Table(appl_state_db, xcvrd.PORT_TABLE)
+    verify_state_tbl = swsscommon.Table(state_db, "VERIFY_STATE_RESP_TABLE")
+    producer = swsscommon.NotificationProducer(state_db, xcvrd.VERIFY_STATE_REQ_CHANNEL)
+    consumer = swsscommon.NotificationConsumer(state_db, xcvrd.VERIFY_STATE_REQ_CHANNEL)
+
+    ports = ["Ethernet{}".format(i * 4) for i in range(args.xcvrd_ports)]
+    ports += ["Ethernet-BP{}".format(i) for i in range(args.xcvrd_ports // 16)]
+    fvp = (("admin_status", "up"), ("oper_status", "up"), ("speed", "400000"))
+    # Create every port, update it, delete it: a cold boot followed by a teardown.
+    events = ([(p, swsscommon.SET_COMMAND, fvp) for p in ports] +
+              [(p, swsscommon.SET_COMMAND, (("oper_status", "down"),)) for p in ports] +
+              [(p, swsscommon.DEL_COMMAND, ()) for p in ports if not p.startswith("Ethernet-BP")])
+
+    def _port_events():
+        port_cache = set()
+        for key, op, fvs in events:
+            daemon._process_appl_state_port_table_event(
+                key, op, fvs, port_cache, appl_state_port_tbl, app_port_tbl)
+
+    def _verifications():
+        for i in range(args.xcvrd_verifications):
+            producer.send(xcvrd.COMPONENT_NAME if i % 4 else "pmon:other", str(i), [])
+            daemon._process_state_verification_notification_channel(consumer, verify_state_tbl)
+
+    return {
+        "port_table_events": dict(_measure(_port_events, len(events), args.repeat), events=len(events)),
+        "verify_state_notifications": dict(
+            _measure(_verifications, args.xcvrd_verifications, args.repeat),
+            notifications=args.xcvrd_verifications),
+    }
+
+
+def bench_led_lag(workdir, args):
+    """
+    Unified LED mode end to end: flip oper_status of every port in
+    APPL_DB PORT_TABLE and wait until xcvrd has written every transceiver LED.
+    """
+    from swsscommon import swsscommon
+    from sonic_platform import led_control
+    from xcvrd import xcvrd
+
+    swsscommon.reset()
+    led_dir = os.path.join(workdir, "leds")
+    os.makedirs(led_dir)
+    sysfs_paths = {str(i): os.path.join(led_dir, "led_{}".format(i)) for i in range(1, 35)}
+    lookup = {state: value for value, state in enumerate(led_control.LedState)}
+    led = led_control.LedControl(sysfs_paths, lookup)
+    expected = {"up": str(lookup[led_control.LedState.ON_BLUE]), "down": str(lookup[led_control.LedState.OFF])}
+
+    config_port_tbl = swsscommon.Table(swsscommon.DBConnector("CONFIG_DB", 0), xcvrd.CFG_PORT_TABLE)
+    app_port_tbl = swsscommon.Table(swsscommon.DBConnector("APPL_DB", 0), swsscommon.APP_PORT_TABLE_NAME)
+    state_port_tbl = swsscommon.Table(swsscommon.DBConnector("STATE_DB", 0), swsscommon.STATE_PORT_TABLE_NAME)
+    ports = []
+    for tcvr in sysfs_paths:
+        for lane in range(args.led_lag_breakout):
+            port = "Ethernet{}".format((int(tcvr) - 1) * 8 + lane)
+            config_port_tbl.set(port, [("index", tcvr)])
+            app_port_tbl.set(port, [("admin_status", "up"), ("oper_status", "up")])
+            state_port_tbl.set(port, [("health_ind", "good")])
+            ports.append(port)
+
+    def _wait_for(value, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if all(open(path).read() == value for path in sysfs_paths.values()):
+                return
+            time.sleep(0.0005)
+        raise RuntimeError("LEDs did not reach {} within {}s".format(value, timeout))
+
+    flips = {"n": 0}
+
+    def _mass_change():
+        oper = "down" if flips["n"] % 2 == 0 else "up"
+        flips["n"] += 1
+        for port in ports:
+            app_port_tbl.set(port, [("oper_status", oper)])
+        _wait_for(expected[oper])
+
+    daemon = xcvrd.DaemonXcvrd(xcvrd.SYSLOG_IDENTIFIER, snapshot_path=os.path.join(workdir, "port_cache.json"),
+                               led_control=led)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    try:
+        _wait_for(expected["up"])
+        result = _measure(_mass_change, 1, args.repeat)
+    finally:
+        daemon.stop_event.set()
+        thread.join()
+    return {"mass_link_change": dict(result, ports=len(ports), transceivers=len(sysfs_paths),
+                                     xcvrd_lag=daemon.led_driver.lag_stats())}
+
+
+BENCHMARKS = {
+    "led": bench_led,
+    "led_lag": bench_led_lag,
+    "telemetry": bench_telemetry,
+    "chassis": bench_chassis,
+    "pcie": bench_pcie,
+    "xcvrd": bench_xcvrd,
+}
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "-C", SCRIPT_DIR, "describe", "--always", "--dirty"],
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def run(args):
+    # Bad status mixes log errors on purpose: keep formatting them, but not on the terminal.
+    with open(os.devnull, "w") as devnull:
+        logging.basicConfig(stream=devnull, force=True)
+        try:
+            return _run(args)
+        finally:
+            logging.basicConfig(force=True)
+
+
+def _run(args):
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        sys.exit("unknown benchmark(s): {} (choose from {})".format(", ".join(unknown), ", ".join(BENCHMARKS)))
+    results = {
+        "format": RESULT_FORMAT,
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "benchmarks": {},
+    }
+    for name in names:
+        workdir = tempfile.mkdtemp(prefix="platform_bench_{}_".format(name))
+        try:
+            for case, result in BENCHMARKS[name](workdir, args).items():
+                key = "{}.{}".format(name, case)
+                results["benchmarks"][key] = result
+                print("{:<40} {:>12.3f} us/op  {:>12.1f} ops/s".format(
+                    key, result["median_us"], result["ops_per_s"] or 0.0), file=sys.stderr)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    out = args.out or "platform_bench_{}_{}.json".format(
+        results["meta"]["revision"] or "norev", time.strftime("%Y%m%d_%H%M%S"))
+    with open(out, "w") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+    print("Wrote {}".format(out), file=sys.stderr)
+    return 0
+
+
+def _cell(result, median_us):
+    if result is None:
+        return "-"
+    return "failed" if median_us is None else "{:.3f}".format(median_us)
+
+
+def compare(args):
+    with open(args.base) as fh:
+        base = json.load(fh)
+    with open(args.cand) as fh:
+        cand = json.load(fh)
+    print("base: {} ({})".format(args.base, base["meta"].get("revision")))
+    print("cand: {} ({})".format(args.cand, cand["meta"].get("revision")))
+    print("| benchmark | base us/op | cand us/op | change |")
+    print("|---|---:|---:|---:|")
+    regressions = []
+    failed = []
+    for key in sorted(set(base["benchmarks"]) | set(cand["benchmarks"])):
+        b, c = base["benchmarks"].get(key), cand["benchmarks"].get(key)
+        b_us = b.get("median_us") if b else None
+        c_us = c.get("median_us") if c else None
+        if c is not None and c_us is None:
+            # Present but without timings: every repeat failed or timed out.
+            failed.append(key)
+        if b_us is None or c_us is None:
+            print("| {} | {} | {} | {} |".format(
+                key, _cell(b, b_us), _cell(c, c_us), "failed" if key in failed else ""))
+            continue
+        change = (c_us - b_us) * 100.0 / b_us if b_us else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = " (regression)"
+            regressions.append(key)
+        print("| {} | {:.3f} | {:.3f} | {:+.1f}%{} |".format(key, b_us, c_us, change, flag))
+    if failed:
+        print("\n{} benchmark(s) have no timings in {}: {}".format(len(failed), args.cand, ", ".join(failed)))
+    if regressions:
+        print("\n{} benchmark(s) slower by more than {}%: {}".format(
+            len(regressions), args.threshold, ", ".join(regressions)))
+    if failed or regressions:
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for sonic_platform and the fake xcvrd")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    r = sub.add_parser("run", help="run the benchmarks and write JSON results")
+    r.add_argument("--out", help="result file (default: platform_bench_<revision>_<time>.json)")
+    r.add_argument("--only", help="comma-separated subset of: " + ", ".join(BENCHMARKS))
+    r.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    r.add_argument("--seed", type=int, default=0)
+    r.add_argument("--led-mixes", type=int, default=2000, help="status lists per LED pass")
+    r.add_argument("--telemetry-metrics", type=int, default=400)
+    r.add_argument("--telemetry-children", type=int, default=50)
+    r.add_argument("--chassis-files", type=int, default=50, help="telemetry JSON files")
+    r.add_argument("--chassis-devices", type=int, default=20, help="devices per telemetry JSON file")
+    r.add_argument("--pcie-devices", type=int, default=1000)
+    r.add_argument("--led-lag-breakout", type=int, default=4, help="logical ports per transceiver")
+    r.add_argument("--xcvrd-ports", type=int, default=512)
+    r.add_argument("--xcvrd-verifications", type=int, default=2000)
+
+    c = sub.add_parser("compare", help="compare two result files")
+    c.add_argument("base")
+    c.add_argument("cand")
+    c.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PCT,
+                   help="percent slowdown of a median that counts as a regression")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        if args.repeat < 1:
+            parser.error("--repeat must be at least 1")
+        sys.exit(run(args))
+    sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+
+"""
+    port_churn
+    PORT_TABLE churn and state verification load generator for the Alpine
+    pmon stack.
+
+    Writes event patterns into APPL_STATE_DB PORT_TABLE and the STATE_DB
+    VERIFY_STATE_REQ_CHANNEL, then measures how long xcvrd takes to
+    converge: APPL_DB presence for every created port, the last request
+    answered in VERIFY_STATE_RESP_TABLE. Patterns with no visible result
+    (flaps, deletes) end with a sentinel port. xcvrd handles PORT_TABLE
+    events in order, so the sentinel's presence means everything before
+    it was processed.
+
+    mass_create   create --ports ports at once
+    breakout      split --breakout ports into 4 lanes each (delete parent, create children)
+    flap          toggle oper_status of --ports ports --flaps times
+    delete_storm  delete --ports ports at once
+    verify_burst  send --verifications state verification requests
+
+    --backend memory  (default) in-memory swsscommon from stubs/, with xcvrd
+                      running in-process
+    --backend redis   the installed swsscommon against a local Redis; xcvrd
+                      is expected to be running already (pmon), unless
+                      --spawn-xcvrd is given
+
+    Generated ports are named EthernetChurn<n> (and EthernetSync<n> for
+    sentinels), so they can't be mistaken for real ports. The run refuses
+    to start if such ports already exist, and only ever deletes the ports
+    it created; they are all removed again when it ends.
+
+    The result file uses the platform_bench.py layout, so two runs can be
+    compared with "platform_bench.py compare" (median_us is the
+    convergence time).
+
+    ./port_churn.py --ports 1024 --repeat 5 --out base.json
+    ./port_churn.py --patterns flap,verify_burst --flaps 20
+    ./port_churn.py --backend redis --patterns mass_create,verify_burst
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STUBS_DIR = os.path.join(SCRIPT_DIR, "stubs")
+
+RESULT_FORMAT = 1
+PORT_TABLE = "PORT_TABLE"
+PRODUCER_PORT_TABLE = "_PORT_TABLE"     # where ProducerStateTable writes wait for orchagent
+VERIFY_STATE_REQ_CHANNEL = "VERIFY_STATE_REQ_CHANNEL"
+VERIFY_STATE_RESP_TABLE = "VERIFY_STATE_RESP_TABLE"
+COMPONENT_NAME = "pmon:xcvrd"
+PORT_FIELDS = [("admin_status", "up"), ("oper_status", "up"), ("speed", "400000"), ("mtu", "9100")]
+LANES_PER_BREAKOUT = 4
+PORT_PREFIX = "EthernetChurn"
+SENTINEL_PREFIX = "EthernetSync"
+
+
+class Churn(object):
+    """
+    Tables the generator writes and watches, and the helpers patterns share.
+    Only ports created through set_port() are ever deleted.
+    """
+
+    def __init__(self, swsscommon, poll_secs):
+        self.swsscommon = swsscommon
+        self.poll_secs = poll_secs
+        appl_db = swsscommon.DBConnector("APPL_DB", 0)
+        appl_state_db = swsscommon.DBConnector("APPL_STATE_DB", 0)
+        state_db = swsscommon.DBConnector("STATE_DB", 0)
+        self.appl_state_port = swsscommon.Table(appl_state_db, PORT_TABLE)
+        self.appl_port = swsscommon.Table(appl_db, PORT_TABLE)
+        self.appl_port_producer = swsscommon.Table(appl_db, PRODUCER_PORT_TABLE)
+        self.verify_resp = swsscommon.Table(state_db, VERIFY_STATE_RESP_TABLE)
+        self.verify_req = swsscommon.NotificationProducer(state_db, VERIFY_STATE_REQ_CHANNEL)
+        self._sentinels = 0
+        self.created = set()
+        existing = sorted(k for tbl in (self.appl_state_port, self.appl_port, self.appl_port_producer)
+                          for k in tbl.getKeys() if k.startswith((PORT_PREFIX, SENTINEL_PREFIX)))
+        if existing:
+            raise RuntimeError("{} ports named {}*/{}* already exist (e.g. {}); remove them first".format(
+                len(existing), PORT_PREFIX, SENTINEL_PREFIX, existing[0]))
+
+    @staticmethod
+    def port(index, lane=0):
+        return "{}{}".format(PORT_PREFIX, index * 8 + lane * 2)
+
+    @classmethod
+    def ports(cls, count, lane=0):
+        return [cls.port(i, lane) for i in range(count)]
+
+    def set_port(self, port, fields=PORT_FIELDS):
+        self.created.add(port)
+        self.appl_state_port.set(port, self.swsscommon.FieldValuePairs(list(fields)))
+
+    def del_port(self, port):
+        if port in self.created:
+            self.appl_state_port._del(port)
+
+    def clear_presence(self, ports):
+        for port in ports:
+            if port in self.created:
+                self.appl_port._del(port)
+                self.appl_port_producer._del(port)
+
+    def cleanup(self):
+        """Removes every port this run created, with its presence."""
+        for port in self.created:
+            self.del_port(port)
+        self.clear_presence(self.created)
+
+    def has_presence(self, port):
+        for tbl in (self.appl_port, self.appl_port_producer):
+            found, fvs = tbl.get(port)
+            if found and dict(fvs).get("presence") == "1":
+                return True
+        return False
+
+    def presence_of(self, ports):
+        """Checker that is True once every port has presence; ports are checked off as they converge."""
+        pending = set(ports)
+
+        def _check():
+            for port in [p for p in pending if self.has_presence(p)]:
+                pending.discard(port)
+            return not pending
+        _check.pending = pending
+        return _check
+
+    def sentinel(self):
+        """Writes a new sentinel port and returns the checker for its presence."""
+        self._sentinels += 1
+        port = "{}{}".format(SENTINEL_PREFIX, self._sentinels)
+        self.set_port(port)
+        check = self.presence_of([port])
+        check.port = port
+        return check
+
+    def wait(self, check, timeout):
+        """Polls check() until it returns True; returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while not check():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_secs)
+        return True
+
+    def settle(self, timeout):
+        """Waits until xcvrd has handled everything written so far, then drops the sentinel."""
+        check = self.sentinel()
+        if not self.wait(check, timeout):
+            raise RuntimeError("xcvrd did not handle a sentinel port within {}s; is it running?".format(timeout))
+        self.del_port(check.port)
+        self.clear_presence([check.port])
+
+    def reset(self, ports, timeout):
+        """Removes ports from APPL_STATE_DB and their presence from APPL_DB."""
+        for port in ports:
+            self.del_port(port)
+        self.settle(timeout)
+        self.clear_presence(ports)
+
+
+#
+# Patterns =====================================================================
+#
+# A pattern's setup() runs untimed; its run() does the timed writes and
+# returns (events written, convergence checker).
+
+def mass_create(churn, args):
+    ports = churn.ports(args.ports)
+
+    def setup():
+        churn.reset(ports, args.timeout)
+
+    def run():
+        for port in ports:
+            churn.set_port(port)
+        return len(ports), churn.presence_of(ports)
+    return setup, run
+
+
+def breakout(churn, args):
+    parents = churn.ports(args.breakout)
+    children = [p for lane in range(LANES_PER_BREAKOUT) for p in churn.ports(args.breakout, lane)]
+
+    def setup():
+        churn.reset(set(parents + children), args.timeout)
+        for port in parents:
+            churn.set_port(port)
+        churn.settle(args.timeout)
+        churn.clear_presence(children)
+
+    def run():
+        lanes = [("speed", "100000")]
+        for i, parent in enumerate(parents):
+            churn.del_port(parent)
+            for lane in range(LANES_PER_BREAKOUT):
+                churn.set_port(churn.port(i, lane), PORT_FIELDS + lanes)
+        return len(parents) * (1 + LANES_PER_BREAKOUT), churn.presence_of(children)
+    return setup, run
+
+
+def flap(churn, args):
+    ports = churn.ports(args.ports)
+
+    def setup():
+        churn.reset(ports, args.timeout)
+        for port in ports:
+            churn.set_port(port)
+        churn.settle(args.timeout)
+
+    def run():
+        for i in range(args.flaps):
+            oper = [("oper_status", "down" if i % 2 == 0 else "up")]
+            for port in ports:
+                churn.set_port(port, oper)
+        return len(ports) * args.flaps + 1, churn.sentinel()
+    return setup, run
+
+
+def delete_storm(churn, args):
+    ports = churn.ports(args.ports)
+
+    def setup():
+        churn.reset(ports, args.timeout)
+        for port in ports:
+            churn.set_port(port)
+        churn.settle(args.timeout)
+
+    def run():
+        for port in ports:
+            churn.del_port(port)
+        return len(ports) + 1, churn.sentinel()
+    return setup, run
+
+
+def verify_burst(churn, args):
+    state = {"burst": 0}
+
+    def setup():
+        state["burst"] += 1
+
+    def run():
+        last = None
+        for i in range(args.verifications):
+            last = "{}-{}-{}".format(os.getpid(), state["burst"], i)
+            churn.verify_req.send(COMPONENT_NAME, last, churn.swsscommon.FieldValuePairs([]))
+
+        def _check():
+            found, fvs = churn.verify_resp.get(COMPONENT_NAME)
+            return found and dict(fvs).get("timestamp") == last
+        return args.verifications, _check
+    return setup, run
+
+
+PATTERNS = {
+    "mass_create": mass_create,
+    "breakout": breakout,
+    "flap": flap,
+    "delete_storm": delete_storm,
+    "verify_burst": verify_burst,
+}
+
+
+def run_pattern(churn, name, args):
+    setup, run = PATTERNS[name](churn, args)
+    samples = []
+    timeouts = 0
+    for _ in range(args.repeat):
+        setup()
+        start = time.perf_counter()
+        events, check = run()
+        written = time.perf_counter()
+        if not churn.wait(check, args.timeout):
+            timeouts += 1
+            continue
+        done = time.perf_counter()
+        samples.append((events, (written - start) * 1e3, (done - start) * 1e3))
+    if not samples:
+        # Every repeat timed out: keep the layout, with no timings.
+        keys = ("events", "write_ms", "converge_ms", "lag_ms", "min_us", "median_us", "mean_us", "max_us",
+                "ops_per_s")
+        return dict(dict.fromkeys(keys), number=1, repeat=args.repeat, timeouts=timeouts)
+    converge = [s[2] for s in samples]
+    median = statistics.median(converge)
+    return {
+        "number": 1,
+        "repeat": args.repeat,
+        "timeouts": timeouts,
+        "events": samples[0][0],
+        "write_ms": round(statistics.median(s[1] for s in samples), 3),
+        "converge_ms": round(median, 3),
+        "lag_ms": round(statistics.median(s[2] - s[1] for s in samples), 3),
+        "min_us": round(min(converge) * 1e3, 3),
+        "median_us": round(median * 1e3, 3),
+        "mean_us": round(statistics.mean(converge) * 1e3, 3),
+        "max_us": round(max(converge) * 1e3, 3),
+        "ops_per_s": round(samples[0][0] / (median / 1e3), 1) if median else None,
+    }
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "-C", SCRIPT_DIR, "describe", "--always", "--dirty"],
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PORT_TABLE churn / state verification load generator")
+    parser.add_argument("--backend", choices=("memory", "redis"), default="memory")
+    parser.add_argument("--spawn-xcvrd", action="store_true",
+                        help="run xcvrd in this process (always on for the memory backend)")
+    parser.add_argument("--patterns", default=",".join(PATTERNS),
+                        help="comma-separated subset of: " + ", ".join(PATTERNS))
+    parser.add_argument("--ports", type=int, default=512)
+    parser.add_argument("--breakout", type=int, default=32, help="ports split into {} lanes".format(LANES_PER_BREAKOUT))
+    parser.add_argument("--flaps", type=int, default=10)
+    parser.add_argument("--verifications", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for convergence")
+    parser.add_argument("--poll-ms", type=float, default=1.0)
+    parser.add_argument("--out", help="result file (default: port_churn_<backend>_<revision>_<time>.json)")
+    args = parser.parse_args()
+    names = args.patterns.split(",")
+    unknown = [n for n in names if n not in PATTERNS]
+    if unknown:
+        parser.error("unknown pattern(s): {}".format(", ".join(unknown)))
+    if args.repeat < 1 or args.ports < 1 or args.breakout < 1:
+        parser.error("--repeat, --ports and --breakout must be positive")
+
+    if args.backend == "memory":
+        sys.path.insert(0, STUBS_DIR)
+        args.spawn_xcvrd = True
+    sys.path.insert(0, SCRIPT_DIR)
+    from swsscommon import swsscommon
+
+    try:
+        churn = Churn(swsscommon, args.poll_ms / 1000.0)
+    except RuntimeError as e:
+        print("port_churn: {}".format(e), file=sys.stderr)
+        sys.exit(1)
+
+    daemon = thread = None
+    workdir = tempfile.TemporaryDirectory(prefix="port_churn_")
+    if args.spawn_xcvrd:
+        from xcvrd import xcvrd
+        daemon = xcvrd.DaemonXcvrd(xcvrd.SYSLOG_IDENTIFIER,
+                                   snapshot_path=os.path.join(workdir.name, "port_cache.json"))
+        thread = threading.Thread(target=daemon.run, daemon=True)
+        thread.start()
+
+    results = {
+        "format": RESULT_FORMAT,
+        "meta": {
+            "tool": "port_churn",
+            "backend": args.backend,
+            "xcvrd": "in-process" if daemon else "external",
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "params": {k: getattr(args, k) for k in ("ports", "breakout", "flaps", "verifications", "repeat")},
+        },
+        "benchmarks": {},
+    }
+    failed = False
+    try:
+        for name in names:
+            r = run_pattern(churn, name, args)
+            results["benchmarks"]["churn.{}".format(name)] = r
+            if r["timeouts"]:
+                failed = True
+            if r["converge_ms"] is not None:
+                print("{:<14} {:>7} events  write {:>10.3f} ms  converged {:>10.3f} ms  {:>12.1f} events/s{}".format(
+                    name, r["events"], r["write_ms"], r["converge_ms"], r["ops_per_s"] or 0.0,
+                    "  ({} timeouts)".format(r["timeouts"]) if r["timeouts"] else ""), file=sys.stderr)
+            else:
+                print("{:<14} did not converge within {}s".format(name, args.timeout), file=sys.stderr)
+    finally:
+        churn.cleanup()
+        if daemon is not None:
+            daemon.stop_event.set()
+            thread.join(timeout=5)
+            results["meta"]["xcvrd_startup"] = daemon.startup_stats
+        workdir.cleanup()
+
+    out = args.out or "port_churn_{}_{}_{}.json".format(
+        args.backend, results["meta"]["revision"] or "norev", time.strftime("%Y%m%d_%H%M%S"))
+    with open(out, "w") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+    print("Wrote {}".format(out), file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""Stand-in for sonic_platform_base.chassis_base."""
+
+
+class ChassisBase(object):
+    def __init__(self, *args, **kwargs):
+        self._component_list = []
+        self._fan_list = []
+        self._psu_list = []
+        self._thermal_list = []
+        self._sfp_list = []
@@ -0,0 +1,9 @@
+"""Stand-in for sonic_platform_base.platform_base."""
+
+
+class PlatformBase(object):
+    def __init__(self, *args, **kwargs):
+        self._chassis = None
+
+    def get_chassis(self):
+        return self._chassis
@@ -0,0 +1,42 @@
+"""Stand-in for sonic_py_common.daemon_base, backed by the in-memory swsscommon."""
+
+import signal
+import sys
+import threading
+
+from swsscommon import swsscommon
+
+from .logger import Logger
+
+
+def db_connect(db_name, namespace=""):
+    return swsscommon.DBConnector(db_name, 0)
+
+
+class DaemonBase(Logger):
+    def __init__(self, log_identifier, use_syslogger=True, enable_runtime_log_config=False):
+        super(DaemonBase, self).__init__(log_identifier)
+
+        # Like the real DaemonBase: route SIGHUP/SIGINT/SIGTERM to
+        # signal_handler unless a handler is already registered.
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGHUP, signal.SIGINT, signal.SIGTERM):
+                if signal.getsignal(sig) in (signal.SIG_DFL, None):
+                    signal.signal(sig, self.signal_handler)
+
+    # Default signal handler; can be overridden by subclass
+    def signal_handler(self, sig, frame):
+        if sig == signal.SIGHUP:
+            self.log_info("DaemonBase: Caught SIGHUP - ignoring...")
+        elif sig == signal.SIGINT:
+            self.log_info("DaemonBase: Caught SIGINT - exiting...")
+            sys.exit(128 + sig)
+        elif sig == signal.SIGTERM:
+            self.log_info("DaemonBase: Caught SIGTERM - exiting...")
+            sys.exit(128 + sig)
+        else:
+            self.log_warning("DaemonBase: Caught unhandled signal '{}'".format(sig))
+
+    # Runs daemon; like upstream, subclasses must implement it
+    def run(self):
+        raise NotImplementedError()
@@ -0,0 +1,27 @@
+"""Stand-in for the interface name helpers of sonic_py_common.interface."""
+
+SONIC_INTERFACE_PREFIXES = {
+    "Ethernet-FrontPanel": "Ethernet",
+    "PortChannel": "PortChannel",
+    "Vlan": "Vlan",
+    "Loopback": "Loopback",
+    "Ethernet-Backplane": "Ethernet-BP",
+    "Ethernet-Inband": "Ethernet-IB",
+    "Ethernet-Recirc": "Ethernet-Rec",
+}
+
+
+def front_panel_prefix():
+    return SONIC_INTERFACE_PREFIXES["Ethernet-FrontPanel"]
+
+
+def backplane_prefix():
+    return SONIC_INTERFACE_PREFIXES["Ethernet-Backplane"]
+
+
+def inband_prefix():
+    return SONIC_INTERFACE_PREFIXES["Ethernet-Inband"]
+
+
+def recirc_prefix():
+    return SONIC_INTERFACE_PREFIXES["Ethernet-Recirc"]
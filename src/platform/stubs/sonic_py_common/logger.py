@@ -0,0 +1,58 @@
+"""
+    Stand-in for sonic_py_common.logger: Logger on top of the logging module
+    instead of syslog. Only warnings and errors are shown unless
+    SONIC_STUB_LOG_LEVEL is set (e.g. to INFO).
+"""
+
+import logging
+import os
+
+logging.basicConfig(format="%(asctime)s %(name)s %(levelname)s: %(message)s",
+                    level=os.environ.get("SONIC_STUB_LOG_LEVEL", "WARNING"))
+
+
+class Logger(object):
+    LOG_PRIORITY_ERROR = logging.ERROR
+    LOG_PRIORITY_WARNING = logging.WARNING
+    LOG_PRIORITY_NOTICE = logging.INFO
+    LOG_PRIORITY_INFO = logging.INFO
+    LOG_PRIORITY_DEBUG = logging.DEBUG
+
+    def __init__(self, log_identifier=None, *args, **kwargs):
+        self._logger = logging.getLogger(log_identifier or "sonic")
+
+    def set_min_log_priority(self, priority):
+        pass
+
+    def set_min_log_priority_error(self):
+        pass
+
+    def set_min_log_priority_warning(self):
+        pass
+
+    def set_min_log_priority_notice(self):
+        pass
+
+    def set_min_log_priority_info(self):
+        pass
+
+    def set_min_log_priority_debug(self):
+        pass
+
+    def log(self, priority, msg, also_print_to_console=False):
+        self._logger.log(priority, msg)
+
+    def log_error(self, msg, also_print_to_console=False):
+        self._logger.error(msg)
+
+    def log_warning(self, msg, also_print_to_console=False):
+        self._logger.warning(msg)
+
+    def log_notice(self, msg, also_print_to_console=False):
+        self._logger.info(msg)
+
+    def log_info(self, msg, also_print_to_console=False):
+        self._logger.info(msg)
+
+    def log_debug(self, msg, also_print_to_console=False):
+        self._logger.debug(msg)
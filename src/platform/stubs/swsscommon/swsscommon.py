@@ -0,0 +1,230 @@
+"""
+    In-memory stand-in for the parts of swsscommon used by the Alpine pmon
+    components (fake xcvrd, PCIe monitor, benchmarks and load generators).
+
+    Databases live in this process and are addressed by name, so every
+    DBConnector("STATE_DB", 0) shares the same tables. Table writes fan out
+    to SubscriberStateTables on the same table, NotificationProducer.send()
+    reaches NotificationConsumers on the same channel, and Select.select()
+    blocks until one of its selectables has data, like the Redis backed
+    implementation does.
+"""
+
+import threading
+import time
+
+SET_COMMAND = "SET"
+DEL_COMMAND = "DEL"
+APP_PORT_TABLE_NAME = "PORT_TABLE"
+STATE_PORT_TABLE_NAME = "PORT_TABLE"
+
+# One condition for all databases: writers notify it, Select waits on it.
+_cond = threading.Condition()
+_dbs = {}
+
+
+class _Database(object):
+    def __init__(self, name):
+        self.name = name
+        self.tables = {}         # table -> {key: {field: value}}
+        self.subscribers = {}    # table -> [SubscriberStateTable]
+        self.consumers = {}      # channel -> [NotificationConsumer]
+
+
+def reset():
+    """Drops every table, subscriber and consumer of every database."""
+    with _cond:
+        _dbs.clear()
+
+
+def _db(name):
+    with _cond:
+        if name not in _dbs:
+            _dbs[name] = _Database(name)
+        return _dbs[name]
+
+
+def FieldValuePairs(fvs):
+    return list(fvs)
+
+
+class DBConnector(object):
+    def __init__(self, db_name, timeout=0, *args):
+        self._db = _db(db_name)
+
+    def getDbName(self):
+        return self._db.name
+
+
+class Table(object):
+    def __init__(self, db, table_name):
+        self._db = db._db
+        self.name = table_name
+
+    def _entries(self):
+        return self._db.tables.setdefault(self.name, {})
+
+    def _publish(self, key, op, fvs):
+        for sub in self._db.subscribers.get(self.name, []):
+            sub._queue.append((key, op, tuple(fvs)))
+        _cond.notify_all()
+
+    def set(self, key, fvs, *args):
+        fvs = list(fvs)
+        with _cond:
+            self._entries().setdefault(key, {}).update(fvs)
+            self._publish(key, SET_COMMAND, fvs)
+
+    def hset(self, key, field, value):
+        self.set(key, [(field, value)])
+
+    def delete(self, key, *args):
+        with _cond:
+            if self._entries().pop(key, None) is not None:
+                self._publish(key, DEL_COMMAND, ())
+
+    def _del(self, key, *args):
+        self.delete(key)
+
+    def get(self, key):
+        with _cond:
+            entry = self._entries().get(key)
+            if entry is None:
+                return (False, ())
+            return (True, tuple(entry.items()))
+
+    def hget(self, key, field):
+        with _cond:
+            entry = self._entries().get(key, {})
+            return (field in entry, entry.get(field))
+
+    def getKeys(self):
+        with _cond:
+            return list(self._entries().keys())
+
+
+class ProducerStateTable(Table):
+    """Writes go straight to the table: there is no orchagent to drain a queue."""
+
+
+class Selectable(object):
+    def hasData(self):
+        raise NotImplementedError
+
+
+class SubscriberStateTable(Selectable):
+    def __init__(self, db, table_name, *args):
+        self._db = db._db
+        self.name = table_name
+        self._queue = []
+        with _cond:
+            self._db.subscribers.setdefault(table_name, []).append(self)
+            # Like the Redis implementation, start with the current contents.
+            for key, fields in self._db.tables.get(table_name, {}).items():
+                self._queue.append((key, SET_COMMAND, tuple(fields.items())))
+
+    def hasData(self):
+        return bool(self._queue)
+
+    def pops(self):
+        """Every pending change as ([keys], [ops], [field value tuples])."""
+        with _cond:
+            items, self._queue = self._queue, []
+        return tuple(list(col) for col in zip(*items)) if items else ([], [], [])
+
+    def pop(self):
+        with _cond:
+            if not self._queue:
+                raise RuntimeError("subscriber queue is empty, can't pop")
+            return self._queue.pop(0)
+
+
+def transpose_pops(m):
+    return [tuple(m[j][i] for j in range(len(m))) for i in range(len(m[0]))]
+
+
+class NotificationConsumer(Selectable):
+    def __init__(self, db, channel, *args):
+        self._db = db._db
+        self.channel = channel
+        self._queue = []
+        with _cond:
+            self._db.consumers.setdefault(channel, []).append(self)
+
+    def hasData(self):
+        return bool(self._queue)
+
+    def peek(self):
+        return len(self._queue)
+
+    def pop(self):
+        with _cond:
+            if not self._queue:
+                raise RuntimeError("notification queue is empty, can't pop")
+            return self._queue.pop(0)
+
+    def pops(self):
+        with _cond:
+            items, self._queue = self._queue, []
+        return items
+
+
+class NotificationProducer(object):
+    def __init__(self, db, channel):
+        self._db = db._db
+        self.channel = channel
+
+    def send(self, op, data, fvs):
+        """Delivers to every consumer of the channel; returns how many got it."""
+        with _cond:
+            consumers = self._db.consumers.get(self.channel, [])
+            for c in consumers:
+                c._queue.append((op, data, tuple(fvs)))
+            _cond.notify_all()
+            return len(consumers)
+
+
+class Select(object):
+    OBJECT = 0
+    ERROR = 1
+    TIMEOUT = 2
+
+    def __init__(self):
+        self._selectables = []
+        self._next = 0
+
+    def addSelectable(self, selectable):
+        self._selectables.append(selectable)
+
+    def removeSelectable(self, selectable):
+        self._selectables.remove(selectable)
+
+    def _ready(self):
+        # Round-robin so a busy table can't starve a notification channel.
+        n = len(self._selectables)
+        for i in range(n):
+            s = self._selectables[(self._next + i) % n]
+            if s.hasData():
+                self._next = (self._next + i + 1) % n
+                return s
+        return None
+
+    def select(self, timeout=1000, *args):
+        deadline = time.monotonic() + timeout / 1000.0
+        with _cond:
+            while True:
+                s = self._ready()
+                if s is not None:
+                    return (Select.OBJECT, s)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return (Select.TIMEOUT, None)
+                _cond.wait(remaining)
+
+
+def CastSelectableToRedisSelectObj(selectable):
+    return selectable if isinstance(selectable, SubscriberStateTable) else None
+
+
+def CastSelectableToNotificationConsumerObj(selectable):
+    return selectable if isinstance(selectable, NotificationConsumer) else None
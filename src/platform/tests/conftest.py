@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tools under src/platform are scripts, not a package; the SONiC base
+# packages are not installed off-target, so use the in-memory stand-ins.
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "stubs"))
+sys.path.insert(0, os.path.join(TESTS_DIR, ".."))
@@ -0,0 +1,38 @@
+import compileall
+import io
+import os
+
+import pytest
+
+import import_budget
+
+
+def test_parse_importtime():
+    text = ("import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:       300 |        900 | sonic_platform\n"
+            "not an importtime line\n")
+    assert import_budget.parse_importtime(text) == [("_io", 120, 120, 1), ("sonic_platform", 300, 900, 0)]
+
+
+def test_parse_budgets():
+    assert import_budget._parse_budgets(["sonic_platform.chassis=8000", "Chassis()=10"]) == \
+        {"sonic_platform.chassis": 8000, "Chassis()": 10}
+
+
+def test_deferred_modules_are_not_imported():
+    out = io.StringIO()
+    results, _ = import_budget.check(runs=1, stubs="auto", out=out)
+    assert set(results["imports"]) == set(import_budget.IMPORT_BUDGETS_US)
+    early = {m: r["deferred_but_loaded"] for m, r in results["imports"].items() if r["deferred_but_loaded"]}
+    assert not early, out.getvalue()
+
+
+@pytest.mark.skipif(os.environ.get("IMPORT_BUDGET_TIMING") != "1",
+                    reason="timing budgets are machine specific; set IMPORT_BUDGET_TIMING=1 to check them")
+def test_imports_within_budget():
+    # Time the imports, not the compiler: make sure the bytecode is cached.
+    compileall.compile_dir(import_budget.PLATFORM_API_DIR, quiet=1)
+    out = io.StringIO()
+    _, failures = import_budget.check(runs=5, stubs="auto", out=out)
+    assert not failures, out.getvalue()
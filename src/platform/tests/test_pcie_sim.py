@@ -0,0 +1,66 @@
+import argparse
+import os
+import threading
+
+import pytest
+import yaml
+
+import pcie_sim
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = str(tmp_path / "tree")
+    assert pcie_sim.generate(root, devices=10, missing=2) == 12
+    return root
+
+
+def totals(root):
+    out = dict.fromkeys(pcie_sim.AER_FILES, 0)
+    for dev_path in pcie_sim._list_devices(root):
+        for severity, fname in pcie_sim.AER_FILES.items():
+            out[severity] += sum(pcie_sim._parse_aer(os.path.join(dev_path, fname), severity).values())
+    return out
+
+
+def test_generate(tree):
+    with open(os.path.join(tree, "pcie.yaml")) as fh:
+        conf = yaml.safe_load(fh)
+    assert len(conf) == 12
+    assert conf[9] == dict(conf[9], bus="00", dev="01", fn="1")
+    assert len(pcie_sim._list_devices(tree)) == 10
+    assert os.access(os.path.join(tree, "bin", "lspci"), os.X_OK)
+    assert totals(tree) == {"correctable": 0, "fatal": 0, "non_fatal": 0}
+
+
+def test_advance_applies_rate_times_duration(tree):
+    applied = pcie_sim.advance(tree, {"correctable": 100.0, "fatal": 10.0}, interval=0.1, duration=0.3, seed=1)
+    assert applied == {"correctable": 30, "fatal": 3}
+    assert totals(tree) == {"correctable": 30, "fatal": 3, "non_fatal": 0}
+    # The files keep their TOTAL line in step with the counters.
+    dev_path = pcie_sim._list_devices(tree)[0]
+    with open(os.path.join(dev_path, pcie_sim.AER_FILES["correctable"])) as fh:
+        lines = dict(line.split() for line in fh)
+    total = int(lines.pop(pcie_sim.AER_TOTALS["correctable"]))
+    assert total == sum(int(v) for v in lines.values())
+
+
+def test_advance_stops_on_event(tree):
+    stop = threading.Event()
+    stop.set()
+    assert pcie_sim.advance(tree, {"correctable": 100.0}, interval=10.0, stop_event=stop) == {"correctable": 0}
+
+
+@pytest.mark.parametrize("kwargs", [{"interval": 0}, {"interval": -1}, {"duration": -1},
+                                    {"rates": {"fatal": -1.0}}])
+def test_advance_rejects_bad_arguments(tree, kwargs):
+    args = dict({"rates": {"correctable": 1.0}, "interval": 1.0, "duration": 1.0}, **kwargs)
+    with pytest.raises(ValueError):
+        pcie_sim.advance(tree, **args)
+
+
+def test_parse_rate():
+    assert pcie_sim._parse_rate("non_fatal=2.5") == ("non_fatal", 2.5)
+    for value in ("bogus=1", "correctable", "correctable=x", "correctable=-1"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            pcie_sim._parse_rate(value)
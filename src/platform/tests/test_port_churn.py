@@ -0,0 +1,61 @@
+import argparse
+import json
+
+import pytest
+from swsscommon import swsscommon
+
+import platform_bench
+import port_churn
+
+
+@pytest.fixture
+def dbs():
+    swsscommon.reset()
+    yield {name: swsscommon.DBConnector(name, 0) for name in ("APPL_DB", "APPL_STATE_DB")}
+    swsscommon.reset()
+
+
+def test_ports_use_dedicated_names():
+    assert port_churn.Churn.port(1, 2) == "EthernetChurn12"
+    assert all(p.startswith(port_churn.PORT_PREFIX) for p in port_churn.Churn.ports(4))
+
+
+def test_only_created_ports_are_deleted(dbs):
+    appl_state_port = swsscommon.Table(dbs["APPL_STATE_DB"], port_churn.PORT_TABLE)
+    appl_port = swsscommon.Table(dbs["APPL_DB"], port_churn.PORT_TABLE)
+    appl_state_port.set("Ethernet0", [("oper_status", "up")])
+    appl_port.set("Ethernet0", [("presence", "1")])
+
+    churn = port_churn.Churn(swsscommon, 0.001)
+    churn.set_port(churn.port(0))
+    appl_port.set(churn.port(0), [("presence", "1")])
+    churn.del_port("Ethernet0")
+    churn.clear_presence(["Ethernet0", churn.port(1)])
+    assert sorted(appl_state_port.getKeys()) == ["Ethernet0", "EthernetChurn0"]
+
+    churn.cleanup()
+    assert appl_state_port.getKeys() == ["Ethernet0"]
+    assert appl_port.getKeys() == ["Ethernet0"]
+
+
+def test_refuses_existing_generated_ports(dbs):
+    swsscommon.Table(dbs["APPL_STATE_DB"], port_churn.PORT_TABLE).set("EthernetChurn8", [("oper_status", "up")])
+    with pytest.raises(RuntimeError, match="already exist"):
+        port_churn.Churn(swsscommon, 0.001)
+
+
+def test_timed_out_pattern_keeps_the_result_layout(dbs, monkeypatch, tmp_path, capsys):
+    monkeypatch.setitem(port_churn.PATTERNS, "never", lambda churn, args: (lambda: None, lambda: (1, lambda: False)))
+    args = argparse.Namespace(repeat=2, timeout=0.01)
+    r = port_churn.run_pattern(port_churn.Churn(swsscommon, 0.001), "never", args)
+    assert r["timeouts"] == 2 and r["median_us"] is None and r["converge_ms"] is None
+
+    # platform_bench.py compare reports it as failed instead of crashing.
+    files = []
+    for name, median in (("base", 100.0), ("cand", None)):
+        path = str(tmp_path / (name + ".json"))
+        with open(path, "w") as fh:
+            json.dump({"meta": {}, "benchmarks": {"churn.never": dict(r, median_us=median)}}, fh)
+        files.append(path)
+    assert platform_bench.compare(argparse.Namespace(base=files[0], cand=files[1], threshold=10.0)) == 1
+    assert "| churn.never | 100.000 | failed | failed |" in capsys.readouterr().out
@@ -0,0 +1,207 @@
+import json
+import os
+import signal
+import threading
+
+import pytest
+from swsscommon import swsscommon
+
+from xcvrd import xcvrd
+from xcvrd.xcvrd import DaemonXcvrd
+
+
+@pytest.fixture
+def dbs():
+    swsscommon.reset()
+    yield {name: swsscommon.DBConnector(name, 0) for name in ("APPL_DB", "APPL_STATE_DB", "STATE_DB")}
+    swsscommon.reset()
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    return DaemonXcvrd(xcvrd.SYSLOG_IDENTIFIER, snapshot_path=str(tmp_path / "xcvrd" / "port_cache.json"))
+
+
+def add_ports(db, *ports):
+    tbl = swsscommon.Table(db, xcvrd.PORT_TABLE)
+    for port in ports:
+        tbl.set(port, swsscommon.FieldValuePairs([("oper_status", "up")]))
+    return tbl
+
+
+def test_snapshot_round_trip(daemon):
+    assert daemon._save_port_cache_snapshot({"Ethernet8", "Ethernet0"})
+    assert not os.path.exists(daemon.snapshot_path + ".tmp")
+    snapshot = daemon._load_port_cache_snapshot()
+    assert snapshot["ports"] == ["Ethernet0", "Ethernet8"]
+    assert snapshot["version"] == xcvrd.PORT_CACHE_SNAPSHOT_VERSION
+
+
+@pytest.mark.parametrize("content", ["{not json", json.dumps({"version": 99, "ports": []}),
+                                     json.dumps(["Ethernet0"])])
+def test_unusable_snapshot_is_ignored(daemon, content):
+    os.makedirs(os.path.dirname(daemon.snapshot_path))
+    with open(daemon.snapshot_path, "w") as f:
+        f.write(content)
+    assert daemon._load_port_cache_snapshot() is None
+
+
+def test_warm_start_reconciles_snapshot(daemon, dbs):
+    appl_state_tbl = add_ports(dbs["APPL_STATE_DB"], "Ethernet0", "Ethernet8", "Ethernet-BP0")
+    app_port_tbl = swsscommon.ProducerStateTable(dbs["APPL_DB"], swsscommon.APP_PORT_TABLE_NAME)
+    daemon._save_port_cache_snapshot({"Ethernet0", "Ethernet4"})
+
+    port_cache, stats = daemon._init_port_cache(appl_state_tbl, app_port_tbl, warm_start=True)
+
+    assert port_cache == {"Ethernet0", "Ethernet8", "Ethernet-BP0"}
+    assert stats["mode"] == "warm" and stats["added"] == 2 and stats["removed"] == 1
+    # Only the added front panel port gets presence; the cached one already has it.
+    assert sorted(app_port_tbl.getKeys()) == ["Ethernet8"]
+    assert daemon.port_cache_dirty
+    assert not os.path.exists(daemon.snapshot_path)
+
+
+def test_cold_start_ignores_and_removes_snapshot(daemon, dbs):
+    appl_state_tbl = add_ports(dbs["APPL_STATE_DB"], "Ethernet0", "Ethernet8")
+    app_port_tbl = swsscommon.ProducerStateTable(dbs["APPL_DB"], swsscommon.APP_PORT_TABLE_NAME)
+    daemon._save_port_cache_snapshot({"Ethernet4"})
+
+    port_cache, stats = daemon._init_port_cache(appl_state_tbl, app_port_tbl, warm_start=False)
+
+    assert port_cache == {"Ethernet0", "Ethernet8"}
+    assert stats == {"mode": "cold", "ports": 2}
+    assert app_port_tbl.getKeys() == []
+    assert not os.path.exists(daemon.snapshot_path)
+
+
+def test_warm_start_without_snapshot_is_cold(daemon, dbs):
+    appl_state_tbl = add_ports(dbs["APPL_STATE_DB"], "Ethernet0")
+    app_port_tbl = swsscommon.ProducerStateTable(dbs["APPL_DB"], swsscommon.APP_PORT_TABLE_NAME)
+    port_cache, stats = daemon._init_port_cache(appl_state_tbl, app_port_tbl, warm_start=True)
+    assert port_cache == {"Ethernet0"}
+    assert stats["mode"] == "cold"
+
+
+@pytest.mark.parametrize("key,enable,expected", [
+    (None, None, False),
+    ("system", "true", True),
+    ("pmon", "true", True),
+    ("system", "false", False),
+    ("swss", "true", False),
+])
+def test_is_warm_start(dbs, key, enable, expected):
+    if key is not None:
+        swsscommon.Table(dbs["STATE_DB"], xcvrd.WARM_RESTART_ENABLE_TABLE).set(
+            key, swsscommon.FieldValuePairs([("enable", enable)]))
+    assert xcvrd.is_warm_start(dbs["STATE_DB"]) is expected
+
+
+def test_sigterm_saves_snapshot_and_sets_exit_code(daemon, dbs):
+    add_ports(dbs["APPL_STATE_DB"], "Ethernet0", "Ethernet8")
+    runner = threading.Thread(target=daemon.run)
+    runner.start()
+    for _ in range(100):
+        if daemon.startup_stats is not None:
+            break
+        threading.Event().wait(0.01)
+    daemon.signal_handler(signal.SIGTERM, None)
+    runner.join(5)
+
+    assert not runner.is_alive()
+    assert daemon.exit_code == 128 + signal.SIGTERM
+    assert daemon._load_port_cache_snapshot()["ports"] == ["Ethernet0", "Ethernet8"]
+
+
+class FakeLedControl(object):
+    def __init__(self, tcvrs):
+        self.tcvrs = tcvrs
+        self.writes = []
+
+    def get_transceivers_with_leds(self):
+        return self.tcvrs
+
+    def port_link_state_change_extended(self, tcvr, statuses):
+        self.writes.append((tcvr, statuses))
+
+
+APPL_FIELDS = xcvrd.LED_STATUS_SOURCES[0][2]
+SET = swsscommon.SET_COMMAND
+DEL = swsscommon.DEL_COMMAND
+
+
+@pytest.fixture
+def leds():
+    led = FakeLedControl([1, 2])
+    return led, xcvrd.PortLedDriver(led, {"Ethernet0": "1", "Ethernet4": "1", "Ethernet8": "2"}, batch_msecs=0)
+
+
+def test_led_batches_per_transceiver(leds):
+    led, driver = leds
+    for port in ("Ethernet0", "Ethernet4", "Ethernet8"):
+        assert driver.update(port, SET, [("oper_status", "up"), ("speed", "400000")], 0.0, APPL_FIELDS)
+    assert driver.flush(1.0, force=True) == 2
+    assert sorted(led.writes) == [("1", [{"oper_status": "up"}, {"oper_status": "up"}]),
+                                  ("2", [{"oper_status": "up"}])]
+
+
+def test_led_ignores_unrelated_fields(leds):
+    led, driver = leds
+    assert not driver.update("Ethernet0", SET, [("speed", "400000")], 0.0, APPL_FIELDS)
+    driver.update("Ethernet0", SET, [("oper_status", "up")], 0.0, APPL_FIELDS)
+    driver.flush(1.0, force=True)
+    assert not driver.update("Ethernet0", SET, [("oper_status", "up"), ("mtu", "9100")], 1.0, APPL_FIELDS)
+    # health_ind comes from another table; the APPL_DB source can't set it.
+    assert not driver.update("Ethernet0", SET, [("health_ind", "bad")], 1.0, APPL_FIELDS)
+    assert driver.pending_msecs(1.0) is None
+
+
+def test_led_merges_sources_and_del(leds):
+    led, driver = leds
+    driver.update("Ethernet8", SET, [("oper_status", "up")], 0.0, APPL_FIELDS)
+    driver.update("Ethernet8", SET, [("health_ind", "good")], 0.0, ("health_ind", "lacp_state"))
+    driver.flush(1.0, force=True)
+    assert led.writes[-1] == ("2", [{"oper_status": "up", "health_ind": "good"}])
+    # A DEL from APPL_DB drops only the fields it owns.
+    assert driver.update("Ethernet8", DEL, (), 1.0, APPL_FIELDS)
+    driver.flush(2.0, force=True)
+    assert led.writes[-1] == ("2", [{"health_ind": "good"}])
+
+
+def test_led_follows_port_config(leds):
+    led, driver = leds
+    driver.update("Ethernet4", SET, [("oper_status", "up")], 0.0, APPL_FIELDS)
+    driver.flush(1.0, force=True)
+    # Another field of the port changed: no remap, nothing to write.
+    assert not driver.update_port_config("Ethernet4", SET, [("mtu", "9100")], 1.0)
+    # Moving the port rewrites both transceivers.
+    assert driver.update_port_config("Ethernet4", SET, [("index", "2"), ("mtu", "9100")], 1.0)
+    driver.flush(2.0, force=True)
+    assert sorted(led.writes[-2:]) == [("1", []), ("2", [{"oper_status": "up"}])]
+    # A new port is picked up, and a removed one clears its LED.
+    driver.update("Ethernet12", SET, [("oper_status", "down")], 2.0, APPL_FIELDS)
+    assert driver.pending_msecs(2.0) is None
+    assert driver.update_port_config("Ethernet12", SET, [("index", "1")], 2.0)
+    assert driver.update_port_config("Ethernet4", DEL, (), 2.0)
+    driver.flush(3.0, force=True)
+    assert sorted(led.writes[-2:]) == [("1", [{"oper_status": "down"}]), ("2", [])]
+
+
+def test_led_driver_in_daemon(tmp_path, dbs):
+    led = FakeLedControl([1])
+    config_db = swsscommon.DBConnector("CONFIG_DB", 0)
+    swsscommon.Table(config_db, xcvrd.CFG_PORT_TABLE).set("Ethernet0", [("index", "1")])
+    app_port_tbl = swsscommon.Table(dbs["APPL_DB"], swsscommon.APP_PORT_TABLE_NAME)
+    app_port_tbl.set("Ethernet0", [("admin_status", "up"), ("oper_status", "up")])
+    daemon = DaemonXcvrd(xcvrd.SYSLOG_IDENTIFIER, snapshot_path=str(tmp_path / "port_cache.json"),
+                         led_control=led)
+    runner = threading.Thread(target=daemon.run)
+    runner.start()
+    try:
+        for _ in range(200):
+            if led.writes:
+                break
+            threading.Event().wait(0.01)
+        assert led.writes[-1] == ("1", [{"admin_status": "up", "oper_status": "up"}])
+    finally:
+        daemon.stop_event.set()
+        runner.join(5)
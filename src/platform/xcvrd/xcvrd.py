@@ -5,9 +5,23 @@
     Fake transceiver information update daemon for SONiC Alpine
 """
 
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+
 from sonic_py_common import daemon_base, logger, interface
 from swsscommon import swsscommon
 
+try:
+    from sonic_platform import profiling
+except ImportError:
+    # Profiling hooks are optional; xcvrd also runs where sonic_platform isn't installed.
+    profiling = None
+
 SYSLOG_IDENTIFIER = "xcvrd"
 PORT_TABLE = 'PORT_TABLE'
 XCVRD_MAIN_THREAD_SLEEP_SECS = 60
@@ -16,20 +30,305 @@ SELECT_TIMEOUT_MSECS = 1000
 COMPONENT_NAME = "pmon:xcvrd"
 VERIFY_STATE_REQ_CHANNEL = "VERIFY_STATE_REQ_CHANNEL"
 
+# Port cache snapshot, used only on a warm start (warm reboot, or a pmon
+# restart with warm restart enabled). /var/warmboot is where SONiC
+# containers see the host's /host/warmboot.
+PORT_CACHE_SNAPSHOT_FILE = os.environ.get("XCVRD_PORT_CACHE_SNAPSHOT",
+                                          "/var/warmboot/xcvrd/port_cache.json")
+PORT_CACHE_SNAPSHOT_INTERVAL_SECS = 60
+PORT_CACHE_SNAPSHOT_VERSION = 1
+WARM_RESTART_ENABLE_TABLE = "WARM_RESTART_ENABLE_TABLE"
+
+# DaemonBase leaves SIGINT to Python's KeyboardInterrupt handler, so it never
+# reaches signal_handler; run() still writes the snapshot on that path.
+FATAL_SIGNALS = [signal.SIGTERM]
+
+# Unified LED mode: xcvrd drives the transceiver LEDs itself (instead of ledd).
+DRIVE_LEDS = os.environ.get("XCVRD_DRIVE_LEDS", "0") == "1"
+CFG_PORT_TABLE = "PORT"
+# Where each LED status field is published: (database, table, fields).
+# orchagent keeps admin/oper status in APPL_DB PORT_TABLE; link health and
+# the LACP actor state are kept per port in STATE_DB PORT_TABLE.
+LED_STATUS_SOURCES = (
+    ("APPL_DB", "PORT_TABLE", ("admin_status", "oper_status")),
+    ("STATE_DB", "PORT_TABLE", ("health_ind", "lacp_state")),
+)
+# LED changes that arrive within this window are written together.
+LED_BATCH_MSECS = 20
+LED_LAG_SAMPLES = 1024
+# Batches touching at least this many transceivers are logged with their lag.
+LED_MASS_CHANGE_TRANSCEIVERS = 8
+
 # Global logger instance for helper functions and classes
 helper_logger = logger.Logger(SYSLOG_IDENTIFIER)
 helper_logger.set_min_log_priority_info()
 
 
+#
+# LEDs =========================================================================
+#
+
+class PortLedDriver(object):
+    """
+    Drives the chassis LedControl from port status events. Status fields
+    are tracked per logical port, and logical ports are grouped by the
+    transceiver index from CONFIG_DB PORT, which is followed as ports are
+    added, removed or broken out. A transceiver is marked dirty only when
+    a field it uses changes, and all dirty transceivers are written in one
+    batch once LED_BATCH_MSECS have passed since the previous batch. A
+    mass link-state change therefore costs one
+    port_link_state_change_extended call per transceiver, not one per
+    event.
+    """
+
+    def __init__(self, led_control, port_to_tcvr=None, batch_msecs=LED_BATCH_MSECS):
+        self._led_control = led_control
+        self._tcvrs_with_leds = set(str(t) for t in led_control.get_transceivers_with_leds())
+        self._port_to_tcvr = {}     # logical port -> transceiver
+        self._tcvr_ports = {}       # transceiver -> set of logical ports
+        self._statuses = {}         # logical port -> status fields
+        self._batch_secs = batch_msecs / 1000.0
+        self._dirty = {}            # transceiver -> time of the oldest unwritten change
+        self._last_flush = 0.0
+        self.lags_ms = deque(maxlen=LED_LAG_SAMPLES)
+        self.batches = 0
+        self.writes = 0
+        for logical_port, tcvr in (port_to_tcvr or {}).items():
+            self._map_port(logical_port, str(tcvr))
+
+    def _map_port(self, logical_port, tcvr):
+        old = self._port_to_tcvr.pop(logical_port, None)
+        if old is not None:
+            self._tcvr_ports[old].discard(logical_port)
+        if tcvr is not None:
+            self._port_to_tcvr[logical_port] = tcvr
+            self._tcvr_ports.setdefault(tcvr, set()).add(logical_port)
+        return old
+
+    def _mark_dirty(self, tcvr, now):
+        if tcvr is None or tcvr not in self._tcvrs_with_leds:
+            return False
+        self._dirty.setdefault(tcvr, now)
+        return True
+
+    def update_port_config(self, logical_port, op, fvp, now):
+        """Records one CONFIG_DB PORT event; returns True if a transceiver LED needs a write."""
+        if op == swsscommon.DEL_COMMAND:
+            tcvr = None
+        else:
+            tcvr = dict(fvp or ()).get("index")
+            if tcvr is None:
+                # Some other field changed; the port stays where it is.
+                return False
+            tcvr = str(tcvr)
+        if self._port_to_tcvr.get(logical_port) == tcvr:
+            return False
+        old = self._map_port(logical_port, tcvr)
+        if logical_port not in self._statuses:
+            return False
+        dirty = self._mark_dirty(old, now)
+        return self._mark_dirty(tcvr, now) or dirty
+
+    def update(self, logical_port, op, fvp, now, fields):
+        """
+        Records one port status event carrying `fields`; returns True if a
+        transceiver LED needs a write.
+        """
+        status = self._statuses.get(logical_port, {})
+        if op == swsscommon.DEL_COMMAND:
+            new = {k: v for k, v in status.items() if k not in fields}
+        else:
+            new = dict(status)
+            new.update((k, v) for k, v in (fvp or ()) if k in fields)
+        if new == status:
+            return False
+        if new:
+            self._statuses[logical_port] = new
+        else:
+            del self._statuses[logical_port]
+        return self._mark_dirty(self._port_to_tcvr.get(logical_port), now)
+
+    def pending_msecs(self, now):
+        """Milliseconds until the next batch is due, or None if nothing is pending."""
+        if not self._dirty:
+            return None
+        return max(0, int((self._last_flush + self._batch_secs - now) * 1000))
+
+    def flush(self, now, force=False):
+        """Writes every dirty transceiver LED if a batch is due; returns how many were written."""
+        if not self._dirty or (not force and now < self._last_flush + self._batch_secs):
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        for tcvr in dirty:
+            ports = sorted(self._tcvr_ports.get(tcvr, ()))
+            self._led_control.port_link_state_change_extended(
+                tcvr, [self._statuses[p] for p in ports if p in self._statuses])
+        done = time.monotonic()
+        lags = [(done - t) * 1000.0 for t in dirty.values()]
+        self.lags_ms.extend(lags)
+        self._last_flush = done
+        self.batches += 1
+        self.writes += len(dirty)
+        if len(dirty) >= LED_MASS_CHANGE_TRANSCEIVERS:
+            helper_logger.log_info("LED batch: {} transceivers, lag max {:.1f} ms".format(
+                len(dirty), max(lags)))
+        return len(dirty)
+
+    def lag_stats(self):
+        """Lag from a port event being read to its LED being written, over recent writes."""
+        lags = sorted(self.lags_ms)
+        if not lags:
+            return {"batches": self.batches, "writes": self.writes}
+        return {
+            "batches": self.batches,
+            "writes": self.writes,
+            "p50_ms": round(lags[len(lags) // 2], 3),
+            "p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))], 3),
+            "max_ms": round(lags[-1], 3),
+        }
+
+
+def load_led_control():
+    """The chassis LedControl from the platform plugin, or None if it can't be loaded."""
+    try:
+        from sonic_platform.platform import Platform
+        return Platform().get_chassis().get_led_control()
+    except Exception as e:
+        helper_logger.log_error("Unable to load LED control from sonic_platform: {}".format(e))
+        return None
+
+
+def is_warm_start(state_db):
+    """True if STATE_DB has warm restart enabled for the system or the pmon container."""
+    warm_restart_tbl = swsscommon.Table(state_db, WARM_RESTART_ENABLE_TABLE)
+    for key in ("system", "pmon"):
+        found, fvs = warm_restart_tbl.get(key)
+        if found and dict(fvs).get("enable") == "true":
+            return True
+    return False
+
+
 #
 # Daemon =======================================================================
 #
 
 class DaemonXcvrd(daemon_base.DaemonBase):
-    def __init__(self, log_identifier):
+    def __init__(self, log_identifier, snapshot_path=PORT_CACHE_SNAPSHOT_FILE, led_control=None):
         super(DaemonXcvrd, self).__init__(log_identifier)
 
         self.timeout = XCVRD_MAIN_THREAD_SLEEP_SECS
+        self.stop_event = threading.Event()
+        self.snapshot_path = snapshot_path
+        self.port_cache_dirty = False
+        # Filled in once the port cache is consistent after start.
+        self.startup_stats = None
+        # With an LedControl, xcvrd drives the transceiver LEDs (unified LED mode).
+        self.led_control = led_control
+        self.led_driver = None
+        # Set by a fatal signal: main() exits with it once run() has returned.
+        self.exit_code = None
+
+    def signal_handler(self, sig, frame):
+        if sig in FATAL_SIGNALS:
+            helper_logger.log_info("Caught signal {} - exiting...".format(sig))
+            # Stop the loop so the snapshot is written, then exit like DaemonBase does.
+            self.exit_code = 128 + sig
+            self.stop_event.set()
+        else:
+            helper_logger.log_warning("Caught unhandled signal {} - ignoring...".format(sig))
+
+    def _save_port_cache_snapshot(self, port_cache):
+        """
+        Writes the port cache to the snapshot file: a temporary file is
+        written and synced, then renamed over the old snapshot, so a reader
+        sees either the old or the new snapshot, never a partial one.
+
+        Returns:
+            bool: True if the snapshot was written.
+        """
+        snapshot = {
+            "version": PORT_CACHE_SNAPSHOT_VERSION,
+            "timestamp": time.time(),
+            "ports": sorted(port_cache),
+        }
+        tmp_path = self.snapshot_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+        except (IOError, OSError) as e:
+            helper_logger.log_warning("Unable to write port cache snapshot {}: {}".format(
+                self.snapshot_path, e))
+            return False
+        self.port_cache_dirty = False
+        return True
+
+    def _load_port_cache_snapshot(self):
+        """
+        Reads the port cache snapshot.
+
+        Returns:
+            dict: The snapshot, or None if there is none or it can't be used.
+        """
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (IOError, OSError, ValueError) as e:
+            helper_logger.log_warning("Ignoring unreadable port cache snapshot {}: {}".format(
+                self.snapshot_path, e))
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get("version") != PORT_CACHE_SNAPSHOT_VERSION \
+                or not isinstance(snapshot.get("ports"), list):
+            helper_logger.log_warning("Ignoring port cache snapshot {} with unknown format".format(
+                self.snapshot_path))
+            return None
+        return snapshot
+
+    def _remove_port_cache_snapshot(self):
+        try:
+            os.remove(self.snapshot_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            helper_logger.log_warning("Unable to remove port cache snapshot {}: {}".format(
+                self.snapshot_path, e))
+
+    def _init_port_cache(self, appl_state_port_tbl, app_port_tbl, warm_start):
+        """
+        Builds the port cache at start. On a cold start, or without a
+        snapshot, every port in APPL_STATE_DB is taken as already having
+        presence. On a warm start with a snapshot, the cache starts from
+        the snapshot and only the ports added or removed since it was taken
+        are reconciled: added ports get presence right away instead of
+        waiting for their next PORT_TABLE event. The snapshot is removed
+        either way, so it is never used for a later start.
+
+        Returns:
+            tuple: (port cache, dict describing how it was built)
+        """
+        current = set(appl_state_port_tbl.getKeys())
+        snapshot = self._load_port_cache_snapshot() if warm_start else None
+        self._remove_port_cache_snapshot()
+        if snapshot is None:
+            return current, {"mode": "cold", "ports": len(current)}
+
+        port_cache = set(snapshot["ports"])
+        added = current - port_cache
+        removed = port_cache - current
+        app_port_tbl_fvs = swsscommon.FieldValuePairs([("presence", "1")])
+        for logical_port in sorted(added):
+            if not logical_port.startswith(interface.backplane_prefix()):
+                app_port_tbl.set(logical_port, app_port_tbl_fvs)
+        port_cache = (port_cache - removed) | added
+        self.port_cache_dirty = bool(added or removed)
+        return port_cache, {"mode": "warm", "ports": len(port_cache), "added": len(added),
+                            "removed": len(removed),
+                            "snapshot_age_secs": round(time.time() - snapshot.get("timestamp", 0), 1)}
 
     def _process_appl_state_port_table_event(self, logical_port, op, fvp, port_cache,
                                              appl_state_port_tbl, app_port_tbl):
@@ -49,9 +348,13 @@ class DaemonXcvrd(daemon_base.DaemonBase):
         if op == swsscommon.SET_COMMAND:
             if not fvp:
                 return
-            port_cache.add(logical_port)
+            if logical_port not in port_cache:
+                port_cache.add(logical_port)
+                self.port_cache_dirty = True
         elif op == swsscommon.DEL_COMMAND:
-            port_cache.remove(logical_port)
+            if logical_port in port_cache:
+                port_cache.remove(logical_port)
+                self.port_cache_dirty = True
 
     def _process_state_verification_notification_channel(
             self, sv_ntf_consumer, verify_state_tbl):
@@ -89,6 +392,7 @@ class DaemonXcvrd(daemon_base.DaemonBase):
         helper_logger.log_info(
             "Start notification channel and DB change subscribing loop"
         )
+        start_time = time.monotonic()
 
         # Initialize database objects
         sel = swsscommon.Select()
@@ -110,55 +414,111 @@ class DaemonXcvrd(daemon_base.DaemonBase):
             state_db, VERIFY_STATE_REQ_CHANNEL)
         sel.addSelectable(sv_ntf_consumer)
 
-        # Initialize port cache with ports in app state db
-        port_cache = set(appl_state_port_tbl.getKeys())
-
-        # Listen indefinitely for Redis DB notifications
-        while True:
-            (state, selectableObj) = sel.select(SELECT_TIMEOUT_MSECS)
-
-            if state == swsscommon.Select.TIMEOUT:
-                # Do not flood log when select times out
-                continue
-            if state != swsscommon.Select.OBJECT:
-                helper_logger.log_warning("sel.select() did not return "
-                                          "swsscommon.Select.OBJECT")
-                continue
-
-            # Get the right selectable object
-            is_redis_select = True
-            selectObj = swsscommon.CastSelectableToRedisSelectObj(selectableObj)
-            if selectObj is None:
-                # The select object is NotificationConsumer instead of RedisSelect.
-                is_redis_select = False
-                selectObj = swsscommon.CastSelectableToNotificationConsumerObj(
-                    selectableObj)
-                if selectObj is None:
-                    helper_logger.log_error("Found None type selectObj")
-                    continue
+        # In unified LED mode, follow the port to transceiver map and the status
+        # fields of every port. Each subscriber starts with its table's contents.
+        led_subscribers = []
+        if self.led_control is not None:
+            self.led_driver = PortLedDriver(self.led_control)
+            led_subscribers.append((swsscommon.SubscriberStateTable(
+                daemon_base.db_connect("CONFIG_DB"), CFG_PORT_TABLE), None))
+            for db_name, table_name, fields in LED_STATUS_SOURCES:
+                led_subscribers.append((swsscommon.SubscriberStateTable(
+                    daemon_base.db_connect(db_name), table_name), fields))
+            for subscriber, _ in led_subscribers:
+                sel.addSelectable(subscriber)
+            helper_logger.log_info("Driving transceiver LEDs")
+
+        # Initialize port cache from the snapshot on a warm start, else the ports in app state db
+        port_cache, startup_stats = self._init_port_cache(appl_state_port_tbl, app_port_tbl,
+                                                          is_warm_start(state_db))
+        next_snapshot = time.monotonic() + PORT_CACHE_SNAPSHOT_INTERVAL_SECS
 
-            if is_redis_select:
-                # Pop DB change
-                redis_event_list = swsscommon.transpose_pops(
-                    appl_state_port_subscriber_tbl.pops())
-                for key, op, fvp in redis_event_list:
-                    self._process_appl_state_port_table_event(
-                        key, op, fvp, port_cache, appl_state_port_tbl, app_port_tbl)
-            else:
-                self._process_state_verification_notification_channel(
-                    sv_ntf_consumer, verify_state_tbl)
+        try:
+            # Listen for Redis DB notifications until asked to stop
+            while not self.stop_event.is_set():
+                if self.startup_stats is None and not appl_state_port_subscriber_tbl.hasData():
+                    # The initial PORT_TABLE dump has been handled: the cache is consistent.
+                    startup_stats["consistent_ms"] = round(
+                        (time.monotonic() - start_time) * 1000.0, 1)
+                    self.startup_stats = startup_stats
+                    helper_logger.log_notice("Port cache consistent {} ms after start: {}".format(
+                        startup_stats["consistent_ms"], startup_stats))
+
+                now = time.monotonic()
+                if now >= next_snapshot:
+                    if self.port_cache_dirty:
+                        self._save_port_cache_snapshot(port_cache)
+                    next_snapshot = now + PORT_CACHE_SNAPSHOT_INTERVAL_SECS
+
+                timeout = SELECT_TIMEOUT_MSECS
+                if self.led_driver is not None:
+                    self.led_driver.flush(now)
+                    pending = self.led_driver.pending_msecs(time.monotonic())
+                    if pending is not None:
+                        timeout = min(timeout, max(1, pending))
+
+                (state, selectableObj) = sel.select(timeout)
+
+                if state == swsscommon.Select.TIMEOUT:
+                    # Do not flood log when select times out
+                    continue
+                if state != swsscommon.Select.OBJECT:
+                    helper_logger.log_warning("sel.select() did not return "
+                                              "swsscommon.Select.OBJECT")
+                    continue
 
-        helper_logger.log_info(
-            "Stop notification channel and DB change subscribing loop"
-        )
+                # Get the right selectable object
+                is_redis_select = True
+                selectObj = swsscommon.CastSelectableToRedisSelectObj(selectableObj)
+                if selectObj is None:
+                    # The select object is NotificationConsumer instead of RedisSelect.
+                    is_redis_select = False
+                    selectObj = swsscommon.CastSelectableToNotificationConsumerObj(
+                        selectableObj)
+                    if selectObj is None:
+                        helper_logger.log_error("Found None type selectObj")
+                        continue
+
+                if is_redis_select:
+                    # Pop DB change
+                    redis_event_list = swsscommon.transpose_pops(
+                        appl_state_port_subscriber_tbl.pops())
+                    for key, op, fvp in redis_event_list:
+                        self._process_appl_state_port_table_event(
+                            key, op, fvp, port_cache, appl_state_port_tbl, app_port_tbl)
+                    # The LED tables are drained whichever table was selected.
+                    now = time.monotonic()
+                    for subscriber, fields in led_subscribers:
+                        for key, op, fvp in swsscommon.transpose_pops(subscriber.pops()):
+                            if fields is None:
+                                self.led_driver.update_port_config(key, op, fvp, now)
+                            else:
+                                self.led_driver.update(key, op, fvp, now, fields)
+                else:
+                    self._process_state_verification_notification_channel(
+                        sv_ntf_consumer, verify_state_tbl)
+        finally:
+            # Also on KeyboardInterrupt (SIGINT), which still ends the daemon.
+            self._save_port_cache_snapshot(port_cache)
+            if self.led_driver is not None:
+                self.led_driver.flush(time.monotonic(), force=True)
+                helper_logger.log_info("LED lag: {}".format(self.led_driver.lag_stats()))
+            helper_logger.log_info(
+                "Stop notification channel and DB change subscribing loop"
+            )
 
 #
 # Main =========================================================================
 #
 
 def main():
-    xcvrd = DaemonXcvrd(SYSLOG_IDENTIFIER)
+    if profiling is not None:
+        profiling.install_from_env(SYSLOG_IDENTIFIER)
+    led_control = load_led_control() if DRIVE_LEDS else None
+    xcvrd = DaemonXcvrd(SYSLOG_IDENTIFIER, led_control=led_control)
     xcvrd.run()
+    if xcvrd.exit_code is not None:
+        sys.exit(xcvrd.exit_code)
 
 if __name__ == '__main__':
     main()
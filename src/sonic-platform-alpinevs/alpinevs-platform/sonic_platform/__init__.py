@@ -1,3 +1,18 @@
+import importlib
+import os
+
 __all__ = ["platform","chassis","telemetry_device"]
-from sonic_platform import *
 
+
+def __getattr__(name):
+    # Submodules are imported on first use, so "import sonic_platform" stays
+    # cheap for daemons and CLI commands that only need part of the package.
+    if name in __all__:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+# Opt-in SIGUSR1/SIGUSR2 profiling for whichever process loads the platform.
+if os.environ.get("SONIC_PROFILE_DIR"):
+    from sonic_platform import profiling
+    profiling.install_from_env()
@@ -1,9 +1,6 @@
 try:
     import os
-    import json
     from sonic_platform_base.chassis_base import ChassisBase
-    from sonic_platform.telemetry_device import TelemetryDevice
-    from sonic_platform import led_control
 except ImportError as e:
     raise ImportError(str(e) + "- required module not found")
 
@@ -21,12 +18,21 @@ class Chassis(ChassisBase):
     def __init__(self):
         ChassisBase.__init__(self)
 
-        self._telemetry_device_list = []
-        config_list = self._parse_telemetry_json_dir(self.TELEMETRY_DIR)
-        for cf in config_list:
-            self._telemetry_device_list.append(TelemetryDevice(cf, self.DYNAMIC_TELEMETRY_DIR))
+        # Telemetry devices and the LED controller are built on first use:
+        # most daemons that create a Chassis never touch them.
+        self._telemetry_device_list = None
+        self._led_control = None
 
-        self._add_leds()
+    @property
+    def _port_status_led(self):
+        if self._led_control is None:
+            self._add_leds()
+        return self._led_control
+
+    @_port_status_led.setter
+    def _port_status_led(self, value):
+        # ChassisBase.__init__ may assign the attribute; keep it assignable.
+        self._led_control = value
 
     def _parse_telemetry_json_dir(self, directory):
         """
@@ -40,6 +46,8 @@ class Chassis(ChassisBase):
         Returns:
             list: A list of json configs parsed from the telemetry directory.
         """
+        import json
+
         cf_list = []
         try:
             configs = [config for config in os.listdir(directory) if config.endswith(".json")]
@@ -124,9 +132,26 @@ class Chassis(ChassisBase):
             A list of objects representing all telemetry
             devices available on this chassis.
         """
+        if self._telemetry_device_list is None:
+            from sonic_platform.telemetry_device import TelemetryDevice
+
+            config_list = self._parse_telemetry_json_dir(self.TELEMETRY_DIR)
+            self._telemetry_device_list = [TelemetryDevice(cf, self.DYNAMIC_TELEMETRY_DIR)
+                                           for cf in config_list]
         return self._telemetry_device_list
 
+    def get_led_control(self):
+        """
+        Retrieves the transceiver LED controller of this chassis.
+
+        Returns:
+            A LedControl object, created on first use.
+        """
+        return self._port_status_led
+
     def _add_leds(self):
+        from sonic_platform import led_control
+
         # Initialize LED controller.
         register_state_lookup = {
             led_control.LedState.OFF: 0x00,
@@ -143,5 +168,5 @@ class Chassis(ChassisBase):
         for i in range(33, 35):
             sysfs_paths[str(i)] = self.PATH_SFP_PLUS_LED_FMT.format(i)
 
-        self._port_status_led = led_control.LedControl(sysfs_paths,
-                                                       register_state_lookup)
+        self._led_control = led_control.LedControl(sysfs_paths,
+                                                   register_state_lookup)
@@ -1,10 +1,9 @@
 """Platform specific class for interaction with LED."""
-import copy
+# Annotations are not evaluated at runtime, so typing need not be imported.
+from __future__ import annotations
+
 import enum
 import logging
-import sys
-import typing
-from typing import Optional, Union
 
 from sonic_platform_base.led_base import LedBase
 
@@ -59,7 +58,7 @@ class LedControl(LedBase):
     for tcvr in self._sysfs_paths.keys():
       self._write_led_file(tcvr, LedState.OFF)
 
-  def _write_led_file(self, tcvr: Optional[str], led_state: LedState):
+  def _write_led_file(self, tcvr: str | None, led_state: LedState):
     """Writes the desired led state to an LED sysfs entry.
 
     Args:
@@ -153,8 +152,8 @@ class LedControl(LedBase):
 
   def port_link_state_change_extended(
       self,
-      tcvr_idx: Optional[str],
-      statuses: list[Union[dict[str, str], str]],
+      tcvr_idx: str | None,
+      statuses: list[dict[str, str] | str],
   ):
     """Called when a transceiver link state changes, update transceiver link state LED here.
 
@@ -171,12 +170,13 @@ class LedControl(LedBase):
             'lacp_state': 'distributing',
             'health_ind': 'good' } ]
     """
-    # Take a copy of the input since it is going to be modified by this method.
-    # We don't want these modifications to be reflected in the daemon.
-    statuses = copy.deepcopy(statuses)
     if not isinstance(statuses, list):
       # Handle as empty list of statuses, which will be LED off.
       statuses = []
+    # Take a copy of the input since it is going to be modified by this method.
+    # We don't want these modifications to be reflected in the daemon. Status
+    # values are strings, so copying each dictionary is enough.
+    statuses = [dict(s) if isinstance(s, dict) else s for s in statuses]
 
     led_states = []
     for status in statuses:
@@ -3,11 +3,7 @@
 #
 
 import os
-import yaml
-import subprocess
-import re
 import sys
-from copy import deepcopy
 try:
     from .pcie_base import PcieBase
 except ImportError as e:
@@ -16,6 +12,9 @@ except ImportError as e:
 
 class Pcie(PcieBase):
     """Platform-specific PCIEutil class"""
+    # sysfs-like directory holding one <domain>:<bus>:<dev>.<fn> entry per device
+    PCI_DEVICE_DIR = '/usr/share/sonic/device/pci'
+
     # got the config file path
     def __init__(self, path):
         self.config_path = path
@@ -23,6 +22,10 @@ class Pcie(PcieBase):
 
     # load the config file
     def load_config_file(self):
+        # yaml, subprocess and re are imported where they are used: most
+        # users of this module only read sysfs.
+        import yaml
+
         conf_rev = "_{}".format(self._conf_rev) if self._conf_rev else ""
         config_file = "{}/pcie{}.yaml".format(self.config_path, conf_rev)
         try:
@@ -35,6 +38,10 @@ class Pcie(PcieBase):
 
     # load current PCIe device
     def get_pcie_device(self):
+        import re
+        import subprocess
+        from copy import deepcopy
+
         pciDict = {}
         pciList = []
         p1 = "^(\w+):(\w+)\.(\w)\s(.*)\s*\(*.*\)*"
@@ -82,7 +89,7 @@ class Pcie(PcieBase):
 
     # check the sysfs tree for each PCIe device
     def check_pcie_sysfs(self, domain=0, bus=0, device=0, func=0):
-        dev_path = os.path.join('/usr/share/sonic/device/pci', '%04x:%02x:%02x.%d' % (domain, bus, device, func))
+        dev_path = os.path.join(self.PCI_DEVICE_DIR, '%04x:%02x:%02x.%d' % (domain, bus, device, func))
         if os.path.exists(dev_path):
             return True
         return False
@@ -103,7 +110,7 @@ class Pcie(PcieBase):
     # return AER stats of PCIe device
     def get_pcie_aer_stats(self, domain=0, bus=0, dev=0, func=0):
         aer_stats = {'correctable': {}, 'fatal': {}, 'non_fatal': {}}
-        dev_path = os.path.join('/usr/share/sonic/device/pci', '%04x:%02x:%02x.%d' % (domain, bus, dev, func))
+        dev_path = os.path.join(self.PCI_DEVICE_DIR, '%04x:%02x:%02x.%d' % (domain, bus, dev, func))
 
         # construct AER sysfs filepath
         correctable_path = os.path.join(dev_path, "aer_dev_correctable")
@@ -138,6 +145,8 @@ class Pcie(PcieBase):
 
     # generate the config file with current pci device
     def dump_conf_yaml(self):
+        import yaml
+
         curInfo = self.get_pcie_device()
         conf_rev = "_{}".format(self._conf_rev) if self._conf_rev else ""
         config_file = "{}/pcie{}.yaml".format(self.config_path, conf_rev)
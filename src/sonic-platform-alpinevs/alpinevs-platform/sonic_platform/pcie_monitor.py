@@ -0,0 +1,245 @@
+#
+# pcie_monitor.py
+#
+# Background PCIe health monitor for the AlpineVS platform. Periodically runs
+# the Pcie device check and AER collection and publishes the results to
+# STATE_DB, writing a device entry only when its status or AER counters
+# changed since the last publish.
+#
+
+try:
+    import argparse
+    import logging
+    import os
+    import sys
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .pcie import Pcie
+except ImportError as e:
+    raise ImportError(str(e) + "- required module not found")
+
+logger = logging.getLogger(__name__)
+
+PCIE_DEVICE_TABLE_NAME = "PCIE_DEVICE"
+PCIE_STATUS_TABLE_NAME = "PCIE_DEVICES"
+PCIE_STATUS_KEY = "status"
+
+DEFAULT_POLL_INTERVAL_SECS = 60
+# Device trees at least this large have their AER files read from a thread
+# pool; smaller trees are cheaper to walk serially.
+DEFAULT_PARALLEL_THRESHOLD = 64
+DEFAULT_MAX_WORKERS = 8
+# The in-memory swsscommon stand-in of a source checkout, for --in-memory.
+STUBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "platform", "stubs")
+
+
+class _StateDbTable(object):
+    """Thin adapter that writes field/value lists to a STATE_DB table."""
+
+    def __init__(self, name):
+        from swsscommon import swsscommon
+        self._swsscommon = swsscommon
+        self._table = swsscommon.Table(swsscommon.DBConnector("STATE_DB", 0), name)
+
+    def set(self, key, fvs):
+        self._table.set(key, self._swsscommon.FieldValuePairs(fvs))
+
+    def _del(self, key):
+        self._table._del(key)
+
+    def getKeys(self):
+        return list(self._table.getKeys())
+
+
+class PcieMonitor(object):
+    """
+    Polls a Pcie instance on a fixed schedule and publishes per-device status
+    and AER counters to STATE_DB with change-only writes. Entries of devices
+    that are no longer present are removed.
+    """
+
+    def __init__(self, pcie, device_table=None, status_table=None,
+                 interval=DEFAULT_POLL_INTERVAL_SECS,
+                 parallel_threshold=DEFAULT_PARALLEL_THRESHOLD,
+                 max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Args:
+            pcie: The Pcie instance to poll.
+            device_table: Table receiving one entry per device. Defaults to
+                PCIE_DEVICE in STATE_DB.
+            status_table: Table receiving the overall check result. Defaults
+                to PCIE_DEVICES in STATE_DB.
+            interval: Seconds between two polls.
+            parallel_threshold: Minimum number of devices for which AER
+                collection is spread over a thread pool.
+            max_workers: Size of the AER collection thread pool.
+        """
+        self._pcie = pcie
+        self._device_table = device_table or _StateDbTable(PCIE_DEVICE_TABLE_NAME)
+        self._status_table = status_table or _StateDbTable(PCIE_STATUS_TABLE_NAME)
+        self.interval = interval
+        self.parallel_threshold = parallel_threshold
+        self.max_workers = max_workers
+
+        self._published = {}
+        self._published_status = None
+        self._synced = False
+        self._executor = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="pcie-aer")
+        return self._executor
+
+    def _collect_aer(self, item):
+        return self._pcie.get_pcie_aer_stats(bus=int(item["bus"], base=16),
+                                             dev=int(item["dev"], base=16),
+                                             func=int(item["fn"], base=16))
+
+    @staticmethod
+    def _device_key(item):
+        return "%02x:%02x.%d" % (int(item["bus"], base=16),
+                                 int(item["dev"], base=16),
+                                 int(item["fn"], base=16))
+
+    @staticmethod
+    def _device_fields(item, aer_stats):
+        """
+        Flattens one device check result and its AER stats into the
+        field/value pairs stored in STATE_DB, e.g.
+        {'result': 'Passed', 'correctable|RxErr': '0', ...}
+        """
+        fields = {
+            "name": str(item.get("name", "")),
+            "id": str(item.get("id", "")),
+            "result": str(item.get("result", "")),
+        }
+        for severity, counters in aer_stats.items():
+            for counter, value in counters.items():
+                fields["{}|{}".format(severity, counter)] = str(value)
+        return fields
+
+    def poll_once(self):
+        """
+        Runs one device check and AER collection pass and publishes whatever
+        changed.
+
+        Returns:
+            int: The number of device entries written to or removed from
+                STATE_DB.
+
+        Raises:
+            RuntimeError: The Pcie config file could not be loaded.
+        """
+        try:
+            devices = self._pcie.get_pcie_check()
+        except SystemExit:
+            # Pcie.load_config_file() exits when pcie.yaml is missing.
+            raise RuntimeError("unable to load the PCIe config from {}".format(
+                getattr(self._pcie, "config_path", "?")))
+
+        if len(devices) >= self.parallel_threshold:
+            aer_list = list(self._get_executor().map(self._collect_aer, devices))
+        else:
+            aer_list = [self._collect_aer(item) for item in devices]
+
+        writes = 0
+        overall = "PASSED"
+        present = set()
+        for item, aer_stats in zip(devices, aer_list):
+            if item.get("result") != "Passed":
+                overall = "FAILED"
+            key = self._device_key(item)
+            present.add(key)
+            fields = self._device_fields(item, aer_stats)
+            if self._published.get(key) == fields:
+                continue
+            self._device_table.set(key, list(fields.items()))
+            self._published[key] = fields
+            writes += 1
+
+        stale = set(self._published) - present
+        if not self._synced and hasattr(self._device_table, "getKeys"):
+            # Entries left by an earlier instance of the monitor.
+            stale.update(k for k in self._device_table.getKeys() if k not in present)
+            self._synced = True
+        for key in stale:
+            self._device_table._del(key)
+            self._published.pop(key, None)
+            writes += 1
+
+        if overall != self._published_status:
+            self._status_table.set(PCIE_STATUS_KEY, [("status", overall)])
+            self._published_status = overall
+
+        return writes
+
+    def run(self):
+        """Polls until stop() is called."""
+        while not self._stop_event.is_set():
+            try:
+                writes = self.poll_once()
+                logger.debug("PCIe poll published %d device update(s)", writes)
+            except Exception as err:
+                logger.error("PCIe poll failed: %s", err)
+            self._stop_event.wait(self.interval)
+
+    def start(self):
+        """Starts polling in a background thread."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, name="pcie-monitor",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background thread and the AER thread pool."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AlpineVS PCIe health monitor")
+    parser.add_argument("--config-path", default="/usr/share/sonic/platform",
+                        help="directory holding pcie.yaml")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL_SECS,
+                        help="seconds between polls")
+    parser.add_argument("--parallel-threshold", type=int,
+                        default=DEFAULT_PARALLEL_THRESHOLD,
+                        help="device count from which AER is read in parallel")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="AER collection thread pool size")
+    parser.add_argument("--in-memory", action="store_true",
+                        help="publish to the in-memory swsscommon from src/platform/stubs "
+                             "instead of STATE_DB (source checkout only)")
+    args = parser.parse_args()
+
+    if args.in_memory:
+        if not os.path.isfile(os.path.join(STUBS_DIR, "swsscommon", "swsscommon.py")):
+            parser.error("--in-memory needs the swsscommon stand-in under {}".format(
+                os.path.normpath(STUBS_DIR)))
+        sys.path.insert(0, os.path.normpath(STUBS_DIR))
+
+    logging.basicConfig(level=logging.INFO)
+    monitor = PcieMonitor(Pcie(args.config_path),
+                          interval=args.interval,
+                          parallel_threshold=args.parallel_threshold,
+                          max_workers=args.max_workers)
+    try:
+        monitor.run()
+    except KeyboardInterrupt:
+        monitor.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#
+# profiling.py
+#
+# On-demand profiling for pmon daemons and other processes that load
+# sonic_platform. When SONIC_PROFILE_DIR is set, signal handlers are
+# installed in the process:
+#
+#   kill -USR1 <pid>   start cProfile; send again to stop it and write
+#                      <ident>_<pid>_<time>.prof plus a .txt summary
+#   kill -USR2 <pid>   start tracemalloc; send again to snapshot, stop it and
+#                      write <ident>_<pid>_<time>.tracemalloc plus a
+#                      _mem.txt summary of the top allocation sites
+#
+# Without SONIC_PROFILE_DIR nothing is installed. With it, nothing runs until
+# a signal arrives. cProfile only sees the main thread, which is where the
+# signal handlers run and where the daemons' event loops live.
+#
+
+try:
+    import logging
+    import os
+    import signal
+    import sys
+    import time
+except ImportError as e:
+    raise ImportError(str(e) + "- required module not found")
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR_ENV = "SONIC_PROFILE_DIR"
+DEFAULT_TOP = 40
+DEFAULT_TRACEMALLOC_FRAMES = 16
+
+_profiler = None
+
+
+class SignalProfiler(object):
+    """
+    Toggles cProfile on SIGUSR1 and tracemalloc on SIGUSR2, dumping the
+    results to timestamped files in out_dir when a session is stopped.
+    """
+
+    def __init__(self, out_dir, ident=None, top=DEFAULT_TOP, frames=DEFAULT_TRACEMALLOC_FRAMES):
+        """
+        Args:
+            out_dir: Directory for the dump files, created on first dump.
+            ident: File name prefix; defaults to the program name.
+            top: Number of entries in the text summaries.
+            frames: Traceback depth recorded by tracemalloc.
+        """
+        self.out_dir = out_dir
+        self.ident = ident or os.path.basename(sys.argv[0] or "python") or "python"
+        self.top = top
+        self.frames = frames
+        self._profile = None
+        self._tracing = False
+        self.dumps = []
+
+    def install(self):
+        """
+        Installs the handlers. A signal that already has a handler other
+        than the default is left alone.
+
+        Returns:
+            list: The signals that were installed.
+        """
+        installed = []
+        for signum, handler in ((signal.SIGUSR1, self._toggle_profile),
+                                (signal.SIGUSR2, self._toggle_tracemalloc)):
+            if signal.getsignal(signum) not in (signal.SIG_DFL, None):
+                logger.warning("Signal %s already has a handler, not installing profiling on it", signum)
+                continue
+            try:
+                signal.signal(signum, handler)
+            except ValueError as err:
+                # Not the main thread of the main interpreter.
+                logger.warning("Unable to install profiling handler for signal %s: %s", signum, err)
+                continue
+            installed.append(signum)
+        return installed
+
+    def _path(self, suffix):
+        os.makedirs(self.out_dir, exist_ok=True)
+        name = "{}_{}_{}{}".format(self.ident, os.getpid(), time.strftime("%Y%m%d_%H%M%S"), suffix)
+        path = os.path.join(self.out_dir, name)
+        self.dumps.append(path)
+        return path
+
+    def _toggle_profile(self, signum=None, frame=None):
+        import cProfile
+        import pstats
+
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            logger.warning("Profiling started (send signal %s again to stop and dump)", signum)
+            return
+        profile, self._profile = self._profile, None
+        profile.disable()
+        path = self._path(".prof")
+        profile.dump_stats(path)
+        with open(self._path(".txt"), "w") as fh:
+            pstats.Stats(profile, stream=fh).sort_stats("cumulative").print_stats(self.top)
+        logger.warning("Profiling stopped, wrote %s", path)
+
+    def _toggle_tracemalloc(self, signum=None, frame=None):
+        import tracemalloc
+
+        if not self._tracing:
+            tracemalloc.start(self.frames)
+            self._tracing = True
+            logger.warning("Allocation tracing started (send signal %s again to stop and dump)", signum)
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),))
+        tracemalloc.stop()
+        self._tracing = False
+        path = self._path(".tracemalloc")
+        snapshot.dump(path)
+        with open(self._path("_mem.txt"), "w") as fh:
+            fh.write("traced current {} bytes, peak {} bytes\n\n".format(current, peak))
+            fh.write("top {} allocation sites still alive:\n".format(self.top))
+            for stat in snapshot.statistics("lineno")[:self.top]:
+                fh.write("{}\n".format(stat))
+            fh.write("\ntop {} tracebacks:\n".format(min(self.top, 10)))
+            for stat in snapshot.statistics("traceback")[:min(self.top, 10)]:
+                fh.write("\n{} blocks, {} bytes\n".format(stat.count, stat.size))
+                fh.write("\n".join(stat.traceback.format()) + "\n")
+        logger.warning("Allocation tracing stopped, wrote %s", path)
+
+
+def install(out_dir, ident=None):
+    """
+    Installs the handlers once per process and returns the SignalProfiler.
+    A later call with an ident renames the dumps of the installed one:
+    importing sonic_platform installs it before a daemon's main() can
+    pass its own name.
+    """
+    global _profiler
+    if _profiler is None:
+        profiler = SignalProfiler(out_dir, ident)
+        if profiler.install():
+            _profiler = profiler
+    elif ident:
+        _profiler.ident = ident
+    return _profiler
+
+
+def install_from_env(ident=None):
+    """Installs the handlers if SONIC_PROFILE_DIR is set; returns the SignalProfiler or None."""
+    out_dir = os.environ.get(PROFILE_DIR_ENV)
+    if not out_dir:
+        return None
+    return install(out_dir, ident)
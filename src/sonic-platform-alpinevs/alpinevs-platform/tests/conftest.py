@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The SONiC base packages (swsscommon, sonic_py_common, sonic_platform_base)
+# are not installed off-target; use the in-memory stand-ins.
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "..", "..", "platform", "stubs"))
+sys.path.insert(0, os.path.join(TESTS_DIR, ".."))
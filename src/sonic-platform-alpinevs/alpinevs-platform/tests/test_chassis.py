@@ -0,0 +1,17 @@
+from sonic_platform.chassis import Chassis
+
+
+def test_led_control_is_built_on_first_use(monkeypatch):
+    calls = []
+    monkeypatch.setattr(Chassis, "_add_leds", lambda self: calls.append(self) or setattr(self, "_led_control", "leds"))
+    chassis = Chassis()
+    assert calls == []
+    assert chassis.get_led_control() == "leds"
+    assert chassis.get_led_control() == "leds"
+    assert len(calls) == 1
+
+
+def test_port_status_led_is_assignable():
+    chassis = Chassis()
+    chassis._port_status_led = "leds"
+    assert chassis.get_led_control() == "leds"
@@ -0,0 +1,105 @@
+import pytest
+from swsscommon import swsscommon
+
+from sonic_platform import pcie_monitor
+from sonic_platform.pcie_monitor import PcieMonitor
+
+
+class FakePcie(object):
+    config_path = "/nonexistent"
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.aer = {}
+        self.missing_config = False
+
+    def get_pcie_check(self):
+        if self.missing_config:
+            raise SystemExit()
+        return [dict(d) for d in self.devices]
+
+    def get_pcie_aer_stats(self, bus, dev, func):
+        key = "%02x:%02x.%d" % (bus, dev, func)
+        return {"correctable": {"RxErr": self.aer.get(key, 0)}}
+
+
+def device(bus, result="Passed"):
+    return {"bus": bus, "dev": "00", "fn": "0", "name": "dev" + bus, "id": "0001", "result": result}
+
+
+@pytest.fixture
+def state_db():
+    swsscommon.reset()
+    yield swsscommon.DBConnector("STATE_DB", 0)
+    swsscommon.reset()
+
+
+@pytest.fixture
+def monitor(state_db):
+    pcie = FakePcie([device("01"), device("02")])
+    return PcieMonitor(pcie, interval=0)
+
+
+def entry(state_db, table, key):
+    found, fvs = swsscommon.Table(state_db, table).get(key)
+    return dict(fvs) if found else None
+
+
+class TestPcieMonitor(object):
+    def test_first_poll_writes_every_device(self, monitor, state_db):
+        assert monitor.poll_once() == 2
+        assert entry(state_db, pcie_monitor.PCIE_DEVICE_TABLE_NAME, "01:00.0")["correctable|RxErr"] == "0"
+        assert entry(state_db, pcie_monitor.PCIE_STATUS_TABLE_NAME, "status") == {"status": "PASSED"}
+
+    def test_unchanged_poll_writes_nothing(self, monitor):
+        monitor.poll_once()
+        assert monitor.poll_once() == 0
+
+    def test_only_changed_devices_are_rewritten(self, monitor, state_db):
+        monitor.poll_once()
+        monitor._pcie.aer["02:00.0"] = 3
+        assert monitor.poll_once() == 1
+        assert entry(state_db, pcie_monitor.PCIE_DEVICE_TABLE_NAME, "02:00.0")["correctable|RxErr"] == "3"
+
+    def test_status_transitions(self, monitor, state_db):
+        monitor.poll_once()
+        monitor._pcie.devices[0]["result"] = "Failed"
+        assert monitor.poll_once() == 1
+        assert entry(state_db, pcie_monitor.PCIE_STATUS_TABLE_NAME, "status") == {"status": "FAILED"}
+        monitor._pcie.devices[0]["result"] = "Passed"
+        monitor.poll_once()
+        assert entry(state_db, pcie_monitor.PCIE_STATUS_TABLE_NAME, "status") == {"status": "PASSED"}
+
+    def test_removed_device_is_deleted(self, monitor, state_db):
+        monitor.poll_once()
+        del monitor._pcie.devices[1]
+        assert monitor.poll_once() == 1
+        assert entry(state_db, pcie_monitor.PCIE_DEVICE_TABLE_NAME, "02:00.0") is None
+        assert monitor.poll_once() == 0
+
+    def test_entries_left_by_an_earlier_run_are_deleted(self, state_db):
+        stale = swsscommon.Table(state_db, pcie_monitor.PCIE_DEVICE_TABLE_NAME)
+        stale.set("7f:00.0", swsscommon.FieldValuePairs([("result", "Passed")]))
+        monitor = PcieMonitor(FakePcie([device("01")]), interval=0)
+        assert monitor.poll_once() == 2
+        assert stale.getKeys() == ["01:00.0"]
+
+    def test_missing_config_is_an_error_not_an_exit(self, monitor):
+        monitor._pcie.missing_config = True
+        with pytest.raises(RuntimeError):
+            monitor.poll_once()
+
+    def test_run_survives_a_missing_config(self, monitor, state_db):
+        monitor._pcie.missing_config = True
+        polls = []
+
+        def wait(timeout):
+            polls.append(timeout)
+            monitor._pcie.missing_config = False
+            if len(polls) == 2:
+                monitor._stop_event.set()
+            return monitor._stop_event.is_set()
+        monitor._stop_event.wait = wait
+        monitor.run()
+        assert len(polls) == 2
+        assert entry(state_db, pcie_monitor.PCIE_STATUS_TABLE_NAME, "status") == {"status": "PASSED"}
@@ -0,0 +1,58 @@
+import os
+import signal
+
+import pytest
+
+from sonic_platform import profiling
+
+
+@pytest.fixture(autouse=True)
+def restore_signals(monkeypatch):
+    saved = {s: signal.getsignal(s) for s in (signal.SIGUSR1, signal.SIGUSR2)}
+    for s in saved:
+        signal.signal(s, signal.SIG_DFL)
+    monkeypatch.setattr(profiling, "_profiler", None)
+    yield
+    for s, handler in saved.items():
+        signal.signal(s, handler)
+
+
+def test_toggles_dump_timestamped_files(tmp_path):
+    out_dir = str(tmp_path / "prof")
+    profiler = profiling.SignalProfiler(out_dir, ident="unit", top=5)
+    profiler._toggle_profile()
+    sum(range(1000))
+    profiler._toggle_profile()
+    profiler._toggle_tracemalloc()
+    kept = [bytearray(100) for _ in range(10)]
+    profiler._toggle_tracemalloc()
+    del kept
+
+    prefix = "unit_{}_".format(os.getpid())
+    names = sorted(os.listdir(out_dir))
+    assert len(names) == 4 and all(n.startswith(prefix) for n in names)
+    assert sorted(os.path.splitext(n)[1] for n in names) == [".prof", ".tracemalloc", ".txt", ".txt"]
+    assert any(n.endswith("_mem.txt") for n in names)
+    assert sorted(profiler.dumps) == sorted(os.path.join(out_dir, n) for n in names)
+
+
+def test_existing_handlers_are_left_alone(tmp_path):
+    def mine(signum, frame):
+        pass
+
+    signal.signal(signal.SIGUSR1, mine)
+    profiler = profiling.SignalProfiler(str(tmp_path))
+    assert profiler.install() == [signal.SIGUSR2]
+    assert signal.getsignal(signal.SIGUSR1) is mine
+    assert signal.getsignal(signal.SIGUSR2) == profiler._toggle_tracemalloc
+
+
+def test_install_from_env(tmp_path, monkeypatch):
+    monkeypatch.delenv(profiling.PROFILE_DIR_ENV, raising=False)
+    assert profiling.install_from_env("xcvrd") is None
+    monkeypatch.setenv(profiling.PROFILE_DIR_ENV, str(tmp_path))
+    first = profiling.install_from_env()
+    assert first is not None and first.out_dir == str(tmp_path)
+    # A daemon's own call after the package import names the dumps.
+    assert profiling.install_from_env("xcvrd") is first
+    assert first.ident == "xcvrd"